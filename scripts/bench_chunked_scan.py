@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Scaling benchmark for chunked single-document scanning.
+
+Builds a synthetic document with a realistic sprinkling of findings, times the
+serial scanner, then times ``scan_findings_chunked`` for each chunk count and
+checks that every chunked result is identical to the serial one.
+
+    python scripts/bench_chunked_scan.py --megabytes 64 --chunks 1 2 4 8 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from unicodefix.chunked import scan_findings_chunked
+from unicodefix.scanner import scan_findings
+
+_LINES = (
+    "Plain ASCII prose that makes up most of a real document.\n",
+    "A “quoted” phrase—with an em dash… and a non\u2011breaking hyphen.\n",
+    "def pаypal(value):  # Cyrillic a in an identifier\n",
+    "Hidden\u200bzero\u200dwidth and \u2066isolate\u2069 controls.\n",
+    "Accented cafe\u0301 and a narrow\u202fno-break space.\n",
+)
+
+
+def _document(megabytes: float) -> str:
+    target = int(megabytes * 1024 * 1024)
+    block = "".join(_LINES[0] * 12 + line for line in _LINES[1:])
+    return block * max(1, target // len(block))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=16)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    text = _document(args.megabytes)
+    print(f"document: {len(text):,} characters, workers: {args.workers}")
+    started = time.perf_counter()
+    serial = scan_findings(text).to_dict()
+    baseline = time.perf_counter() - started
+    print(f"{'serial':>8}  {baseline:8.2f}s  {1.0:5.2f}x")
+    for chunks in args.chunks:
+        started = time.perf_counter()
+        result = scan_findings_chunked(
+            text, chunks=chunks, workers=min(chunks, args.workers)
+        ).to_dict()
+        elapsed = time.perf_counter() - started
+        status = "identical" if result == serial else "MISMATCH"
+        print(f"{chunks:>8}  {elapsed:8.2f}s  {baseline / elapsed:5.2f}x  {status}")
+
+
+if __name__ == "__main__":
+    main()
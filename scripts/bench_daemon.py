@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Round-trip latency benchmark for the ``cleanup-text --serve`` daemon.
+
+Starts a daemon on a temporary socket, then times ``clean`` and ``report``
+requests over one connection for a few document sizes and prints the median
+and 95th percentile in milliseconds.  Client interpreter start-up is not
+included; compare with ``time cleanup-text --client < file``.
+
+    python scripts/bench_daemon.py --requests 500 --sizes 1 4 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SOURCE = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SOURCE))
+
+from unicodefix.daemon import call, connect
+
+_LINE = "A “quoted” phrase\u200b with an em dash — and trailing words.\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument(
+        "--sizes", type=float, nargs="+", default=[1, 4, 64], metavar="KIB"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, "bench.sock")
+        environment = {**os.environ, "PYTHONPATH": str(SOURCE)}
+        daemon = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "unicodefix.cli",
+                "--serve",
+                "--socket",
+                socket_path,
+            ],
+            env=environment,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            while not os.path.exists(socket_path):
+                time.sleep(0.05)
+            connection = connect(socket_path)
+            assert connection is not None
+            with connection:
+                for kibibytes in args.sizes:
+                    text = _LINE * max(1, int(kibibytes * 1024) // len(_LINE))
+                    for operation in ("clean", "report"):
+                        timings = []
+                        for _ in range(args.requests):
+                            started = time.perf_counter()
+                            call(connection, {"op": operation, "text": text})
+                            timings.append((time.perf_counter() - started) * 1000)
+                        timings.sort()
+                        print(
+                            f"{kibibytes:>6g} KiB {operation:<6} "
+                            f"median {statistics.median(timings):7.2f} ms  "
+                            f"p95 {timings[int(len(timings) * 0.95)]:7.2f} ms"
+                        )
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,19 @@
 """Local Unicode, provenance, source, and Markdown auditing."""
 
-from unicodefix.authorship import (
-    detect_authorship_profiles,
-    detect_authorship_with_profile,
-)
-from unicodefix.markdown import audit_markdown, unwrap_markdown
-from unicodefix.metrics import compute_metrics
-from unicodefix.scanner import scan_findings, scan_text_for_report
-from unicodefix.transforms import clean_text, handle_newlines
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from unicodefix.authorship import (
+        detect_authorship_profiles,
+        detect_authorship_with_profile,
+    )
+    from unicodefix.markdown import audit_markdown, unwrap_markdown
+    from unicodefix.metrics import compute_metrics
+    from unicodefix.scanner import scan_findings, scan_text_for_report
+    from unicodefix.transforms import clean_text, handle_newlines
 
 __all__ = [
     "audit_markdown",
@@ -21,3 +27,29 @@ __all__ = [
     "unwrap_markdown",
 ]
 __version__ = "2.0.0"
+
+# Submodules load on first use, so the thin daemon client (and any other
+# importer of one light submodule) does not pay for ftfy, rich, or mdformat.
+_EXPORTS = {
+    "audit_markdown": "unicodefix.markdown",
+    "clean_text": "unicodefix.transforms",
+    "compute_metrics": "unicodefix.metrics",
+    "detect_authorship_profiles": "unicodefix.authorship",
+    "detect_authorship_with_profile": "unicodefix.authorship",
+    "handle_newlines": "unicodefix.transforms",
+    "scan_findings": "unicodefix.scanner",
+    "scan_text_for_report": "unicodefix.scanner",
+    "unwrap_markdown": "unicodefix.markdown",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'unicodefix' has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_EXPORTS])
@@ -0,0 +1,197 @@
+"""Memoized analysis of a document and of its cleaned counterpart.
+
+A ``--dry-run`` report needs the scanner report and metrics of the input and
+of the cleaned text.  :class:`DocumentAnalysis` computes each once, and
+:meth:`DocumentAnalysis.after` analyses the cleaned text by reusing the
+results for every part that cleaning left untouched, so a preview costs about
+one scan plus the cleaning pass rather than two full scans.
+
+The transforms do not record their edits, so unchanged parts are found by
+content.  A document is cut into blocks of whole lines at content-defined
+boundaries: after a line whose hash picks it once at least
+:data:`MIN_BLOCK_CHARS` characters have accumulated.  An edit therefore
+changes only the blocks around it, and the following boundaries fall where
+they did in the input.  Each block is scanned by
+:func:`unicodefix.scanner.scan_partial` at its position, exactly as the
+chunked scanner does, and results are memoized by block content; a block
+found again elsewhere is rebased.  Merged results are identical to
+:func:`unicodefix.scanner.scan_text_for_report` and
+:func:`unicodefix.metrics.compute_metrics`.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from unicodefix.c2pa import c2pa_findings, find_c2pa_carriers
+from unicodefix.metrics import merge_metric_counts, metric_counts, metrics_from_counts
+from unicodefix.scanner import (
+    PartialScan,
+    findings_from_partials,
+    merge_aggregates,
+    report_from_parts,
+    scan_partial,
+)
+
+__all__ = ["MIN_BLOCK_CHARS", "DocumentAnalysis", "block_bounds"]
+
+MIN_BLOCK_CHARS = 4096
+# About one line in this many ends a block once it is long enough.
+_SPREAD = 16
+
+
+def block_bounds(
+    text: str, protected: list[tuple[int, int]] | tuple = ()
+) -> list[tuple[int, int]]:
+    """Split *text* into content-defined spans that each end after a newline.
+
+    No boundary falls strictly inside a *protected* ``(start, end)`` span.
+    """
+
+    size = len(text)
+    if not size:
+        return [(0, 0)]
+    spans = iter(sorted(protected))
+    span = next(spans, None)
+    bounds = []
+    start = position = 0
+    while position < size:
+        newline = text.find("\n", position)
+        end = size if newline < 0 else newline + 1
+        line = text[position:end]
+        position = end
+        while span is not None and span[1] <= end:
+            span = next(spans, None)
+        if end == size or (
+            end - start >= MIN_BLOCK_CHARS
+            and hash(line) % _SPREAD == 0
+            and not (span is not None and span[0] < end)
+        ):
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+def _scan_block(task: tuple[str, int, int, bool]) -> PartialScan:
+    block, base_offset, base_line, confusables = task
+    return scan_partial(
+        block,
+        base_offset=base_offset,
+        base_line=base_line,
+        aggregates=True,
+        confusables=confusables,
+    )
+
+
+class _Memo:
+    """Block results shared by a document and the versions derived from it."""
+
+    def __init__(self) -> None:
+        # (block, starts the document) -> (base offset, base line, scan)
+        self.scans: dict[tuple[str, bool], tuple[int, int, PartialScan]] = {}
+        self.metrics: dict[str, dict] = {}
+
+
+class DocumentAnalysis:
+    """Scanner report and metrics of one document, each computed once.
+
+    With *workers* above one, blocks that need scanning are scanned in that
+    many processes.  ``stats`` counts the ``blocks`` of the document and the
+    ones ``reused`` from an earlier analysis.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        *,
+        confusables: bool = True,
+        workers: int = 1,
+        _memo: _Memo | None = None,
+    ) -> None:
+        self.text = text
+        self.confusables = confusables
+        self.workers = workers
+        self.stats: Counter[str] = Counter()
+        self._memo = _memo or _Memo()
+        self._carriers = find_c2pa_carriers(text)
+        self._bounds = block_bounds(
+            text, [(carrier.start, carrier.end) for carrier in self._carriers]
+        )
+        self._partials: list[PartialScan] | None = None
+        self._metric_counts: dict | None = None
+
+    def after(self, text: str) -> DocumentAnalysis:
+        """Analysis of *text*, an edited version of this document.
+
+        Blocks that the edit left unchanged are not scanned again.
+        """
+
+        return DocumentAnalysis(
+            text, confusables=self.confusables, workers=self.workers, _memo=self._memo
+        )
+
+    def _scans(self) -> list[PartialScan]:
+        if self._partials is not None:
+            return self._partials
+        tasks = []
+        pending = set()
+        line = 0
+        for start, end in self._bounds:
+            key = (self.text[start:end], start == 0)
+            if key not in self._memo.scans and key not in pending:
+                pending.add(key)
+                tasks.append((key[0], start, line, self.confusables))
+            line += self.text.count("\n", start, end)
+        for task, partial in zip(tasks, self._map(tasks)):
+            self._memo.scans[(task[0], task[1] == 0)] = (task[1], task[2], partial)
+        partials = []
+        line = 0
+        for start, end in self._bounds:
+            base_offset, base_line, partial = self._memo.scans[
+                (self.text[start:end], start == 0)
+            ]
+            if (base_offset, base_line) != (start, line):
+                partial = partial.rebased(start - base_offset, line - base_line)
+            partials.append(partial)
+            line += self.text.count("\n", start, end)
+        self.stats["blocks"] += len(self._bounds)
+        self.stats["reused"] += len(self._bounds) - len(tasks)
+        self._partials = partials
+        return partials
+
+    def _map(self, tasks: list[tuple[str, int, int, bool]]) -> list[PartialScan]:
+        if self.workers <= 1 or len(tasks) <= 1:
+            return [_scan_block(task) for task in tasks]
+        workers = min(self.workers, len(tasks))
+        pool = ProcessPoolExecutor(workers)
+        try:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            return list(pool.map(_scan_block, tasks, chunksize=chunksize))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def report(self) -> dict[str, Any]:
+        """A new :func:`~unicodefix.scanner.scan_text_for_report` dictionary."""
+
+        partials = self._scans()
+        return report_from_parts(
+            merge_aggregates(partial.aggregates or {} for partial in partials),
+            bool(self.text) and self.text.endswith(("\n", "\r")),
+            findings_from_partials(partials, c2pa_findings(self.text, self._carriers)),
+        )
+
+    def metrics(self) -> dict[str, Any]:
+        """A new :func:`~unicodefix.metrics.compute_metrics` dictionary."""
+
+        if self._metric_counts is None:
+            parts = []
+            for start, end in self._bounds:
+                block = self.text[start:end]
+                counts = self._memo.metrics.get(block)
+                if counts is None:
+                    counts = self._memo.metrics[block] = metric_counts(block)
+                parts.append(counts)
+            self._metric_counts = merge_metric_counts(parts)
+        return metrics_from_counts(self._metric_counts)
@@ -0,0 +1,140 @@
+"""Text members of tar and zip archives, streamed for ``cleanup-text --report``.
+
+Members are read one at a time without extracting anything to disk: tar
+archives (plain or gzip, bzip2, or xz compressed) in stream mode, zip archives
+through their central directory.  Memory therefore stays bounded by the
+largest scanned member rather than the archive.  Directories, links, and other
+non-regular members, members over :data:`MAX_MEMBER_BYTES`, encrypted zip
+members and ones with an unsupported compression method, and members whose
+content holds NUL or invalid UTF-8 are skipped and counted.  Archives nested
+inside archives are binary members and are not opened.
+"""
+
+from __future__ import annotations
+
+import stat
+import tarfile
+import zipfile
+import zlib
+from collections import Counter
+from collections.abc import Iterator
+from typing import IO
+
+__all__ = [
+    "ARCHIVE_SUFFIXES",
+    "MAX_MEMBER_BYTES",
+    "MEMBER_SEPARATOR",
+    "is_archive",
+    "text_members",
+]
+
+ARCHIVE_SUFFIXES = (
+    ".zip",
+    ".tar",
+    ".tar.gz",
+    ".tgz",
+    ".tar.bz2",
+    ".tbz2",
+    ".tar.xz",
+    ".txz",
+)
+MAX_MEMBER_BYTES = 64 << 20
+MEMBER_SEPARATOR = "!"
+# General-purpose bit 0 of a zip member: its data is encrypted.
+_ZIP_ENCRYPTED = 0x1
+
+
+def is_archive(path: str) -> bool:
+    """Whether *path* names an archive by its suffix."""
+
+    return path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _text(handle: IO[bytes], limit: int, stats: Counter[str]) -> str | None:
+    data = handle.read(limit + 1)
+    if len(data) > limit:
+        stats["large"] += 1
+        return None
+    if b"\0" in data:
+        stats["binary"] += 1
+        return None
+    try:
+        return data.decode("utf-8", "strict")
+    except UnicodeDecodeError:
+        stats["binary"] += 1
+        return None
+
+
+def _zip_members(
+    path: str, limit: int, stats: Counter[str]
+) -> Iterator[tuple[str, str]]:
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            # Writers that record no Unix file type mean a regular file.
+            kind = stat.S_IFMT(info.external_attr >> 16)
+            if kind and kind != stat.S_IFREG:
+                stats["special"] += 1
+                continue
+            if info.flag_bits & _ZIP_ENCRYPTED:
+                stats["encrypted"] += 1
+                continue
+            if info.file_size > limit:
+                stats["large"] += 1
+                continue
+            try:
+                with archive.open(info) as handle:
+                    text = _text(handle, limit, stats)
+            except NotImplementedError:
+                stats["unsupported"] += 1
+                continue
+            except RuntimeError:
+                # zipfile's report of an encrypted member it was not told about.
+                stats["encrypted"] += 1
+                continue
+            if text is not None:
+                stats["members"] += 1
+                yield info.filename, text
+
+
+def _tar_members(
+    path: str, limit: int, stats: Counter[str]
+) -> Iterator[tuple[str, str]]:
+    with tarfile.open(path, "r|*") as archive:
+        for member in archive:
+            if member.isdir():
+                continue
+            if not member.isfile():
+                stats["special"] += 1
+                continue
+            if member.size > limit:
+                stats["large"] += 1
+                continue
+            handle = archive.extractfile(member)
+            text = _text(handle, limit, stats) if handle is not None else None
+            if text is not None:
+                stats["members"] += 1
+                yield member.name, text
+
+
+def text_members(
+    path: str,
+    stats: Counter[str] | None = None,
+    *,
+    limit: int = MAX_MEMBER_BYTES,
+) -> Iterator[tuple[str, str]]:
+    """Yield ``(member name, text)`` for each text member of archive *path*.
+
+    *stats* counts ``members`` yielded and the ``binary``, ``large``,
+    ``special``, ``encrypted``, and ``unsupported`` members skipped.  A
+    damaged archive raises :class:`ValueError` after the members read before
+    the damage.
+    """
+
+    stats = Counter() if stats is None else stats
+    reader = _zip_members if path.lower().endswith(".zip") else _tar_members
+    try:
+        yield from reader(path, limit, stats)
+    except (tarfile.TarError, zipfile.BadZipFile, EOFError, zlib.error) as exc:
+        raise ValueError(f"damaged archive: {exc}") from exc
@@ -0,0 +1,117 @@
+"""Per-file size and time budgets for the expensive report stages.
+
+One pathological input, such as a minified bundle hundreds of megabytes long
+or a document that sends a parser or model profile into a crawl, must not
+stall a whole report run.  A :class:`Budget` wraps each optional stage
+(confusable analysis, source parsing, the Markdown audit, watermark and
+authorship profiles): a file over ``max_bytes`` skips them outright, and a
+stage that runs past ``stage_timeout`` seconds is abandoned.  The report then
+carries one ``skipped_stage`` finding that names what was not run and why.
+
+Timeouts use ``SIGALRM``, so they apply only on the main thread of a process
+that has it (the CLI and its worker processes) and take effect between
+Python operations; a single long call into C finishes first.
+"""
+
+from __future__ import annotations
+
+import signal
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from unicodefix.findings import Finding
+
+__all__ = ["SKIPPED_STAGE", "Budget", "StageTimeout", "deadline"]
+
+SKIPPED_STAGE = "skipped_stage"
+
+T = TypeVar("T")
+
+
+class StageTimeout(Exception):
+    """A stage ran past its :func:`deadline`."""
+
+
+def _expire(signum: int, frame: Any) -> None:
+    raise StageTimeout
+
+
+def _alarms() -> bool:
+    return (
+        hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+
+
+@contextmanager
+def deadline(seconds: float | None) -> Iterator[None]:
+    """Raise :class:`StageTimeout` in the block after *seconds*, if it can."""
+
+    if not seconds or not _alarms():
+        yield
+        return
+    previous = signal.signal(signal.SIGALRM, _expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+@dataclass
+class Budget:
+    """The limits for one file and the stages skipped under them."""
+
+    size: int
+    max_bytes: int | None = None
+    stage_timeout: float | None = None
+    skipped: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def oversized(self) -> bool:
+        return self.max_bytes is not None and self.size > self.max_bytes
+
+    @property
+    def timed_out(self) -> bool:
+        return any(stage["reason"] == "timeout" for stage in self.skipped)
+
+    def run(
+        self, stage: str, function: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> tuple[bool, T | None]:
+        """Run a stage within budget; returns ``(completed, result)``."""
+
+        if self.oversized:
+            self.skipped.append({"stage": stage, "reason": "size"})
+            return False, None
+        try:
+            with deadline(self.stage_timeout):
+                return True, function(*args, **kwargs)
+        except StageTimeout:
+            self.skipped.append({"stage": stage, "reason": "timeout"})
+            return False, None
+
+    def finding(self) -> Finding | None:
+        """The ``skipped_stage`` finding, or ``None`` when every stage ran."""
+
+        if not self.skipped:
+            return None
+        stages = ", ".join(stage["stage"] for stage in self.skipped)
+        return Finding(
+            category="formatting",
+            signal=SKIPPED_STAGE,
+            count=len(self.skipped),
+            confidence="informational",
+            removable=False,
+            planned_action="report",
+            message=f"Not run within the file's size or time budget: {stages}.",
+            details={
+                "stages": list(self.skipped),
+                "size_bytes": self.size,
+                "max_file_bytes": self.max_bytes,
+                "stage_timeout": self.stage_timeout,
+            },
+        )
@@ -251,9 +251,12 @@ def find_c2pa_carriers(text: str) -> list[Carrier]:
     return sorted(carriers, key=lambda carrier: carrier.start)
 
 
-def c2pa_findings(text: str) -> list[Finding]:
+def c2pa_findings(text: str, carriers: list[Carrier] | None = None) -> list[Finding]:
+    """Describe *carriers*, or every carrier found in *text*, as findings."""
     findings: list[Finding] = []
-    for carrier in find_c2pa_carriers(text):
+    if carriers is None:
+        carriers = find_c2pa_carriers(text)
+    for carrier in carriers:
         findings.append(
             Finding(
                 category="provenance",
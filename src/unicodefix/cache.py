@@ -0,0 +1,147 @@
+"""Content-addressed on-disk cache for report results.
+
+An entry is keyed by the SHA-256 of the document content combined with the
+UnicodeFix version, the packaged Unicode version, every report-affecting
+option, and a fingerprint of each configured profile file.  A hit replays the
+stored report instead of rescanning.  Entries are plain JSON files; the least
+recently used ones are evicted once the directory exceeds its size bound.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+import unicodedata2 as unicodedata
+
+__all__ = ["DEFAULT_MAX_BYTES", "ResultCache", "default_cache_dir", "file_fingerprint"]
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(base) / "unicodefix" / "reports"
+
+
+def file_fingerprint(path: str) -> str | None:
+    """Return a content hash for *path*, or ``None`` when it cannot be read."""
+
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Size-bounded LRU store of report dictionaries.
+
+    ``stats`` counts ``hits``, ``misses``, ``stores``, ``evictions``, and
+    ``bytes_saved`` (UTF-8 bytes of content that was not rescanned).  Cache
+    I/O failures never fail a report; they only turn into misses.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        *,
+        version: str,
+        configuration: dict[str, Any],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.stats: Counter[str] = Counter()
+        salt = {
+            "unicodefix": version,
+            "unicode": unicodedata.unidata_version,
+            "configuration": configuration,
+        }
+        self._salt = json.dumps(salt, sort_keys=True, separators=(",", ":")).encode()
+
+    def key(self, content: str, variant: str = "") -> str:
+        """Return the entry key for *content*; *variant* separates path-dependent reports."""
+
+        digest = hashlib.sha256(self._salt)
+        digest.update(b"\0" + variant.encode("utf-8", "surrogatepass") + b"\0")
+        digest.update(content.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key[2:]}.json"
+
+    def get(self, key: str, *, size: int = 0) -> dict[str, Any] | None:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as handle:
+                data = json.load(handle)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        self.stats["bytes_saved"] += size
+        return data
+
+    def put(self, key: str, data: dict[str, Any]) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(
+                dir=path.parent, prefix=".entry.", suffix=".tmp"
+            )
+            with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+                json.dump(data, handle, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temporary, path)
+        except OSError:
+            return
+        self.stats["stores"] += 1
+
+    def prune(self) -> int:
+        """Evict least recently used entries until the cache fits ``max_bytes``."""
+
+        entries: list[tuple[float, int, str]] = []
+        total = 0
+        try:
+            shards = list(os.scandir(self.directory))
+        except OSError:
+            return 0
+        for shard in shards:
+            if not shard.is_dir(follow_symlinks=False):
+                continue
+            try:
+                files = list(os.scandir(shard.path))
+            except OSError:
+                continue
+            for entry in files:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    info = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, entry.path))
+                total += info.st_size
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        self.stats["evictions"] += evicted
+        return evicted
@@ -0,0 +1,148 @@
+"""Parallel scanning of one very large document in newline-aligned chunks.
+
+Each chunk is scanned by :func:`unicodefix.scanner.scan_partial` in a process
+pool and the ordered partial results are merged, so the output is identical to
+the serial scanner.  Chunk boundaries directly follow a newline that is not
+inside a C2PA carrier; tokens and Unicode normalization never cross such a
+boundary.  Carriers themselves are located once over the whole document.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from unicodefix.c2pa import c2pa_findings, find_c2pa_carriers
+from unicodefix.findings import Findings
+from unicodefix.scanner import (
+    PartialScan,
+    findings_from_partials,
+    merge_aggregates,
+    report_from_parts,
+    scan_partial,
+)
+
+__all__ = ["chunk_bounds", "scan_findings_chunked", "scan_text_for_report_chunked"]
+
+
+def chunk_bounds(
+    text: str, chunks: int, protected: list[tuple[int, int]] | tuple = ()
+) -> list[tuple[int, int]]:
+    """Split *text* into at most *chunks* spans that each end after a newline.
+
+    No boundary falls strictly inside a *protected* ``(start, end)`` span.
+    """
+
+    size = len(text)
+    target = max(1, -(-size // max(1, chunks)))
+    spans = sorted(protected)
+    bounds: list[tuple[int, int]] = []
+    start = 0
+    while start < size:
+        newline = text.find("\n", start + target - 1)
+        end = size if newline < 0 else newline + 1
+        moved = True
+        while moved and end < size:
+            moved = False
+            for span_start, span_end in spans:
+                if span_start < end < span_end:
+                    newline = text.find("\n", span_end - 1)
+                    end = size if newline < 0 else newline + 1
+                    moved = True
+                    break
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _scan_chunk(task: tuple[str, int, int, int, bool, bool]) -> PartialScan:
+    chunk, base_offset, base_line, location_limit, aggregates, confusables = task
+    return scan_partial(
+        chunk,
+        base_offset=base_offset,
+        base_line=base_line,
+        location_limit=location_limit,
+        aggregates=aggregates,
+        confusables=confusables,
+    )
+
+
+def _partials(
+    text: str,
+    protected: list[tuple[int, int]],
+    *,
+    chunks: int | None,
+    workers: int | None,
+    location_limit: int,
+    aggregates: bool,
+    confusables: bool = True,
+) -> list[PartialScan]:
+    workers = workers or os.cpu_count() or 1
+    tasks = []
+    line = 0
+    for start, end in chunk_bounds(text, chunks or workers, protected):
+        tasks.append(
+            (text[start:end], start, line, location_limit, aggregates, confusables)
+        )
+        line += text.count("\n", start, end)
+    if workers <= 1 or len(tasks) <= 1:
+        return [_scan_chunk(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return list(pool.map(_scan_chunk, tasks))
+
+
+def scan_findings_chunked(
+    text: str,
+    *,
+    chunks: int | None = None,
+    workers: int | None = None,
+    location_limit: int = 100,
+    confusables: bool = True,
+) -> Findings:
+    """Parallel equivalent of :func:`unicodefix.scanner.scan_findings`.
+
+    *workers* defaults to the CPU count and *chunks* to *workers*.
+    """
+
+    carriers = find_c2pa_carriers(text)
+    partials = _partials(
+        text,
+        [(carrier.start, carrier.end) for carrier in carriers],
+        chunks=chunks,
+        workers=workers,
+        location_limit=location_limit,
+        aggregates=False,
+        confusables=confusables,
+    )
+    return findings_from_partials(
+        partials, c2pa_findings(text, carriers), location_limit=location_limit
+    )
+
+
+def scan_text_for_report_chunked(
+    text: str,
+    *,
+    chunks: int | None = None,
+    workers: int | None = None,
+    confusables: bool = True,
+) -> dict[str, Any]:
+    """Parallel equivalent of :func:`unicodefix.scanner.scan_text_for_report`."""
+
+    carriers = find_c2pa_carriers(text)
+    partials = _partials(
+        text,
+        [(carrier.start, carrier.end) for carrier in carriers],
+        chunks=chunks,
+        workers=workers,
+        location_limit=100,
+        aggregates=True,
+        confusables=confusables,
+    )
+    if not partials:
+        partials = [scan_partial(text, aggregates=True, confusables=confusables)]
+    return report_from_parts(
+        merge_aggregates(partial.aggregates or {} for partial in partials),
+        bool(text) and text.endswith(("\n", "\r")),
+        findings_from_partials(partials, c2pa_findings(text, carriers)),
+    )
@@ -3,28 +3,71 @@
 from __future__ import annotations
 
 import argparse
-import difflib
+import contextlib
+import functools
+import hashlib
+import io
+import json
+import multiprocessing
 import os
 import shutil
+import signal
+import sqlite3
 import sys
 import tempfile
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import closing
 from importlib.metadata import PackageNotFoundError, version
+from itertools import chain, tee
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, TextIO
 
 try:
     import tomllib
 except ModuleNotFoundError:  # pragma: no cover - Python 3.10
     import tomli as tomllib
 
+from unicodefix.analysis import DocumentAnalysis
+from unicodefix.archives import MEMBER_SEPARATOR, is_archive, text_members
 from unicodefix.authorship import detect_authorship_profiles
+from unicodefix.budgets import SKIPPED_STAGE, Budget
 from unicodefix.c2pa import find_c2pa_carriers
+from unicodefix.cache import ResultCache, default_cache_dir, file_fingerprint
+from unicodefix.daemon import FORWARDED_ENVIRONMENT, default_socket_path, serve
+from unicodefix.diffs import replacement_spans, unified_diff
+from unicodefix.durable import ReplaceBatch, Staged, discard
+from unicodefix.fastcopy import copy_file
+from unicodefix.gitscan import BlobReader, changed_files, changed_line_ranges
+from unicodefix.hunks import parse_unified_diff, scan_changed_lines
+from unicodefix.identifiers import IdentifierIndex, collision_finding
 from unicodefix.markdown import audit_markdown, unwrap_markdown
 from unicodefix.metrics import compute_metrics
-from unicodefix.report import print_csv, print_human, print_json, print_metrics_help
-from unicodefix.scanner import scan_text_for_report
-from unicodefix.source import clean_source_comments, scan_source
+from unicodefix.mirror import OutputWriter, PendingWrite, mirror_path
+from unicodefix.parallel import default_jobs, ordered_map
+from unicodefix.profiling import Profile, StackSampler, profiled
+from unicodefix.report import (
+    CsvReportWriter,
+    print_csv,
+    print_gate,
+    print_human,
+    print_json,
+    print_metrics_help,
+    print_ndjson,
+    scalar_keys,
+)
+from unicodefix.scanner import count_findings
+from unicodefix.shards import Shard, merge_reports, parse_shard, shard_files
+from unicodefix.source import (
+    clean_source_comments,
+    scan_source,
+    source_identifiers,
+)
+from unicodefix.state import FileState, IncrementalState, default_state_path
 from unicodefix.transforms import clean_text, handle_newlines
+from unicodefix.walk import Walker, read_file_list
+from unicodefix.watch import DEBOUNCE_SECONDS, batches, open_watcher
 from unicodefix.watermarks import detect_profiles
 
 
@@ -61,31 +104,61 @@ def _detect_eol(sample: str) -> str:
     return "\n"
 
 
+def _with_eol(content: str, eol: str) -> str:
+    return content if eol == "\n" else content.replace("\n", eol)
+
+
+def _same_content(path: str, content: str) -> bool:
+    """Whether *path* already holds exactly the UTF-8 encoding of *content*."""
+    data = content.encode("utf-8", "strict")
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+        with open(path, "rb") as handle:
+            return handle.read() == data
+    except FileNotFoundError:
+        return False
+
+
 def _write_text(path: str, content: str, eol: str = "\n") -> None:
-    if eol != "\n":
-        content = content.replace("\n", eol)
+    content = _with_eol(content, eol)
     with open(path, "w", encoding="utf-8", errors="strict", newline="") as handle:
         handle.write(content)
 
 
 def _atomic_replace_text(path: str, content: str, eol: str = "\n") -> None:
     """Write a same-directory temporary file and atomically replace path."""
+    _replace(_write_temporary(path, content, eol), path)
+
+
+def _replace(temporary: str, path: str) -> None:
+    try:
+        os.replace(temporary, path)
+    except OSError:
+        os.remove(temporary)
+        raise
+
+
+def _write_temporary(
+    path: str, content: str, eol: str = "\n", *, sync: bool = True
+) -> str:
+    """Write content beside path with path's mode; returns the temporary name."""
     parent = os.path.dirname(path) or "."
     basename = os.path.basename(path)
     descriptor, temporary = tempfile.mkstemp(
         dir=parent, prefix=f".{basename}.", suffix=".tmp"
     )
     try:
-        if eol != "\n":
-            content = content.replace("\n", eol)
+        content = _with_eol(content, eol)
         with os.fdopen(
             descriptor, "w", encoding="utf-8", errors="strict", newline=""
         ) as handle:
             handle.write(content)
-            handle.flush()
-            os.fsync(handle.fileno())
+            if sync:
+                handle.flush()
+                os.fsync(handle.fileno())
         shutil.copymode(path, temporary)
-        os.replace(temporary, path)
+        return temporary
     except Exception:
         try:
             os.close(descriptor)
@@ -98,7 +171,7 @@ def _atomic_replace_text(path: str, content: str, eol: str = "\n") -> None:
         raise
 
 
-def _preserve_backup(path: str) -> str:
+def _preserve_backup(path: str, *, sync: bool = True) -> str:
     """Copy path to the first available .tmp backup name without overwriting."""
     index = 0
     while True:
@@ -111,9 +184,9 @@ def _preserve_backup(path: str) -> str:
             continue
         try:
             with open(path, "rb") as source, os.fdopen(descriptor, "wb") as target:
-                shutil.copyfileobj(source, target)
-                target.flush()
-                os.fsync(target.fileno())
+                copy_file(source.fileno(), target.fileno())
+                if sync:
+                    os.fsync(target.fileno())
             shutil.copystat(path, backup)
             return backup
         except Exception:
@@ -162,26 +235,80 @@ def _category_total(data: dict[str, Any], categories: list[str] | None) -> int:
     return sum(
         int(finding.get("count", 1))
         for finding in data.get("findings", [])
-        if not wanted or finding.get("category") in wanted
+        # A skipped stage is missing coverage, not evidence.
+        if finding.get("signal") != SKIPPED_STAGE
+        and (not wanted or finding.get("category") in wanted)
+    )
+
+
+# Below this size process start-up and pickling outweigh parallel scanning.
+_CHUNKED_SCAN_MIN_CHARS = 4 * 1024 * 1024
+
+
+def _analysis(
+    raw: str, args: argparse.Namespace, *, confusables: bool = True
+) -> DocumentAnalysis:
+    workers = args.scan_workers if len(raw) >= _CHUNKED_SCAN_MIN_CHARS else 1
+    return DocumentAnalysis(raw, confusables=confusables, workers=workers)
+
+
+def _budget(raw: str, args: argparse.Namespace) -> Budget | None:
+    max_bytes = getattr(args, "max_file_bytes", None)
+    stage_timeout = getattr(args, "stage_timeout", None)
+    if max_bytes is None and stage_timeout is None:
+        return None
+    return Budget(
+        len(raw.encode("utf-8", "surrogatepass")),
+        max_bytes=max_bytes,
+        stage_timeout=stage_timeout,
     )
 
 
+def _run_stage(
+    budget: Budget | None, stage: str, function: Callable[..., Any], *args: Any
+) -> Any:
+    """Run an optional stage; ``None`` means the budget skipped it."""
+    if budget is None:
+        return function(*args)
+    return budget.run(stage, function, *args)[1]
+
+
 def _build_report_data(
     raw: str,
     args: argparse.Namespace,
     *,
     path: str = "-",
     cleaned: str | None = None,
+    budget: Budget | None = None,
 ) -> dict[str, Any]:
-    data = scan_text_for_report(raw)
+    if args.line_ranges is not None:
+        # Markdown structure is a whole-document property, so it is left out.
+        return scan_changed_lines(raw, args.line_ranges.get(path, []))
+    budget = budget or _budget(raw, args)
+    analysis = _analysis(raw, args)
+    data = _run_stage(budget, "confusables", analysis.report)
+    if data is None:
+        analysis = _analysis(raw, args, confusables=False)
+        data = analysis.report()
     if args.metrics:
-        data["metrics"] = compute_metrics(raw)
+        data["metrics"] = analysis.metrics()
     if args.unwrap_markdown or path.lower().endswith((".md", ".markdown", ".mdx")):
-        data["markdown"] = audit_markdown(raw)
+        markdown = _run_stage(budget, "markdown_audit", audit_markdown, raw)
+        if markdown is not None:
+            data["markdown"] = markdown
     if args.source:
-        data["source"] = scan_source(raw, path=None if path == "-" else path)
+        source_path = None if path == "-" else path
+        source = _run_stage(budget, "source_parse", scan_source, raw, None, source_path)
+        if source is None:
+            # Lexical comment and string spans instead of a parse tree.
+            source = scan_source(raw, path=source_path, generic=True)
+        data["source"] = source
+    profile_results = None
     if args.watermark_profile:
-        profile_results = detect_profiles(raw, args.watermark_profile)
+        profile_results = _run_stage(
+            budget, "watermark_profiles", detect_profiles, raw, args.watermark_profile
+        )
+    if profile_results is not None:
         data["known_watermarks"] = profile_results
         for result in profile_results:
             if result["status"] != "detected":
@@ -206,8 +333,16 @@ def _build_report_data(
                     },
                 }
             )
+    authorship_results = None
     if args.authorship_profile:
-        authorship_results = detect_authorship_profiles(raw, args.authorship_profile)
+        authorship_results = _run_stage(
+            budget,
+            "authorship_profiles",
+            detect_authorship_profiles,
+            raw,
+            args.authorship_profile,
+        )
+    if authorship_results is not None:
         data["authorship_signals"] = authorship_results
         for result in authorship_results:
             flagged = [
@@ -250,74 +385,594 @@ def _build_report_data(
                 }
             )
     if cleaned is not None:
-        before_signals = {finding["signal"] for finding in data.get("findings", [])}
-        after_data = scan_text_for_report(cleaned)
-        after_signals = {
-            finding["signal"] for finding in after_data.get("findings", [])
-        }
-        opcodes = difflib.SequenceMatcher(None, raw, cleaned).get_opcodes()
-        data["planned"] = {
-            "changed": cleaned != raw,
-            "before": compute_metrics(raw),
-            "after": compute_metrics(cleaned),
-            "removed_characters": max(0, len(raw) - len(cleaned)),
-            "added_characters": max(0, len(cleaned) - len(raw)),
-            "replacement_spans": sum(tag == "replace" for tag, *_ in opcodes),
-            "joined_lines": max(0, len(raw.splitlines()) - len(cleaned.splitlines())),
-            "before_finding_count": sum(
-                finding.get("count", 1) for finding in data.get("findings", [])
-            ),
-            "after_finding_count": sum(
-                finding.get("count", 1) for finding in after_data.get("findings", [])
-            ),
-            "unchanged_findings": sorted(before_signals & after_signals),
-            "resolved_findings": sorted(before_signals - after_signals),
-        }
+        planned = _run_stage(
+            budget, "planned_changes", _planned_changes, analysis, cleaned, data
+        )
+        if planned is not None:
+            data["planned"] = planned
+    skipped = budget.finding() if budget is not None else None
+    if skipped is not None:
+        data["findings"].append(skipped.to_dict())
     return data
 
 
-def _unified_diff(path: str, raw: str, cleaned: str) -> str:
-    return "".join(
-        difflib.unified_diff(
-            raw.splitlines(keepends=True),
-            cleaned.splitlines(keepends=True),
-            fromfile=path,
-            tofile=f"{path} (cleaned)",
+def _planned_changes(
+    analysis: DocumentAnalysis, cleaned: str, data: dict[str, Any]
+) -> dict[str, Any]:
+    # The cleaned text is analysed from the blocks cleaning actually changed.
+    after = analysis.after(cleaned)
+    raw = analysis.text
+    before_findings = data.get("findings", [])
+    after_findings = after.report().get("findings", [])
+    before_signals = {finding["signal"] for finding in before_findings}
+    after_signals = {finding["signal"] for finding in after_findings}
+    return {
+        "changed": cleaned != raw,
+        "before": analysis.metrics(),
+        "after": after.metrics(),
+        "removed_characters": max(0, len(raw) - len(cleaned)),
+        "added_characters": max(0, len(cleaned) - len(raw)),
+        "replacement_spans": replacement_spans(raw, cleaned),
+        "joined_lines": max(0, len(raw.splitlines()) - len(cleaned.splitlines())),
+        "before_finding_count": sum(
+            finding.get("count", 1) for finding in before_findings
+        ),
+        "after_finding_count": sum(
+            finding.get("count", 1) for finding in after_findings
+        ),
+        "unchanged_findings": sorted(before_signals & after_signals),
+        "resolved_findings": sorted(before_signals - after_signals),
+    }
+
+
+def _csv_writer(
+    args: argparse.Namespace, file: TextIO | None = None
+) -> CsvReportWriter:
+    """Fix CSV columns from the options; an empty document has every scalar key."""
+    planned = (
+        _planned_changes(DocumentAnalysis(""), "", {"findings": []})
+        if args.dry_run
+        else {}
+    )
+    return CsvReportWriter(
+        file or sys.stdout,
+        metric_keys=scalar_keys(compute_metrics("")) if args.metrics else [],
+        planned_keys=scalar_keys(planned),
+        before_after_keys=scalar_keys(planned.get("before") or {}),
+    )
+
+
+def _unified_diff(path: str, raw: str, cleaned: str) -> Iterator[str]:
+    return unified_diff(
+        raw.splitlines(keepends=True),
+        cleaned.splitlines(keepends=True),
+        fromfile=path,
+        tofile=f"{path} (cleaned)",
+    )
+
+
+# Options that change the report produced for identical content.
+_REPORT_OPTIONS = (
+    "invisible",
+    "preserve_default_ignorables",
+    "keep_smart_quotes",
+    "keep_dashes",
+    "keep_fullwidth_brackets",
+    "no_newline",
+    "strip_provenance",
+    "unwrap_markdown",
+    "source",
+    "metrics",
+    "dry_run",
+    "max_file_bytes",
+)
+
+
+def _profile_fingerprints(args: argparse.Namespace) -> list[list[str | None]]:
+    return [
+        [kind, path, file_fingerprint(path)]
+        for kind, paths in (
+            ("watermark", args.watermark_profile),
+            ("authorship", args.authorship_profile),
         )
+        for path in paths
+    ]
+
+
+def _report_cache(args: argparse.Namespace) -> ResultCache | None:
+    # A diff needs the cleaned text itself, which is not worth storing, and a
+    # changed-lines result depends on the diff as well as the content.
+    if args.no_cache or args.diff or args.line_ranges is not None:
+        return None
+    return ResultCache(
+        args.cache_dir or default_cache_dir(),
+        version=_package_version(),
+        configuration={
+            "options": {name: getattr(args, name) for name in _REPORT_OPTIONS},
+            "profiles": _profile_fingerprints(args),
+        },
     )
 
 
-def run_report(files: list[str], args: argparse.Namespace) -> int:
-    results: dict[str, dict[str, Any]] = {}
-    threshold_hit = False
+# Options that steer how a run executes or logs, never what a file's result is.
+_RUN_ONLY_OPTIONS = frozenset(
+    {
+        "infile",
+        "recursive",
+        "include",
+        "exclude",
+        "files_from",
+        "null",
+        "git_changed",
+        "jobs",
+        "scan_workers",
+        "cache_dir",
+        "no_cache",
+        "incremental",
+        "state_file",
+        "skip_unchanged",
+        "force_write",
+        "bulk_sync",
+        "watch",
+        "debounce",
+        "poll",
+        "profile_out",
+        "profile_mode",
+        "quiet",
+        "no_color",
+        "metrics_help",
+    }
+)
+
+
+def _incremental_state(args: argparse.Namespace) -> IncrementalState | None:
+    if not args.incremental:
+        return None
+    options = {
+        name: value
+        for name, value in sorted(vars(args).items())
+        if name not in _RUN_ONLY_OPTIONS
+    }
+    configuration = json.dumps(
+        {
+            "version": _package_version(),
+            "options": options,
+            "profiles": _profile_fingerprints(args),
+        },
+        sort_keys=True,
+    )
+    return IncrementalState(
+        args.state_file or default_state_path(),
+        options=hashlib.sha256(configuration.encode()).hexdigest(),
+    )
+
+
+def _unchanged(
+    path: str, args: argparse.Namespace, state: IncrementalState | None
+) -> bool:
+    if state is None or path == "-":
+        return False
+    # A cleanup whose output file has gone must run again to recreate it.
+    if not (args.report or args.temp or os.path.exists(_output_path(path, args))):
+        return False
+    return state.unchanged(path)
+
+
+def _log_incremental_summary(state: IncrementalState) -> None:
+    stats = state.stats
+    log(
+        f"[i] Incremental: {stats['skipped']} unchanged file(s) skipped, "
+        f"{stats['processed']} processed, "
+        f"about {stats['saved_seconds']:.1f}s saved"
+    )
+
+
+def _log_cache_summary(cache: ResultCache) -> None:
+    hits, misses = cache.stats["hits"], cache.stats["misses"]
+    if not hits + misses:
+        return
+    saved = cache.stats["bytes_saved"]
+    log(
+        f"[i] Cache: {hits} hit(s), {misses} miss(es) "
+        f"({hits / (hits + misses):.0%} hit rate), "
+        f"{saved:,} byte(s) not rescanned"
+    )
+
+
+# Per-process state for the ``_*_task`` functions run through ordered_map: the
+# options travel once per worker rather than once per file.
+_TASK_STATE: dict[str, Any] = {}
+
+
+def _init_tasks(args: argparse.Namespace) -> None:
+    log._quiet = bool(args.quiet)
+    _TASK_STATE["args"] = args
+    _TASK_STATE["cache"] = (
+        _report_cache(args) if args.report and not args.fail_fast else None
+    )
+    _TASK_STATE["blobs"] = None
+
+
+def _read_input(path: str) -> str:
+    """Read a task's input: the working tree, or the index for --git-staged."""
+    if not _TASK_STATE["args"].git_staged:
+        return _read_text(path)
+    if _TASK_STATE["blobs"] is None:
+        # One long-lived cat-file process per worker serves all its files.
+        _TASK_STATE["blobs"] = BlobReader()
+    return _TASK_STATE["blobs"].staged(path).decode("utf-8", "strict")
+
+
+def _close_tasks() -> None:
+    blobs = _TASK_STATE.pop("blobs", None)
+    if blobs is not None:
+        blobs.close()
+
+
+def _jobs(files: Iterable[Any], args: argparse.Namespace) -> int:
+    # Standard input can only be read by this process, whatever else a walk or
+    # file list adds, and a pool is not worth starting for one named file; a
+    # directory walk or an archive may be any size.
+    if "-" in args.infile:
+        return 1
+    if isinstance(files, list) and (
+        "-" in files
+        or (len(files) < 2 and not (args.report and any(map(is_archive, files))))
+    ):
+        return 1
+    return args.jobs
+
+
+def _map_files(
+    task: Callable[[Any], Any],
+    items: Iterable[Any],
+    args: argparse.Namespace,
+    *,
+    jobs: int,
+) -> Iterator[tuple[Any, Any]]:
+    """Yield ``(item, task(item))`` in input order without listing *items*."""
+    listed, dispatched = tee(items)
+    results = ordered_map(
+        task, dispatched, jobs=jobs, initializer=_init_tasks, initargs=(args,)
+    )
+    try:
+        yield from zip(listed, results)
+    finally:
+        results.close()
+
+
+# A report input: a path, or an archive member's ``(label, text)``, or the
+# archive's ``(path, error)`` when it could not be read.
+# A path, an archive member's (label, text or read error), or the (path,
+# report) of a file --incremental found unchanged.
+ReportItem = str | tuple[str, str | Exception | dict[str, Any]]
+
+
+def _item_path(item: ReportItem) -> str:
+    return item if isinstance(item, str) else item[0]
+
+
+def _read_item(item: ReportItem) -> str:
+    if isinstance(item, str):
+        return _read_input(item)
+    if isinstance(item[1], Exception):
+        raise item[1]
+    return item[1]
+
+
+def _archive_members(
+    files: Iterable[ReportItem], args: argparse.Namespace, stats: Counter[str]
+) -> Iterator[ReportItem]:
+    """Replace each archive among *files* with its text members, streamed."""
     for path in files:
-        try:
-            raw = _read_text(path)
-            cleaned = _clean_content(raw, args, path) if args.dry_run else None
-            data = _build_report_data(raw, args, path=path, cleaned=cleaned)
-        except (OSError, UnicodeError, ValueError, TypeError, RuntimeError) as exc:
-            log(f"[x] Failed to inspect {path}: {exc}")
-            return 1
-        key = args.label or path
-        results[key] = data
         if (
-            args.threshold is not None
-            and _category_total(data, args.threshold_category) >= args.threshold
+            not isinstance(path, str)
+            or path == "-"
+            or args.git_staged
+            or not is_archive(path)
         ):
-            threshold_hit = True
-        if not args.json and not args.csv:
-            print_human(key, data, no_color=args.no_color)
-            if args.diff and cleaned is not None:
-                sys.stdout.write(_unified_diff(key, raw, cleaned))
+            yield path
+            continue
+        stats["archives"] += 1
+        try:
+            for name, text in text_members(path, stats):
+                yield f"{path}{MEMBER_SEPARATOR}{name}", text
+        except (OSError, ValueError) as exc:
+            yield path, exc
+
+
+def _log_archives(stats: Counter[str]) -> None:
+    if not stats["archives"]:
+        return
+    log(
+        f"[i] Archives: {stats['members']} member(s) from {stats['archives']} "
+        f"archive(s); skipped {stats['binary']} binary, {stats['large']} over "
+        f"the size limit, {stats['special']} non-regular, "
+        f"{stats['encrypted']} encrypted, {stats['unsupported']} unsupported"
+    )
+
+
+def _identifier_task(
+    entry: tuple[str, str, os.stat_result],
+) -> list[tuple[str, int, int]]:
+    path = entry[0]
+    return source_identifiers(_read_text(path), path=path)
+
+
+def _index_identifiers(
+    files: list[str], index: IdentifierIndex, args: argparse.Namespace
+) -> None:
+    """Bring *index* up to date for every named file before any is reported."""
+    # A deleted or renamed file must not keep colliding with the files left.
+    removed = [path for path in index.paths() if not os.path.lexists(path)]
+    for path in removed:
+        index.forget(path)
+    stale = []
+    for path in dict.fromkeys(files):
+        if path == "-" or is_archive(path):
+            continue
+        stat = os.stat(path)
+        absolute = os.path.abspath(path)
+        if not index.is_current(absolute, stat.st_size, stat.st_mtime_ns):
+            stale.append((path, absolute, stat))
+    found = _map_files(_identifier_task, stale, args, jobs=_jobs(stale, args))
+    with closing(found):
+        for (_, absolute, stat), identifiers in found:
+            index.update(
+                absolute, identifiers, size=stat.st_size, mtime_ns=stat.st_mtime_ns
+            )
+    log(
+        f"[i] Identifier index: {len(stale)} of {len(files)} file(s) reindexed"
+        + (f", {len(removed)} removed" if removed else "")
+    )
+
+
+def run_report(
+    files: Iterable[str],
+    args: argparse.Namespace,
+    state: IncrementalState | None = None,
+) -> int:
+    if args.fail_fast:
+        return run_gate(files, args)
+    index = None
+    if args.identifier_index:
+        files = list(files)
+        try:
+            index = IdentifierIndex(args.identifier_index)
+            _index_identifiers(files, index, args)
+        except (OSError, UnicodeError, ValueError, sqlite3.Error) as exc:
+            log(f"[x] Failed to index identifiers: {exc}")
+            return 1
+    try:
+        return _run_report(files, args, index, state)
+    finally:
+        if index is not None:
+            index.close()
+
+
+def _report_task(
+    item: ReportItem,
+) -> tuple[
+    dict[str, Any] | None, Iterable[str] | None, Counter, FileState | None, float
+]:
+    """Report one file or archive member.
+
+    Returns ``(data, diff lines, cache stats, file state, seconds)``; ``data``
+    is ``None`` on error and the file state is only taken for --incremental.
+    In-process the diff is generated as it is written, in a worker it is a list.
+    """
+    args = _TASK_STATE["args"]
+    if not isinstance(item, str) and isinstance(item[1], dict):
+        return item[1], None, Counter(), None, 0.0
+    cache: ResultCache | None = _TASK_STATE["cache"]
+    before = Counter(cache.stats) if cache is not None else Counter()
+    started = time.perf_counter()
+    path = _item_path(item)
+    file_state = None
+    if args.incremental and isinstance(item, str) and path != "-":
+        file_state = FileState.of(path)
+    try:
+        raw = _read_item(item)
+        cleaned = None
+        data = None
+        if cache is not None:
+            entry = cache.key(raw, os.path.splitext(path)[1].lower())
+            data = cache.get(entry, size=len(raw.encode("utf-8", "surrogatepass")))
+        if data is None:
+            budget = _budget(raw, args)
+            if args.dry_run:
+                cleaned = _run_stage(
+                    budget, "clean_preview", _clean_content, raw, args, path
+                )
+            data = _build_report_data(
+                raw, args, path=path, cleaned=cleaned, budget=budget
+            )
+            # A timeout depends on the machine's load; try again next run.
+            if cache is not None and not (budget is not None and budget.timed_out):
+                cache.put(entry, data)
+    except (OSError, UnicodeError, ValueError, TypeError, RuntimeError) as exc:
+        log(f"[x] Failed to inspect {path}: {exc}")
+        return None, None, Counter(), None, 0.0
+    diff = None
+    if args.diff and cleaned is not None:
+        diff = _unified_diff(_report_key(item, args), raw, cleaned)
+        if multiprocessing.parent_process() is not None:
+            diff = list(diff)
+    stats = cache.stats - before if cache is not None else Counter()
+    return data, diff, stats, file_state, time.perf_counter() - started
+
+
+def _report_key(item: ReportItem, args: argparse.Namespace) -> str:
+    # --label names standard input; archive members keep their own labels.
+    return (args.label or item) if isinstance(item, str) else item[0]
+
+
+def _replayed(
+    files: Iterable[str], args: argparse.Namespace, state: IncrementalState | None
+) -> Iterator[ReportItem]:
+    """Pair each unchanged file with its recorded report, in input order."""
+    for path in files:
+        # A dry-run diff is written out, not recorded, so it has to run again.
+        if state is None or path == "-" or args.diff:
+            yield path
+            continue
+        data = state.replay(path)
+        yield path if data is None else (path, data)
+
+
+def _run_report(
+    files: Iterable[str],
+    args: argparse.Namespace,
+    index: IdentifierIndex | None,
+    state: IncrementalState | None,
+) -> int:
+    cache = _report_cache(args)
+    results: dict[str, dict[str, Any]] = {}
+    csv_writer = _csv_writer(args) if args.csv else None
+    threshold_hit = False
+    files_reported = files_over_threshold = 0
+    archives: Counter[str] = Counter()
+    items = _replayed(files, args, state)
+    if args.line_ranges is None:
+        items = _archive_members(items, args, archives)
+    reports = _map_files(_report_task, items, args, jobs=_jobs(files, args))
+    with closing(reports):
+        for item, (data, diff, stats, file_state, elapsed) in reports:
+            path = item if isinstance(item, str) else None
+            if data is None:
+                if state is not None and path is not None:
+                    state.record(path, None, 1, 0.0)
+                return 1
+            if cache is not None:
+                cache.stats.update(stats)
+            if index is not None and path is not None and path != "-":
+                # Collisions depend on the other files, so they are never cached.
+                finding = collision_finding(index.collisions(os.path.abspath(path)))
+                if finding is not None:
+                    data = {**data, "findings": [*data["findings"], finding.to_dict()]}
+            key = _report_key(item, args)
+            files_reported += 1
+            over = (
+                args.threshold is not None
+                and _category_total(data, args.threshold_category) >= args.threshold
+            )
+            threshold_hit |= over
+            files_over_threshold += over
+            if state is not None and path is not None and path != "-":
+                state.record(path, file_state, int(over), elapsed, data)
+            if args.ndjson:
+                print_ndjson({"type": "file", "file": key, "report": data})
+            elif csv_writer is not None:
+                csv_writer.write(key, data)
+            elif args.json:
+                results[key] = data
+            else:
+                print_human(key, data, no_color=args.no_color)
+                if diff is not None:
+                    sys.stdout.writelines(diff)
+    _log_archives(archives)
+    if state is not None:
+        _log_incremental_summary(state)
     if args.json:
         print_json(results)
-    elif args.csv:
-        print_csv(results)
+    if cache is not None:
+        if cache.stats["stores"]:
+            cache.prune()
+        _log_cache_summary(cache)
+    if args.ndjson:
+        print_ndjson(
+            {
+                "type": "summary",
+                "files": files_reported,
+                "threshold": args.threshold,
+                "threshold_categories": sorted(args.threshold_category or ()),
+                "files_over_threshold": files_over_threshold,
+                "threshold_hit": threshold_hit,
+                "cache": dict(cache.stats) if cache is not None else None,
+                "shard": str(args.shard) if args.shard else None,
+            }
+        )
     if args.exit_zero:
         return 0
     return int(threshold_hit)
 
 
+def _gate_total(raw: str, args: argparse.Namespace, limit: int, path: str = "-") -> int:
+    """Count selected findings for --fail-fast, stopping once *limit* is met."""
+    if args.line_ranges is not None:
+        # Only the added lines count, exactly as the report would show them.
+        data = scan_changed_lines(raw, args.line_ranges.get(path, []))
+        return _category_total(data, args.threshold_category)
+    wanted = set(args.threshold_category or ())
+    total = count_findings(raw, wanted, limit=limit)
+    if (
+        total < limit
+        and args.watermark_profile
+        and (not wanted or "known_watermark" in wanted)
+    ):
+        total += sum(
+            result["status"] == "detected"
+            for result in detect_profiles(raw, args.watermark_profile)
+        )
+    if (
+        total < limit
+        and args.authorship_profile
+        and (not wanted or "authorship_signal" in wanted)
+    ):
+        total += sum(
+            bool(segment["flagged"])
+            for result in detect_authorship_profiles(raw, args.authorship_profile)
+            for segment in result.get("segments", [])
+        )
+    return total
+
+
+def _gate_task(item: ReportItem) -> int | None:
+    args = _TASK_STATE["args"]
+    try:
+        return _gate_total(_read_item(item), args, args.threshold, _item_path(item))
+    except (OSError, UnicodeError, ValueError, TypeError, RuntimeError) as exc:
+        log(f"[x] Failed to inspect {_item_path(item)}: {exc}")
+        return None
+
+
+def run_gate(files: Iterable[str], args: argparse.Namespace) -> int:
+    """Stop at the first input whose selected finding total meets --threshold."""
+    summary: dict[str, Any] = {
+        "threshold": args.threshold,
+        "categories": sorted(args.threshold_category or ()),
+        "files_scanned": 0,
+        "tripped_by": None,
+        "total": None,
+    }
+    # Leaving the loop early cancels every queued file that has not started.
+    archives: Counter[str] = Counter()
+    items = _archive_members(files, args, archives)
+    totals = _map_files(_gate_task, items, args, jobs=_jobs(files, args))
+    with closing(totals):
+        for item, total in totals:
+            if total is None:
+                return 1
+            summary["files_scanned"] += 1
+            if total >= args.threshold:
+                summary["tripped_by"] = _report_key(item, args)
+                summary["total"] = total
+                log(
+                    f"[x] Threshold reached by {summary['tripped_by']}; skipped the rest"
+                )
+                break
+    _log_archives(archives)
+    if args.ndjson:
+        print_ndjson({"type": "gate", **summary})
+    elif args.json:
+        print_json({"gate": summary})
+    else:
+        print_gate(summary, no_color=args.no_color)
+    if args.exit_zero:
+        return 0
+    return int(summary["tripped_by"] is not None)
+
+
 def run_filter_mode(args: argparse.Namespace) -> None:
     raw = sys.stdin.read()
     cleaned = _clean_content(raw, args)
@@ -335,7 +990,9 @@ def run_filter_mode(args: argparse.Namespace) -> None:
 def _side_report(path: str, raw: str, args: argparse.Namespace) -> int:
     data = _build_report_data(raw, args, path=path)
     target = args.label or path
-    if args.json:
+    if args.ndjson:
+        print_ndjson({"type": "file", "file": target, "report": data}, file=sys.stderr)
+    elif args.json:
         print_json({target: data}, file=sys.stderr)
     elif args.csv:
         print_csv({target: data}, file=sys.stderr)
@@ -346,40 +1003,552 @@ def _side_report(path: str, raw: str, args: argparse.Namespace) -> int:
     return int(_category_total(data, args.threshold_category) >= args.threshold)
 
 
-def process_file(infile: str, args: argparse.Namespace) -> int:
+def _clean_task(
+    entry: tuple[str, bool],
+) -> tuple[int, bool, Staged | PendingWrite | None, FileState | None, float] | None:
+    """Clean one input.
+
+    Returns ``(exit code, unchanged, staged replacement or pending output,
+    file state, seconds)``; duplicates return ``None``.  The file state is
+    only taken for --incremental, after an in-place write and otherwise before
+    reading; a staged --bulk-sync replacement is measured once it is committed.
+    """
+    infile, duplicate = entry
+    if duplicate:
+        return None
+    args = _TASK_STATE["args"]
+    started = time.perf_counter()
+    tracked = args.incremental and infile != "-"
+    file_state = FileState.of(infile) if tracked and not args.temp else None
+    code, unchanged, staged = _process_file(infile, args)
+    if tracked and args.temp and staged is None:
+        file_state = FileState.of(infile)
+    return code, unchanged, staged, file_state, time.perf_counter() - started
+
+
+# Inputs remembered for duplicate detection.  Sorted input repeats a path
+# adjacently, so the bounded window still finds every duplicate in it.
+_DUPLICATE_WINDOW = 1 << 16
+
+
+def _mark_duplicates(
+    files: Iterable[str], window: int = _DUPLICATE_WINDOW
+) -> Iterator[tuple[str, bool]]:
+    recent: OrderedDict[str, None] = OrderedDict()
+    for infile in files:
+        duplicate = infile in recent
+        if duplicate:
+            recent.move_to_end(infile)
+        else:
+            recent[infile] = None
+            if len(recent) > window:
+                recent.popitem(last=False)
+        yield infile, duplicate
+
+
+# Default cleanup outputs and preserved backups, which a cleanup walk that
+# writes them must not feed back into the next run.
+_CLEAN_OUTPUTS = ("*.clean", "*.clean.*")
+_BACKUPS = ("*.tmp", "*.tmp.[0-9]*")
+
+
+def _walk_excludes(args: argparse.Namespace) -> list[str]:
+    """Exclude patterns for a walk, skipping the files this run itself writes."""
+    excludes = list(args.exclude)
+    if args.report:
+        return excludes
+    if not (args.temp or args.output or args.output_dir):
+        excludes[:0] = _CLEAN_OUTPUTS
+    if args.preserve_tmp:
+        excludes[:0] = _BACKUPS
+    return excludes
+
+
+def _open_file_list(
+    args: argparse.Namespace,
+) -> contextlib.AbstractContextManager[IO[Any] | None]:
+    name = args.files_from or args.diff_hunks
+    if not name:
+        return contextlib.nullcontext(None)
+    if name == "-":
+        return contextlib.nullcontext(getattr(sys.stdin, "buffer", sys.stdin))
+    return open(name, "rb")
+
+
+def _git_inputs(args: argparse.Namespace) -> list[str]:
+    files, stats = changed_files(args.git_changed, staged=args.git_staged)
+    source = "staged" if args.git_staged else f"changed since {args.git_changed}"
+    log(
+        f"[i] Git: {stats['files']} file(s) {source}; skipped {stats['binary']} "
+        f"binary, {stats['special']} submodule or symlink"
+    )
+    if args.changed_lines:
+        args.line_ranges = changed_line_ranges(args.git_changed, staged=args.git_staged)
+        # A file whose changes are all deletions has no lines left to scan.
+        files = [path for path in files if path in args.line_ranges]
+    return files
+
+
+def _hunk_inputs(args: argparse.Namespace, diff: IO[Any]) -> list[str]:
+    lines = (os.fsdecode(line) if isinstance(line, bytes) else line for line in diff)
+    args.line_ranges = parse_unified_diff(lines)
+    log(f"[i] Diff: {len(args.line_ranges)} file(s) with added lines")
+    return list(args.line_ranges)
+
+
+def _inputs(args: argparse.Namespace, file_list: IO[Any] | None) -> Iterable[str]:
+    if args.git_changed or args.git_staged:
+        return _git_inputs(args)
+    if args.diff_hunks:
+        return _hunk_inputs(args, file_list)
+    roots: Iterable[str] = args.infile
+    if file_list is not None:
+        roots = chain(args.infile, read_file_list(file_list, null=args.null))
+    if not args.recursive:
+        return roots
+    return Walker(
+        roots,
+        include=args.include,
+        exclude=_walk_excludes(args),
+        archives=bool(args.report) and not args.diff_hunks,
+    )
+
+
+def _log_walk(files: Iterable[str]) -> None:
+    if not isinstance(files, Walker):
+        return
+    stats = files.stats
+    log(
+        f"[i] Walked {stats['files']} file(s); skipped {stats['ignored']} ignored, "
+        f"{stats['excluded']} excluded, {stats['binary']} binary, "
+        f"{stats['unreadable']} unreadable"
+    )
+
+
+def _output_path(infile: str, args: argparse.Namespace) -> str:
+    if args.output:
+        return args.output
+    if args.output_dir:
+        return mirror_path(infile, args.output_dir)
+    base, extension = os.path.splitext(infile)
+    return f"{base}.clean{extension}"
+
+
+def _skips_unchanged(args: argparse.Namespace) -> bool:
+    """In-place cleanup skips identical rewrites unless --force-write is given."""
+    return not args.force_write and (args.temp or args.skip_unchanged)
+
+
+def _process_file(
+    infile: str, args: argparse.Namespace
+) -> tuple[int, bool, Staged | PendingWrite | None]:
+    """Clean one file.
+
+    Returns the exit code, whether the write was skipped, and, for
+    --bulk-sync, the staged replacement that the caller must commit or, for
+    --output-dir, the output that the caller must write.
+    """
+    unchanged = False
+    staged = None
     try:
         raw = _read_text(infile)
         eol = _detect_eol(raw)
         cleaned = _clean_content(raw, args, infile)
 
         if args.temp:
+            # raw keeps its original newlines, so this is a byte comparison.
+            unchanged = _skips_unchanged(args) and _with_eol(cleaned, eol) == raw
             parent = os.path.dirname(infile) or "."
-            if not (os.access(infile, os.W_OK) and os.access(parent, os.W_OK)):
+            if unchanged:
+                log(f"[i] Unchanged, not rewritten: {infile}")
+            elif not (os.access(infile, os.W_OK) and os.access(parent, os.W_OK)):
                 log(f"[x] In-place edit requires write permission: {infile}")
-                return 1
-            backup = _preserve_backup(infile) if args.preserve_tmp else None
-            _atomic_replace_text(infile, cleaned, eol)
-            log(f"[ok] Cleaned (in-place): {infile}")
-            if backup is not None:
-                log(f"[i] Preserved temp file: {backup}")
+                return 1, False, None
+            else:
+                sync = not args.bulk_sync
+                backup = (
+                    _preserve_backup(infile, sync=sync) if args.preserve_tmp else None
+                )
+                temporary = _write_temporary(infile, cleaned, eol, sync=sync)
+                if args.bulk_sync:
+                    staged = Staged(infile, temporary, backup)
+                else:
+                    _replace(temporary, infile)
+                    _log_in_place(infile, backup)
         else:
             if args.output == "-":
                 sys.stdout.write(cleaned)
-                return 0
-            if args.output:
-                outfile = args.output
+                return 0, False, None
+            outfile = _output_path(infile, args)
+            unchanged = _skips_unchanged(args) and _same_content(
+                outfile, _with_eol(cleaned, eol)
+            )
+            if unchanged:
+                log(f"[i] Output already current, not rewritten: {outfile}")
+            elif args.output_dir:
+                if os.path.abspath(outfile) == os.path.abspath(infile):
+                    raise ValueError("--output-dir would overwrite the input")
+                staged = PendingWrite(
+                    infile,
+                    outfile,
+                    _with_eol(cleaned, eol).encode("utf-8", "strict"),
+                    os.stat(infile).st_mode & 0o7777,
+                )
             else:
-                base, extension = os.path.splitext(infile)
-                outfile = f"{base}.clean{extension}"
-            _write_text(outfile, cleaned, eol)
-            log(f"[ok] Cleaned: {infile} -> {outfile}")
-        return _side_report(infile, raw, args) if args.metrics else 0
+                _write_text(outfile, cleaned, eol)
+                log(f"[ok] Cleaned: {infile} -> {outfile}")
+        code = _side_report(infile, raw, args) if args.metrics else 0
+        return code, unchanged, staged
     except UnicodeDecodeError as exc:
         log(f"[x] {infile} is not strict UTF-8: {exc}")
-        return 1
     except (OSError, UnicodeError, ValueError, TypeError, RuntimeError) as exc:
         log(f"[x] Failed to process {infile}: {exc}")
+    if isinstance(staged, Staged):
+        discard(staged)
+    return 1, False, None
+
+
+def process_file(infile: str, args: argparse.Namespace) -> int:
+    code, _, staged = _process_file(infile, args)
+    if isinstance(staged, PendingWrite):
+        writer = OutputWriter(threads=1)
+        try:
+            writer.write(staged)
+        except OSError as exc:
+            log(f"[x] Failed to process {infile}: {exc}")
+            return 1
+        finally:
+            writer.close()
+        log(f"[ok] Cleaned: {infile} -> {staged.target}")
+    elif staged is not None:
+        batch = ReplaceBatch()
+        batch.add(staged)
+        ((_, error),) = batch.commit()
+        if error is not None:
+            log(f"[x] Failed to process {infile}: {error}")
+            return 1
+        _log_in_place(infile, staged.backup)
+    return code
+
+
+def _log_in_place(infile: str, backup: str | None) -> None:
+    log(f"[ok] Cleaned (in-place): {infile}")
+    if backup is not None:
+        log(f"[i] Preserved temp file: {backup}")
+
+
+def _committed(
+    batch: ReplaceBatch,
+    waiting: dict[str, tuple[int, float]],
+    args: argparse.Namespace,
+) -> Iterator[tuple[str, int, bool, FileState | None, float]]:
+    for staged, error in batch.commit():
+        code, elapsed = waiting.pop(staged.temporary)
+        if error is not None:
+            log(f"[x] Failed to process {staged.path}: {error}")
+            yield staged.path, 1, False, None, elapsed
+            continue
+        _log_in_place(staged.path, staged.backup)
+        file_state = FileState.of(staged.path) if args.incremental else None
+        yield staged.path, code, False, file_state, elapsed
+
+
+def _written(
+    results: Iterable[tuple[tuple[PendingWrite, int, FileState | None, float], Any]],
+) -> Iterator[tuple[str, int, bool, FileState | None, float]]:
+    for (write, code, file_state, elapsed), error in results:
+        if error is not None:
+            log(f"[x] Failed to process {write.source}: {error}")
+            yield write.source, 1, False, None, elapsed
+            continue
+        log(f"[ok] Cleaned: {write.source} -> {write.target}")
+        yield write.source, code, False, file_state, elapsed
+
+
+def _cleaned(
+    results: Iterable[tuple[tuple[str, bool], Any]],
+    batch: ReplaceBatch | None,
+    args: argparse.Namespace,
+    writer: OutputWriter | None = None,
+) -> Iterator[tuple[str, int, bool, FileState | None, float]]:
+    """Yield ``(infile, code, unchanged, file state, seconds)`` per input.
+
+    --bulk-sync replacements are held back until their batch is durable, and
+    --output-dir files until *writer* has written them.
+    """
+    waiting: dict[str, tuple[int, float]] = {}
+    for (infile, duplicate), result in results:
+        if duplicate:
+            log(f"[i] Skipping duplicate: {infile}")
+            continue
+        code, unchanged, staged, file_state, elapsed = result
+        if isinstance(staged, PendingWrite):
+            token = staged, code, file_state, elapsed
+            yield from _written(writer.submit(staged, token))
+            continue
+        if staged is None:
+            yield infile, code, unchanged, file_state, elapsed
+            continue
+        waiting[staged.temporary] = code, elapsed
+        if batch.add(staged):
+            yield from _committed(batch, waiting, args)
+    if writer is not None:
+        yield from _written(writer.drain())
+    if batch is not None:
+        yield from _committed(batch, waiting, args)
+
+
+def run_clean(
+    files: Iterable[str],
+    args: argparse.Namespace,
+    state: IncrementalState | None = None,
+) -> int:
+    exit_code = 0
+    written = unchanged_files = 0
+    entries = (
+        (infile, duplicate)
+        for infile, duplicate in _mark_duplicates(files)
+        if duplicate or not _unchanged(infile, args, state)
+    )
+    results = _map_files(_clean_task, entries, args, jobs=_jobs(files, args))
+    batch = ReplaceBatch() if args.bulk_sync else None
+    writer = OutputWriter() if args.output_dir else None
+    try:
+        with closing(results):
+            for infile, code, unchanged, file_state, elapsed in _cleaned(
+                results, batch, args, writer
+            ):
+                exit_code = max(exit_code, code)
+                if unchanged:
+                    unchanged_files += 1
+                elif code == 0:
+                    written += 1
+                if state is not None and infile != "-":
+                    # Failures are forgotten so that the next run retries them.
+                    state.record(
+                        infile, file_state if code == 0 else None, code, elapsed
+                    )
+    finally:
+        if batch is not None:
+            batch.discard()
+        if writer is not None:
+            writer.close()
+    if _skips_unchanged(args) and args.output != "-":
+        log(
+            f"[i] Unchanged: {unchanged_files} file(s) left as they were, "
+            f"{written} written"
+        )
+    if state is not None:
+        _log_incremental_summary(state)
+    return exit_code
+
+
+def _stat_key(path: str) -> tuple[int, int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    """Report or clean the files below the inputs each time some of them change.
+
+    The process stays up between batches, so the cleaners, profiles, result
+    cache, and incremental state stay warm.
+    """
+    walker = Walker(
+        args.infile,
+        include=args.include,
+        exclude=_walk_excludes(args),
+        archives=bool(args.report),
+    )
+    descend = functools.partial(walker.selects, directory=True)
+    try:
+        state = _incremental_state(args)
+    except (OSError, sqlite3.Error) as exc:
+        log(
+            f"[x] Cannot open state file {args.state_file or default_state_path()}: {exc}"
+        )
+        return 1
+    # What each file looked like when it was last read, or for a cleanup
+    # after it was written: the events of our own in-place writes arrive in
+    # the next batch and must not run it again.
+    processed: dict[str, tuple[int, int, int] | None] = {}
+    sequence = 0
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        watcher = open_watcher(args.infile, descend, poll=args.poll)
+    except OSError as exc:
+        log(f"[x] Cannot watch: {exc}")
+        return 1
+    print_ndjson(
+        {"type": "watch", "backend": watcher.backend, "watches": watcher.watches}
+    )
+    try:
+        for changed in batches(watcher, args.debounce):
+            files = [
+                path
+                for path in changed
+                if processed.get(path) != _stat_key(path) and walker.selects(path)
+            ]
+            if not files:
+                continue
+            sequence += 1
+            print_ndjson({"type": "change", "sequence": sequence, "files": files})
+            if state is not None:
+                state.stats.clear()
+            started = time.perf_counter()
+            if args.report:
+                processed.update((path, _stat_key(path)) for path in files)
+                exit_code = run_report(files, args, state)
+            else:
+                exit_code = run_clean(files, args, state)
+                processed.update((path, _stat_key(path)) for path in files)
+            print_ndjson(
+                {
+                    "type": "done",
+                    "sequence": sequence,
+                    "exit": exit_code,
+                    "seconds": round(time.perf_counter() - started, 3),
+                }
+            )
+    except KeyboardInterrupt:
+        pass
+    except (OSError, sqlite3.Error) as exc:
+        log(f"[x] Watch failed: {exc}")
         return 1
+    finally:
+        watcher.close()
+        if state is not None:
+            state.close()
+    return 0
+
+
+def _daemon_run(message: dict[str, Any]) -> dict[str, Any]:
+    """Run a forwarded command line with its streams, directory, and environment."""
+    argv = [str(argument) for argument in message["argv"]]
+    try:
+        with contextlib.redirect_stderr(io.StringIO()):
+            args = _parser().parse_args(argv)
+    except SystemExit:
+        args = None  # main() reproduces the usage error below.
+    if args is not None and (args.serve or args.watch):
+        # A watch never returns; it runs in the client's own process instead.
+        raise ValueError("--serve and --watch cannot be forwarded to a daemon")
+    reads_stdin = False
+    if args is not None and not args.metrics_help:
+        listed = (
+            args.files_from or args.diff_hunks or args.git_changed or args.git_staged
+        )
+        inputs = args.infile or ([] if listed else ["-"])
+        reads_stdin = "-" in (args.files_from, args.diff_hunks) or (
+            not args.recursive and "-" in inputs
+        )
+    if reads_stdin and "stdin" not in message:
+        return {"ok": True, "need_stdin": True}
+    streams = sys.stdin, sys.stdout, sys.stderr
+    environment = dict(os.environ)
+    directory = os.getcwd()
+    stdout, stderr = io.StringIO(), io.StringIO()
+    sys.stdin = io.StringIO(message.get("stdin", ""))
+    sys.stdout, sys.stderr = stdout, stderr
+    code: int | str | None = 0
+    try:
+        if "env" in message:
+            forwarded = message["env"] or {}
+            for name in FORWARDED_ENVIRONMENT:
+                if name in forwarded:
+                    os.environ[name] = str(forwarded[name])
+                else:
+                    os.environ.pop(name, None)
+        os.chdir(message.get("cwd") or directory)
+        main(argv)
+    except SystemExit as exc:
+        code = exc.code
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = streams
+        os.chdir(directory)
+        os.environ.clear()
+        os.environ.update(environment)
+    if isinstance(code, str):
+        stderr.write(code + "\n")
+        code = 1
+    return {
+        "ok": True,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "exit": code or 0,
+    }
+
+
+def _daemon_request(
+    defaults: dict[str, Any], message: dict[str, Any]
+) -> dict[str, Any]:
+    operation = message.get("op")
+    if operation == "ping":
+        return {"ok": True, "version": _package_version()}
+    if operation == "run":
+        return _daemon_run(message)
+    options = message.get("options") or {}
+    unknown = sorted(set(options) - set(defaults))
+    if unknown:
+        raise ValueError(f"unknown option(s): {', '.join(unknown)}")
+    args = argparse.Namespace(**{**defaults, **options})
+    text = message["text"]
+    path = message.get("path") or "-"
+    if operation == "clean":
+        return {"ok": True, "text": _clean_content(text, args, path)}
+    if operation == "report":
+        return {"ok": True, "report": _build_report_data(text, args, path=path)}
+    if operation == "metrics":
+        return {"ok": True, "metrics": compute_metrics(text)}
+    if operation == "source":
+        source_path = None if path == "-" else path
+        return {
+            "ok": True,
+            "source": scan_source(text, message.get("language"), source_path),
+        }
+    raise ValueError(f"unknown operation: {operation!r}")
+
+
+def run_daemon(args: argparse.Namespace) -> int:
+    path = args.socket or default_socket_path()
+    defaults = vars(_parser().parse_args([]))
+    # Import every lazily loaded dependency and build its tables and compiled
+    # patterns now, so that the first client does not pay for them.
+    sample = "\u201cQuoted\u201d\u200b text \u2014 with a list\n\n- item\n  continued\n"
+    warm = argparse.Namespace(**{**defaults, "metrics": True, "unwrap_markdown": True})
+    _clean_content(sample, warm, "warm.md")
+    _build_report_data(sample, warm, path="warm.md")
+    scan_source("value = 1  # note\n", "python")
+    try:
+        serve(
+            path,
+            functools.partial(_daemon_request, defaults),
+            ready=lambda: log(f"[ok] Serving on {path}"),
+        )
+    except OSError as exc:
+        log(f"[x] Cannot serve on {path}: {exc}")
+        return 1
+    return 0
+
+
+_CATEGORIES = (
+    "provenance",
+    "unicode_security",
+    "known_watermark",
+    "authorship_signal",
+    "typography",
+    "formatting",
+)
+
+
+def _shard_option(text: str) -> Shard:
+    try:
+        return parse_shard(text)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
 
 
 def _parser() -> argparse.ArgumentParser:
@@ -400,6 +1569,11 @@ def _parser() -> argparse.ArgumentParser:
     parser.add_argument("--keep-fullwidth-brackets", action="store_true")
     parser.add_argument("-n", "--no-newline", action="store_true")
     parser.add_argument("-o", "--output", help="Output filename or '-' for stdout")
+    parser.add_argument(
+        "--output-dir",
+        metavar="DIR",
+        help="Write cleaned files below DIR, mirroring the input paths",
+    )
     parser.add_argument(
         "-t", "--temp", action="store_true", help="Atomically clean files in place"
     )
@@ -409,12 +1583,36 @@ def _parser() -> argparse.ArgumentParser:
         action="store_true",
         help="With --temp, preserve the original as an unused .tmp backup name",
     )
+    parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Leave an existing output file untouched when it already holds the "
+        "cleaned text (always on for --temp)",
+    )
+    parser.add_argument(
+        "--force-write",
+        action="store_true",
+        help="Write outputs and rewrite --temp files even when nothing changed",
+    )
+    parser.add_argument(
+        "--bulk-sync",
+        action="store_true",
+        help="With --temp, write temporary files first, then fsync, rename, and "
+        "sync directories once per batch",
+    )
     parser.add_argument("--unwrap-markdown", action="store_true")
     parser.add_argument("--strip-provenance", action="store_true")
     parser.add_argument(
         "--source", action="store_true", help="Use conservative source-code handling"
     )
 
+    parser.add_argument(
+        "--identifier-index",
+        metavar="PATH",
+        help="With --source, keep a SQLite identifier index at PATH and report "
+        "confusable identifiers that collide across files",
+    )
+
     parser.add_argument(
         "--report", action="store_true", help="Audit without changing input"
     )
@@ -424,26 +1622,33 @@ def _parser() -> argparse.ArgumentParser:
         help="Run the requested cleanup in memory and report planned changes",
     )
     parser.add_argument(
-        "--diff", action="store_true", help="With --dry-run, show a unified diff"
+        "--diff",
+        action="store_true",
+        help="With --dry-run, show a unified diff; files over 2000 lines in all "
+        "are aligned in linear time and may place a change among repeated lines "
+        "differently from difflib",
     )
     formats = parser.add_mutually_exclusive_group()
     formats.add_argument("--csv", action="store_true")
     formats.add_argument("--json", action="store_true")
+    formats.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Stream one compact JSON record per file, then a summary record",
+    )
     parser.add_argument("--label")
     parser.add_argument("--threshold", type=int)
     parser.add_argument(
         "--threshold-category",
         action="append",
-        choices=(
-            "provenance",
-            "unicode_security",
-            "known_watermark",
-            "authorship_signal",
-            "typography",
-            "formatting",
-        ),
+        choices=_CATEGORIES,
         help="Count only this category for --threshold; repeatable",
     )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="With --threshold, stop at the first file that reaches it and report only the gate",
+    )
     parser.add_argument(
         "--watermark-profile",
         action="append",
@@ -464,6 +1669,160 @@ def _parser() -> argparse.ArgumentParser:
         help="Include deterministic document metrics; implies report without output options",
     )
     parser.add_argument("--metrics-help", action="store_true")
+    parser.add_argument(
+        "-r",
+        "--recursive",
+        action="store_true",
+        help="Walk directory inputs, honoring .gitignore/.ignore and skipping binary files",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="With --recursive, only take files matching GLOB; repeatable",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="With --recursive, skip files and directories matching GLOB; repeatable",
+    )
+    parser.add_argument(
+        "--files-from",
+        metavar="FILE",
+        help="Also read input paths from FILE, or '-' for stdin, one per line",
+    )
+    parser.add_argument(
+        "-0",
+        "--null",
+        action="store_true",
+        help="With --files-from, paths end in NUL (find -print0, git ls-files -z)",
+    )
+    parser.add_argument(
+        "--git-changed",
+        metavar="REF",
+        help="Take inputs from tracked text files changed in the working tree since REF",
+    )
+    parser.add_argument(
+        "--git-staged",
+        action="store_true",
+        help="Report the staged content of text files changed in the index",
+    )
+    parser.add_argument(
+        "--diff-hunks",
+        metavar="DIFF",
+        help="Report only the added lines of the files in unified diff DIFF ('-' for stdin)",
+    )
+    parser.add_argument(
+        "--changed-lines",
+        action="store_true",
+        help="With --git-changed or --git-staged, report only added lines",
+    )
+    parser.set_defaults(line_ranges=None)
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=default_jobs(),
+        metavar="N",
+        help="Process multiple input files in N worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--scan-workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Scan each document of 4M+ characters in N parallel newline-aligned chunks",
+    )
+    parser.add_argument(
+        "--max-file-bytes",
+        type=int,
+        metavar="N",
+        help="Skip optional report stages for files over N bytes; record skipped_stage",
+    )
+    parser.add_argument(
+        "--stage-timeout",
+        type=float,
+        metavar="SECONDS",
+        help="Abandon an optional report stage after SECONDS; record skipped_stage",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        help="Report result cache location (default: $XDG_CACHE_HOME/unicodefix/reports)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor store cached report results",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip files unchanged since they were last processed with the same options",
+    )
+    parser.add_argument(
+        "--state-file",
+        metavar="PATH",
+        help="Incremental state database (default: $XDG_CACHE_HOME/unicodefix/state.sqlite)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=_shard_option,
+        metavar="INDEX/COUNT",
+        help="Process only shard INDEX (1-based) of COUNT deterministic input shards",
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=("path", "size"),
+        default="path",
+        help="Assign shards by path hash (streamed) or by size-balanced bins",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and report or clean input files again as they change",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEBOUNCE_SECONDS,
+        metavar="SECONDS",
+        help=f"With --watch, wait for SECONDS of quiet (default: {DEBOUNCE_SECONDS})",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, poll file times instead of using inotify",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run a warm daemon answering clean/report/metrics/source requests on a Unix socket",
+    )
+    parser.add_argument(
+        "--client",
+        action="store_true",
+        help="Forward this command to a running --serve daemon; runs in-process when none listens",
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="Daemon socket (default: $UNICODEFIX_SOCKET, else $XDG_RUNTIME_DIR/unicodefix.sock)",
+    )
+    parser.add_argument(
+        "--profile-out",
+        metavar="FILE",
+        help="Profile the run in one process; write pstats to FILE, stacks to FILE.folded",
+    )
+    parser.add_argument(
+        "--profile-mode",
+        choices=("cprofile", "sample"),
+        default="cprofile",
+        help="cProfile plus stack samples, or low-overhead stack samples only in FILE",
+    )
     parser.add_argument("--exit-zero", action="store_true")
     parser.add_argument("--no-color", action="store_true")
     parser.add_argument("-q", "--quiet", action="store_true")
@@ -473,45 +1832,414 @@ def _parser() -> argparse.ArgumentParser:
     return parser
 
 
-def main() -> None:
+def _merge_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cleanup-text merge-reports",
+        description="Combine the --json or --ndjson report outputs of --shard runs.",
+    )
+    parser.add_argument(
+        "reports", nargs="+", help="Shard report files, or - for standard input"
+    )
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Write file records and a summary record instead of one JSON object",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=int,
+        help="Recount threshold hits at this total (default: the shards' own)",
+    )
+    parser.add_argument(
+        "--threshold-category",
+        action="append",
+        choices=_CATEGORIES,
+        help="Count only this category for --threshold; repeatable",
+    )
+    parser.add_argument("--exit-zero", action="store_true")
+    parser.add_argument("-q", "--quiet", action="store_true")
+    return parser
+
+
+def _shard_setting(
+    summaries: list[dict[str, Any]], key: str, normalize: Callable[[Any], Any]
+) -> Any:
+    values = {normalize(summary.get(key)) for summary in summaries}
+    if len(values) > 1:
+        raise ValueError(f"the shards were run with different {key} settings")
+    return values.pop() if values else None
+
+
+def _missing_shards(summaries: list[dict[str, Any]]) -> list[int]:
+    shards = [
+        parse_shard(summary["shard"]) for summary in summaries if summary.get("shard")
+    ]
+    counts = {shard.count for shard in shards}
+    if len(counts) != 1:
+        return []
+    seen = {shard.index for shard in shards}
+    return [index for index in range(1, counts.pop() + 1) if index not in seen]
+
+
+def run_merge_reports(argv: list[str]) -> int:
+    """``cleanup-text merge-reports``: one report from the outputs of shards."""
+    args = _merge_parser().parse_args(argv)
+    log._quiet = bool(args.quiet)
+    try:
+        with contextlib.ExitStack() as stack:
+            streams = [
+                (
+                    name,
+                    (
+                        sys.stdin
+                        if name == "-"
+                        else stack.enter_context(open(name, encoding="utf-8"))
+                    ),
+                )
+                for name in args.reports
+            ]
+            merged = merge_reports(streams)
+        summaries = merged.summaries
+        if args.threshold is None:
+            threshold = _shard_setting(summaries, "threshold", lambda value: value)
+            categories = _shard_setting(
+                summaries, "threshold_categories", lambda value: tuple(value or ())
+            )
+        else:
+            threshold, categories = args.threshold, args.threshold_category
+    except (OSError, UnicodeError, ValueError) as exc:
+        log(f"[x] Cannot merge reports: {exc}")
+        return 1
+    missing = _missing_shards(summaries)
+    if missing:
+        log(
+            f"[x] Cannot merge reports: shard(s) {', '.join(map(str, missing))} missing"
+        )
+        return 1
+    categories = sorted(categories or ())
+    over: Counter[int | None] = Counter()
+    for path, data in merged.reports.items():
+        if threshold is not None and _category_total(data, categories) >= threshold:
+            over[merged.origins.get(path)] += 1
+    files_over_threshold = sum(over.values())
+    for position, summary in enumerate(summaries):
+        # Files an --incremental shard skipped count with their recorded result.
+        same = (
+            summary.get("threshold") == threshold
+            and sorted(summary.get("threshold_categories") or ()) == categories
+        )
+        if same:
+            files_over_threshold += max(
+                0, int(summary.get("files_over_threshold") or 0) - over[position]
+            )
+    cache: Counter[str] = Counter()
+    for summary in summaries:
+        cache.update(summary.get("cache") or {})
+    # Walk order: the path components sort the way the shards walked them.
+    paths = sorted(merged.reports, key=lambda path: path.split(os.sep))
+    if args.ndjson:
+        for path in paths:
+            print_ndjson({"type": "file", "file": path, "report": merged.reports[path]})
+        print_ndjson(
+            {
+                "type": "summary",
+                "files": len(paths),
+                "threshold": threshold,
+                "threshold_categories": categories,
+                "files_over_threshold": files_over_threshold,
+                "threshold_hit": bool(files_over_threshold),
+                "cache": dict(cache) if cache else None,
+                "shard": None,
+            }
+        )
+    else:
+        print_json({path: merged.reports[path] for path in paths})
+    log(f"[i] Merged {len(paths)} file report(s) from {len(args.reports)} input(s)")
+    if args.exit_zero:
+        return 0
+    return int(bool(files_over_threshold))
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["merge-reports"]:
+        raise SystemExit(run_merge_reports(argv[1:]))
     parser = _parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     log._quiet = bool(args.quiet)
+    if args.profile_out is None:
+        if args.profile_mode != "cprofile":
+            parser.error("--profile-mode requires --profile-out")
+        _main(parser, args)
+        return
+    if args.serve:
+        parser.error("--profile-out profiles one command, not a daemon")
+    deterministic = args.profile_mode == "cprofile"
+    if not (deterministic or StackSampler.available):
+        parser.error("--profile-mode sample needs SIGPROF, which this platform lacks")
+    # Worker processes are not profiled, so every file is handled here.
+    args.jobs = args.scan_workers = 1
+    code: int | str | None = 0
+    try:
+        with profiled(args.profile_out, deterministic=deterministic) as profile:
+            try:
+                _main(parser, args)
+            except SystemExit as exc:
+                code = exc.code
+    except OSError as exc:
+        log(f"[x] Cannot write profile {args.profile_out}: {exc}")
+        raise SystemExit(1) from None
+    _log_profile(profile)
+    raise SystemExit(code)
+
 
+def _log_profile(profile: Profile) -> None:
+    written = [f"{profile.stats_path} (pstats)"] if profile.stats_path else []
+    if profile.folded_path is not None:
+        written.append(f"{profile.folded_path} ({profile.samples} stack sample(s))")
+    stages = ", ".join(
+        f"{stage} {seconds:.3f}s" for stage, seconds in profile.stages.items()
+    )
+    log(f"[i] Profile: wrote {' and '.join(written)}; stages: {stages or 'none'}")
+
+
+def _mirrors_into_itself(args: argparse.Namespace) -> bool:
+    """Whether --output-dir lies in a walked input directory or is the tree."""
+    output = os.path.realpath(args.output_dir)
+    if output in (os.path.realpath(os.curdir), os.path.realpath(os.sep)):
+        # Relative or absolute inputs would map onto themselves.
+        return True
+    if not (args.recursive or args.watch):
+        return False
+    for root in args.infile:
+        if root != "-" and os.path.isdir(root):
+            root = os.path.realpath(root)
+            if output == root or output.startswith(root.rstrip(os.sep) + os.sep):
+                return True
+    return False
+
+
+def _main(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    if args.serve:
+        raise SystemExit(run_daemon(args))
     if args.metrics_help:
         print_metrics_help(no_color=args.no_color)
         raise SystemExit(0)
     if args.diff and not args.dry_run:
         parser.error("--diff requires --dry-run")
-    if args.diff and (args.json or args.csv):
-        parser.error("--diff cannot be combined with --json or --csv")
+    if args.diff and (args.json or args.csv or args.ndjson):
+        parser.error("--diff cannot be combined with --json, --ndjson, or --csv")
+    if args.fail_fast and args.threshold is None:
+        parser.error("--fail-fast requires --threshold")
+    if args.fail_fast and (args.csv or args.dry_run):
+        parser.error(
+            "--fail-fast reports only the gate; use --json, --ndjson, or human output"
+        )
+    if args.incremental and args.output == "-":
+        parser.error("--incremental cannot skip output written to standard output")
+    if args.incremental and (args.fail_fast or args.identifier_index):
+        parser.error(
+            "--incremental cannot be combined with --fail-fast or --identifier-index"
+        )
+    if args.state_file and not args.incremental:
+        parser.error("--state-file requires --incremental")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.scan_workers < 1:
+        parser.error("--scan-workers must be at least 1")
+    if args.max_file_bytes is not None and args.max_file_bytes < 0:
+        parser.error("--max-file-bytes cannot be negative")
+    if args.stage_timeout is not None and args.stage_timeout <= 0:
+        parser.error("--stage-timeout must be positive")
+    budgets = args.max_file_bytes is not None or args.stage_timeout is not None
+    if budgets and (args.fail_fast or args.diff_hunks or args.changed_lines):
+        parser.error(
+            "--max-file-bytes and --stage-timeout budget full reports, not "
+            "--fail-fast or changed-line reports"
+        )
+    if args.identifier_index and not args.source:
+        parser.error("--identifier-index requires --source")
+    if args.identifier_index and args.fail_fast:
+        parser.error("--fail-fast does not consult the identifier index")
     if args.source and args.unwrap_markdown:
         parser.error("--source and --unwrap-markdown are separate safety profiles")
-    if args.output and args.output != "-" and len(args.infile) > 1:
+    git_inputs = args.git_changed or args.git_staged
+    if git_inputs and (args.infile or args.files_from or args.recursive):
+        parser.error(
+            "--git-changed and --git-staged replace input files, --files-from, "
+            "and --recursive"
+        )
+    if args.git_changed and args.git_staged:
+        parser.error("choose one of --git-changed and --git-staged")
+    if args.git_staged and (args.output or args.temp):
+        parser.error("--git-staged reads the index and only reports")
+    if args.git_staged and (args.incremental or args.identifier_index):
+        parser.error(
+            "--git-staged cannot use --incremental or --identifier-index, "
+            "which track working-tree files"
+        )
+    if args.diff_hunks and (
+        args.infile or args.files_from or args.recursive or git_inputs
+    ):
+        parser.error("--diff-hunks takes its input files from the diff")
+    if args.changed_lines and not git_inputs:
+        parser.error("--changed-lines requires --git-changed or --git-staged")
+    if (args.diff_hunks or args.changed_lines) and (
+        args.output
+        or args.temp
+        or args.dry_run
+        or args.metrics
+        or args.source
+        or args.incremental
+        or args.watermark_profile
+        or args.authorship_profile
+    ):
+        parser.error(
+            "changed-line reports cover the character scan only; drop output, "
+            "--dry-run, --metrics, --source, --incremental, and profile options"
+        )
+    if args.null and not args.files_from:
+        parser.error("--null requires --files-from")
+    if args.files_from == "-" and "-" in args.infile:
+        parser.error("standard input cannot be both the file list and an input")
+    if args.recursive and not (args.infile or args.files_from):
+        parser.error("--recursive requires at least one directory")
+    if (args.include or args.exclude) and not (args.recursive or args.watch):
+        parser.error("--include and --exclude require --recursive")
+    if (
+        args.output
+        and args.output != "-"
+        and (len(args.infile) > 1 or args.recursive or args.files_from)
+    ):
         parser.error("--output with a filename accepts one input file")
-    if args.dry_run and (args.output or args.temp):
+    if args.bulk_sync and not args.temp:
+        parser.error("--bulk-sync requires --temp")
+    if args.skip_unchanged and args.force_write:
+        parser.error("--skip-unchanged and --force-write are contradictory")
+    if args.skip_unchanged and args.output == "-":
+        parser.error("--skip-unchanged compares against an output file, not stdout")
+    if args.dry_run and (args.output or args.output_dir or args.temp):
         parser.error("--dry-run never accepts output or in-place write options")
-    if args.metrics and not (args.output or args.temp):
+    if args.output_dir and (args.output or args.temp):
+        parser.error("--output-dir cannot be combined with --output or --temp")
+    if args.output_dir and (
+        "-" in args.infile or not (args.infile or args.files_from or git_inputs)
+    ):
+        parser.error("--output-dir mirrors named input files, not standard input")
+    if args.output_dir and _mirrors_into_itself(args):
+        parser.error("--output-dir cannot be inside a directory it mirrors")
+    if args.shard and (args.watch or not (args.infile or args.files_from)):
+        parser.error("--shard splits named input files and directories")
+    if args.shard_by != "path" and not args.shard:
+        parser.error("--shard-by requires --shard")
+    if (args.poll or args.debounce != DEBOUNCE_SECONDS) and not args.watch:
+        parser.error("--poll and --debounce require --watch")
+    if args.watch and (not args.infile or "-" in args.infile):
+        parser.error("--watch requires files or directories to watch")
+    if args.watch and (args.files_from or git_inputs or args.diff_hunks or args.output):
+        parser.error(
+            "--watch takes its inputs from the command line and writes no single output"
+        )
+    if args.watch and (args.json or args.csv or args.diff or args.fail_fast):
+        parser.error(
+            "--watch streams NDJSON; drop --json, --csv, --diff, and --fail-fast"
+        )
+    if args.debounce < 0:
+        parser.error("--debounce cannot be negative")
+    if args.metrics and not (args.output or args.output_dir or args.temp):
         args.report = True
-    if args.dry_run or args.watermark_profile or args.authorship_profile:
+    if (
+        args.dry_run
+        or args.git_staged
+        or args.diff_hunks
+        or args.changed_lines
+        or args.fail_fast
+        or args.identifier_index
+        or args.watermark_profile
+        or args.authorship_profile
+    ):
         args.report = True
+    if budgets and not args.report:
+        parser.error("--max-file-bytes and --stage-timeout budget report stages")
+    if args.output_dir and args.report:
+        parser.error("--output-dir writes cleaned files; reports do not use it")
+    if args.watch:
+        # Directories are always walked, and reports become NDJSON records.
+        args.recursive = True
+        args.ndjson = args.ndjson or args.report
+        raise SystemExit(run_watch(args))
+
+    try:
+        file_list = _open_file_list(args)
+    except OSError as exc:
+        log(f"[x] Cannot read {args.files_from or args.diff_hunks}: {exc}")
+        raise SystemExit(1) from None
+    with file_list as stream:
+        try:
+            files = _inputs(args, stream)
+        except RuntimeError as exc:
+            log(f"[x] Cannot list changed files: {exc}")
+            raise SystemExit(1) from None
+        try:
+            raise SystemExit(_run_inputs(files, args))
+        finally:
+            _close_tasks()
+
 
+def _run_inputs(files: Iterable[str], args: argparse.Namespace) -> int:
+    named = (
+        args.infile
+        or args.files_from
+        or args.diff_hunks
+        or args.git_changed
+        or args.git_staged
+    )
+    selected = files
+    shard_stats: Counter[str] = Counter()
+    if args.shard:
+        selected = shard_files(files, args.shard, by=args.shard_by, stats=shard_stats)
     if args.report:
-        files = args.infile or ["-"]
-        raise SystemExit(run_report(files, args))
-    if not args.infile:
+        exit_code = _with_state(
+            args,
+            functools.partial(run_report, selected if named else ["-"], args),
+        )
+        _log_walk(files)
+        _log_shard(args, shard_stats)
+        return exit_code
+    if not named:
         run_filter_mode(args)
-        raise SystemExit(0)
+        return 0
 
-    seen: set[str] = set()
-    exit_code = 0
-    for infile in args.infile:
-        if infile in seen:
-            log(f"[i] Skipping duplicate: {infile}")
-            continue
-        seen.add(infile)
-        exit_code = max(exit_code, process_file(infile, args))
-    raise SystemExit(0 if args.exit_zero else exit_code)
+    exit_code = _with_state(args, functools.partial(run_clean, selected, args))
+    _log_walk(files)
+    _log_shard(args, shard_stats)
+    return 0 if args.exit_zero else exit_code
+
+
+def _with_state(
+    args: argparse.Namespace, run: Callable[[IncrementalState | None], int]
+) -> int:
+    """Call *run* with the --incremental state, closing it afterwards."""
+    path = args.state_file or default_state_path()
+    try:
+        state = _incremental_state(args)
+    except (OSError, sqlite3.Error) as exc:
+        log(f"[x] Cannot open state file {path}: {exc}")
+        return 1
+    try:
+        try:
+            return run(state)
+        finally:
+            if state is not None:
+                state.close()
+    except sqlite3.Error as exc:
+        log(f"[x] Cannot update state file {path}: {exc}")
+        return 1
+
+
+def _log_shard(args: argparse.Namespace, stats: Counter[str]) -> None:
+    if args.shard:
+        log(f"[i] Shard {args.shard}: {stats['files']} of {stats['seen']} file(s)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+"""``cleanup-text`` entry point with a thin client for a ``--serve`` daemon.
+
+With ``--client`` the command line is forwarded to a running daemon and its
+output replayed here.  Only the standard library is imported on that path;
+the full command-line interface is imported, and run in-process, only when
+no daemon is listening or ``--client`` was not given.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import sys
+from typing import Any
+
+from unicodefix.daemon import call, connect, default_socket_path, forwarded_environment
+
+__all__ = ["main"]
+
+
+def _socket_path(argv: list[str]) -> str:
+    for index, argument in enumerate(argv):
+        if argument == "--socket" and index + 1 < len(argv):
+            return argv[index + 1]
+        if argument.startswith("--socket="):
+            return argument.partition("=")[2]
+    return default_socket_path()
+
+
+def _call(path: str, message: dict[str, Any]) -> dict[str, Any] | None:
+    connection = connect(path)
+    if connection is None:
+        return None
+    with connection:
+        return call(connection, message)
+
+
+def _run_remote(argv: list[str]) -> int | None:
+    """Run *argv* on the daemon; ``None`` means run it in-process instead."""
+
+    path = _socket_path(argv)
+    message = {
+        "op": "run",
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "env": forwarded_environment(),
+    }
+    try:
+        reply = _call(path, message)
+        if reply is not None and reply.get("need_stdin"):
+            # Read our own standard input between connections, so that a slow
+            # producer does not keep the daemon from serving anyone else.
+            message["stdin"] = sys.stdin.read()
+            # An in-process fallback still needs the input it consumed.
+            sys.stdin = io.StringIO(message["stdin"])
+            reply = _call(path, message)
+    except (OSError, ValueError) as exc:
+        print(f"[i] Daemon unavailable, running in-process: {exc}", file=sys.stderr)
+        return None
+    if reply is None:
+        return None
+    if not reply.get("ok"):
+        print(
+            f"[i] Daemon failed, running in-process: {reply.get('error')}",
+            file=sys.stderr,
+        )
+        return None
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    return int(reply["exit"])
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if "--client" in argv:
+        code = _run_remote(argv)
+        if code is not None:
+            raise SystemExit(code)
+    from unicodefix.cli import main as cli_main
+
+    cli_main(argv)
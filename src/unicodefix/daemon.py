@@ -0,0 +1,262 @@
+"""Unix-socket daemon protocol for ``cleanup-text --serve`` and ``--client``.
+
+Every message, in both directions, is a 4-byte big-endian length followed by
+that many bytes of UTF-8 JSON.  A connection may carry any number of
+request/response pairs.  Requests name an ``op``:
+
+``clean``, ``report``, ``metrics``, ``source``
+    Process ``text`` (optionally with ``path``, ``language``, and an
+    ``options`` object of command-line option names) and answer with
+    ``text``, ``report``, ``metrics``, or ``source``.
+``run``
+    Execute a whole command line (``argv``, ``cwd``, ``env``) as the thin
+    client does; the reply carries ``stdout``, ``stderr``, and ``exit``.
+    Only the :data:`FORWARDED_ENVIRONMENT` variables of ``env`` are used.  A
+    command that reads standard input is first answered with
+    ``need_stdin``; the client then reads it without holding the daemon and
+    sends the request again with ``stdin``.
+``ping``
+    Answer with the daemon's version.
+
+Replies carry ``ok``; a failed request has ``ok: false`` and ``error``.  The
+daemon answers one connection at a time and drops one that stays silent for
+:data:`CLIENT_TIMEOUT` seconds.  A client connects only to a socket owned by
+its own user, so that another local user cannot collect forwarded commands.
+This module imports only the standard library so that a client stays fast.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+import tempfile
+from collections.abc import Callable, Mapping
+from typing import Any
+
+__all__ = [
+    "CLIENT_TIMEOUT",
+    "FORWARDED_ENVIRONMENT",
+    "MAX_MESSAGE_BYTES",
+    "call",
+    "connect",
+    "default_socket_path",
+    "forwarded_environment",
+    "receive_message",
+    "send_message",
+    "serve",
+]
+
+MAX_MESSAGE_BYTES = 1 << 30
+CLIENT_TIMEOUT = 10.0
+# The variables a command line run by the CLI reads, directly or through git.
+FORWARDED_ENVIRONMENT = (
+    "APPLICATION_INSIGHTS_NO_DIAGNOSTIC_CHANNEL",
+    "GIT_ALTERNATE_OBJECT_DIRECTORIES",
+    "GIT_CEILING_DIRECTORIES",
+    "GIT_COMMON_DIR",
+    "GIT_DIR",
+    "GIT_INDEX_FILE",
+    "GIT_OBJECT_DIRECTORY",
+    "GIT_WORK_TREE",
+    "HOME",
+    "NO_COLOR",
+    "PATH",
+    "VSCODE_PROCESS_TITLE",
+    "XDG_CACHE_HOME",
+)
+_HEADER = struct.Struct(">I")
+
+Handler = Callable[[dict[str, Any]], dict[str, Any]]
+
+
+def default_socket_path() -> str:
+    if os.environ.get("UNICODEFIX_SOCKET"):
+        return os.environ["UNICODEFIX_SOCKET"]
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return os.path.join(runtime, "unicodefix.sock")
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "")
+    # A private directory rather than a guessable name in a shared one.
+    return os.path.join(tempfile.gettempdir(), f"unicodefix-{user}", "daemon.sock")
+
+
+def forwarded_environment(
+    environment: Mapping[str, str] | None = None,
+) -> dict[str, str]:
+    """The :data:`FORWARDED_ENVIRONMENT` part of *environment*."""
+
+    environment = os.environ if environment is None else environment
+    return {
+        name: environment[name] for name in FORWARDED_ENVIRONMENT if name in environment
+    }
+
+
+def send_message(connection: socket.socket, message: dict[str, Any]) -> None:
+    payload = json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+    data = payload.encode("utf-8", "surrogatepass")
+    connection.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _receive_exactly(connection: socket.socket, size: int) -> bytes | None:
+    chunks = []
+    while size:
+        chunk = connection.recv(min(size, 1 << 20))
+        if not chunk:
+            if chunks:
+                raise ConnectionError("connection closed inside a message")
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def receive_message(connection: socket.socket) -> dict[str, Any] | None:
+    """Return the next message, or ``None`` when the peer closed cleanly."""
+
+    header = _receive_exactly(connection, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > MAX_MESSAGE_BYTES:
+        raise ValueError(f"message of {size} bytes exceeds the protocol limit")
+    payload = _receive_exactly(connection, size) if size else b""
+    if payload is None:
+        raise ConnectionError("connection closed inside a message")
+    message = json.loads(payload.decode("utf-8", "surrogatepass"))
+    if not isinstance(message, dict):
+        raise TypeError("a message must be a JSON object")
+    return message
+
+
+def _owner(status: os.stat_result) -> bool:
+    return not hasattr(os, "getuid") or status.st_uid == os.getuid()
+
+
+def _peer_owner(connection: socket.socket) -> bool:
+    if not hasattr(socket, "SO_PEERCRED"):
+        return True
+    credentials = struct.Struct("3i")
+    data = connection.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, credentials.size
+    )
+    _, uid, _ = credentials.unpack(data)
+    return uid == os.getuid()
+
+
+def connect(path: str, *, timeout: float = 0.5) -> socket.socket | None:
+    """Connect to a daemon at *path*, or return ``None`` when none is listening.
+
+    Raises :class:`PermissionError` when *path* is not a socket of this user
+    or the process listening on it belongs to someone else.
+    """
+
+    try:
+        status = os.lstat(path)
+    except FileNotFoundError:
+        return None
+    if not stat.S_ISSOCK(status.st_mode) or not _owner(status):
+        raise PermissionError(f"{path} is not a socket owned by this user")
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(timeout)
+    try:
+        connection.connect(path)
+    except (FileNotFoundError, ConnectionRefusedError, TimeoutError):
+        connection.close()
+        return None
+    if not _peer_owner(connection):
+        connection.close()
+        raise PermissionError(f"the daemon on {path} belongs to another user")
+    connection.settimeout(None)
+    return connection
+
+
+def call(connection: socket.socket, message: dict[str, Any]) -> dict[str, Any]:
+    send_message(connection, message)
+    reply = receive_message(connection)
+    if reply is None:
+        raise ConnectionError("daemon closed the connection")
+    return reply
+
+
+def _answer(handler: Handler, message: dict[str, Any]) -> dict[str, Any]:
+    try:
+        return handler(message)
+    except Exception as exc:  # noqa: BLE001
+        # Whatever one request raises, such as a locked or corrupt database,
+        # is that request's failure; the daemon keeps serving the others.
+        return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def _private_directory(directory: str) -> None:
+    """Create *directory* for this user alone, or check that it is not shared."""
+
+    try:
+        os.mkdir(directory, 0o700)
+        return
+    except FileExistsError:
+        pass
+    status = os.lstat(directory)
+    if not stat.S_ISDIR(status.st_mode):
+        raise NotADirectoryError(f"{directory} is not a directory")
+    # A sticky shared directory such as /tmp protects the socket file itself.
+    if not _owner(status) and not status.st_mode & stat.S_ISVTX:
+        raise PermissionError(f"{directory} belongs to another user")
+
+
+def _claim(path: str) -> None:
+    """Remove a stale socket file, refusing to displace a live daemon."""
+
+    _private_directory(os.path.dirname(os.path.abspath(path)))
+    if not os.path.lexists(path):
+        return
+    live = connect(path)
+    if live is not None:
+        live.close()
+        raise OSError(f"a daemon is already listening on {path}")
+    os.unlink(path)
+
+
+def serve(
+    path: str, handler: Handler, *, ready: Callable[[], None] | None = None
+) -> None:
+    """Answer requests on *path* one at a time until SIGTERM or SIGINT.
+
+    Requests are handled sequentially: the handler may redirect standard
+    streams, change directory, and swap the environment for a ``run``.  A
+    client that sends or reads nothing for :data:`CLIENT_TIMEOUT` seconds is
+    dropped so that it cannot hold up the others.
+    """
+
+    _claim(path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    previous = os.umask(0o177)
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(previous)
+    listener.listen(16)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    if ready is not None:
+        ready()
+    try:
+        while True:
+            connection, _ = listener.accept()
+            connection.settimeout(CLIENT_TIMEOUT)
+            with connection:
+                try:
+                    while (message := receive_message(connection)) is not None:
+                        send_message(connection, _answer(handler, message))
+                except (ConnectionError, TimeoutError, ValueError, TypeError) as exc:
+                    # A broken client must not take the daemon down with it.
+                    print(f"[x] Dropped client: {exc}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        if os.path.exists(path):
+            os.unlink(path)
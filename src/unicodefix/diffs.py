@@ -0,0 +1,271 @@
+"""Unified diffs of a document against its cleaned text, in about linear time.
+
+:func:`difflib.unified_diff` aligns whole line lists with
+:class:`difflib.SequenceMatcher`, which slows down sharply on large files
+with many small changes.  Inputs of up to :data:`MATCHER_MAX_LINES` lines in
+all are still aligned by it.  Cleanup edits lines in place or joins
+neighbours, so :func:`line_opcodes` aligns larger inputs with cheap steps
+instead: it trims the common prefix and suffix, anchors on lines that occur
+exactly once on each side (keeping the longest increasing run of them, as
+patience diff does), and repeats within the gaps between anchors.  Only a
+gap without such lines, which is small in practice, goes to
+:class:`difflib.SequenceMatcher`, and one larger than
+:data:`MATCHER_MAX_LINES` is reported as replaced outright.
+
+:func:`unified_diff` then groups and formats hunks exactly as
+:func:`difflib.unified_diff` does, yielding one line at a time so that a huge
+diff is never held as one string.  The output is the same as difflib's for
+small inputs, and for larger ones whenever the alignment is unambiguous.
+With repeated lines, such as blank lines or closing braces, a larger diff may
+place a change at a different but equally valid position, for example
+``-x / +y /  (blank)`` where difflib writes ``-x /  (blank) / +y``.
+
+:func:`replacement_spans` counts character-level replacements on the same
+alignment: characters are compared only within the lines that differ, and
+within the words that differ when a line is longer than
+:data:`CHARACTER_MATCHER_MAX` characters.
+"""
+
+from __future__ import annotations
+
+import bisect
+import difflib
+import re
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
+
+__all__ = [
+    "CHARACTER_MATCHER_MAX",
+    "MATCHER_MAX_LINES",
+    "line_opcodes",
+    "replacement_spans",
+    "unified_diff",
+]
+
+MATCHER_MAX_LINES = 2000
+CHARACTER_MATCHER_MAX = 1000
+_TOKEN = re.compile(r"\s+|\S+")
+
+Opcode = tuple[str, int, int, int, int]
+
+
+def _unique_anchors(
+    a: Sequence[str], alo: int, ahi: int, b: Sequence[str], blo: int, bhi: int
+) -> list[tuple[int, int]]:
+    """Pairs of lines unique on both sides, as a longest run increasing in both."""
+
+    counts_a = Counter(a[alo:ahi])
+    counts_b = Counter(b[blo:bhi])
+    positions = {
+        b[j]: j for j in range(blo, bhi) if counts_b[b[j]] == 1 and counts_a[b[j]] == 1
+    }
+    pairs = [(i, positions[a[i]]) for i in range(alo, ahi) if a[i] in positions]
+    # Patience sorting: tails[k] ends the best run of length k + 1.
+    tails: list[int] = []
+    tail_pairs: list[int] = []
+    previous: list[int] = []
+    for index, (_, j) in enumerate(pairs):
+        k = bisect.bisect_left(tails, j)
+        if k == len(tails):
+            tails.append(j)
+            tail_pairs.append(index)
+        else:
+            tails[k] = j
+            tail_pairs[k] = index
+        previous.append(tail_pairs[k - 1] if k else -1)
+    run = []
+    index = tail_pairs[-1] if tail_pairs else -1
+    while index >= 0:
+        run.append(pairs[index])
+        index = previous[index]
+    return run[::-1]
+
+
+def _matching_blocks(a: Sequence[str], b: Sequence[str]) -> list[tuple[int, int, int]]:
+    matches: list[tuple[int, int, int]] = []
+    pending = [(0, len(a), 0, len(b))]
+    while pending:
+        alo, ahi, blo, bhi = pending.pop()
+        prefix = 0
+        while alo + prefix < ahi and blo + prefix < bhi:
+            if a[alo + prefix] != b[blo + prefix]:
+                break
+            prefix += 1
+        if prefix:
+            matches.append((alo, blo, prefix))
+            alo += prefix
+            blo += prefix
+        suffix = 0
+        while alo < ahi - suffix and blo < bhi - suffix:
+            if a[ahi - suffix - 1] != b[bhi - suffix - 1]:
+                break
+            suffix += 1
+        if suffix:
+            matches.append((ahi - suffix, bhi - suffix, suffix))
+            ahi -= suffix
+            bhi -= suffix
+        if alo == ahi or blo == bhi:
+            continue
+        anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+        if anchors:
+            for i, j in anchors:
+                pending.append((alo, i, blo, j))
+                matches.append((i, j, 1))
+                alo, blo = i + 1, j + 1
+            pending.append((alo, ahi, blo, bhi))
+        elif (ahi - alo) + (bhi - blo) <= MATCHER_MAX_LINES:
+            matcher = difflib.SequenceMatcher(None, a[alo:ahi], b[blo:bhi])
+            matches.extend(
+                (alo + i, blo + j, size)
+                for i, j, size in matcher.get_matching_blocks()
+                if size
+            )
+    # Adjacent matches merge, as SequenceMatcher.get_matching_blocks() does.
+    merged: list[tuple[int, int, int]] = []
+    for i, j, size in sorted(matches):
+        if merged:
+            last_i, last_j, last_size = merged[-1]
+            if (last_i + last_size, last_j + last_size) == (i, j):
+                merged[-1] = (last_i, last_j, last_size + size)
+                continue
+        merged.append((i, j, size))
+    merged.append((len(a), len(b), 0))
+    return merged
+
+
+def line_opcodes(a: Sequence[str], b: Sequence[str]) -> list[Opcode]:
+    """Opcodes in the form of :meth:`difflib.SequenceMatcher.get_opcodes`."""
+
+    if len(a) + len(b) <= MATCHER_MAX_LINES:
+        # Small inputs are aligned exactly as difflib.unified_diff aligns them.
+        return difflib.SequenceMatcher(None, a, b).get_opcodes()
+    opcodes: list[Opcode] = []
+    i = j = 0
+    for ai, bj, size in _matching_blocks(a, b):
+        if i < ai and j < bj:
+            opcodes.append(("replace", i, ai, j, bj))
+        elif i < ai:
+            opcodes.append(("delete", i, ai, j, bj))
+        elif j < bj:
+            opcodes.append(("insert", i, ai, j, bj))
+        i, j = ai + size, bj + size
+        if size:
+            opcodes.append(("equal", ai, i, bj, j))
+    return opcodes
+
+
+def _grouped(opcodes: list[Opcode], n: int) -> Iterator[list[Opcode]]:
+    # The grouping of difflib.SequenceMatcher.get_grouped_opcodes().
+    codes = opcodes or [("equal", 0, 1, 0, 1)]
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+    group: list[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > n + n:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _range(start: int, stop: int) -> str:
+    length = stop - start
+    if length == 1:
+        return str(start + 1)
+    return f"{start + 1 if length else start},{length}"
+
+
+def unified_diff(
+    a: Sequence[str],
+    b: Sequence[str],
+    fromfile: str = "",
+    tofile: str = "",
+    n: int = 3,
+) -> Iterator[str]:
+    """Yield the lines of :func:`difflib.unified_diff` for line lists *a*, *b*.
+
+    Lines should keep their endings, as from ``str.splitlines(keepends=True)``.
+    """
+
+    started = False
+    for group in _grouped(line_opcodes(a, b), n):
+        if not started:
+            started = True
+            yield f"--- {fromfile}\n"
+            yield f"+++ {tofile}\n"
+        first, last = group[0], group[-1]
+        yield f"@@ -{_range(first[1], last[2])} +{_range(first[3], last[4])} @@\n"
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in a[i1:i2]:
+                    yield " " + line
+                continue
+            if tag in ("replace", "delete"):
+                for line in a[i1:i2]:
+                    yield "-" + line
+            if tag in ("replace", "insert"):
+                for line in b[j1:j2]:
+                    yield "+" + line
+
+
+def _differing_runs(a: Sequence[str], b: Sequence[str]) -> Iterator[Opcode]:
+    """Replace opcodes for the runs where equally long *a* and *b* differ."""
+
+    start = None
+    for index, (left, right) in enumerate(zip(a, b)):
+        if left != right and start is None:
+            start = index
+        elif left == right and start is not None:
+            yield "replace", start, index, start, index
+            start = None
+    if start is not None:
+        yield "replace", start, len(a), start, len(b)
+
+
+def _replaced(a: str, b: str, *, tokens: bool = True) -> int:
+    if len(a) + len(b) <= CHARACTER_MATCHER_MAX:
+        opcodes = difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes()
+        return sum(tag == "replace" for tag, *_ in opcodes)
+    if not tokens:
+        return 1
+    # A long line is aligned word by word first, as lines are; edits that keep
+    # the number of words pair them by position.
+    a_tokens, b_tokens = _TOKEN.findall(a), _TOKEN.findall(b)
+    if len(a_tokens) == len(b_tokens):
+        opcodes: Iterable[Opcode] = _differing_runs(a_tokens, b_tokens)
+    else:
+        opcodes = line_opcodes(a_tokens, b_tokens)
+    return sum(
+        _replaced("".join(a_tokens[i1:i2]), "".join(b_tokens[j1:j2]), tokens=False)
+        for tag, i1, i2, j1, j2 in opcodes
+        if tag == "replace"
+    )
+
+
+def replacement_spans(a: str, b: str) -> int:
+    """Count the spans of characters of text *a* replaced in text *b*.
+
+    Lines are aligned first; a run of changed lines is compared character by
+    character, line by line when both sides have as many lines, and a long
+    line word by word before that.  Whole lines only deleted or inserted
+    replace nothing, and a changed run too long to compare counts once.
+    """
+
+    a_lines = a.splitlines(keepends=True)
+    b_lines = b.splitlines(keepends=True)
+    spans = 0
+    for tag, i1, i2, j1, j2 in line_opcodes(a_lines, b_lines):
+        if tag != "replace":
+            continue
+        if i2 - i1 == j2 - j1:
+            spans += sum(map(_replaced, a_lines[i1:i2], b_lines[j1:j2]))
+        else:
+            spans += _replaced("".join(a_lines[i1:i2]), "".join(b_lines[j1:j2]))
+    return spans
@@ -7,7 +7,7 @@ reported separately from Unicode and formatting observations.
 
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass, field
+from dataclasses import dataclass, field
 from typing import Any, Literal
 
 FINDINGS_SCHEMA_VERSION = "2.0"
@@ -21,7 +21,9 @@ Category = Literal[
 ]
 
 
-@dataclass(frozen=True)
+# Reports can hold hundreds of locations per finding across thousands of
+# files, so both records are slotted and serialize without dataclasses.asdict.
+@dataclass(frozen=True, slots=True)
 class Location:
     """A zero-width or character span in one-based text coordinates."""
 
@@ -32,8 +34,26 @@ class Location:
     offset: int | None = None
     end_offset: int | None = None
 
+    def to_dict(self) -> dict[str, int | None]:
+        return {
+            "line": self.line,
+            "column": self.column,
+            "end_line": self.end_line,
+            "end_column": self.end_column,
+            "offset": self.offset,
+            "end_offset": self.end_offset,
+        }
+
+
+def _copy_json(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(item) for item in value]
+    return value
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Finding:
     category: Category
     signal: str
@@ -48,9 +68,21 @@ class Finding:
     details: dict[str, Any] = field(default_factory=dict)
 
     def to_dict(self) -> dict[str, Any]:
-        value = asdict(self)
-        value["locations"] = [asdict(location) for location in self.locations]
-        return value
+        # ``details`` holds JSON-ready values, so copying its dicts and lists
+        # keeps callers from mutating the finding; asdict's deepcopy is slower.
+        return {
+            "category": self.category,
+            "signal": self.signal,
+            "count": self.count,
+            "locations": [location.to_dict() for location in self.locations],
+            "confidence": self.confidence,
+            "removable": self.removable,
+            "planned_action": self.planned_action,
+            "message": self.message,
+            "scheme": self.scheme,
+            "vendor": self.vendor,
+            "details": _copy_json(self.details),
+        }
 
 
 @dataclass
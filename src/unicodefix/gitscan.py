@@ -0,0 +1,152 @@
+"""Changed-file enumeration and staged-blob reading through the local ``git``.
+
+``--git-changed REF`` and ``--git-staged`` take their inputs from ``git diff``
+instead of the command line.  Added, copied, modified, renamed, and
+type-changed regular files are listed; submodules, symbolic links, and files
+Git itself classifies as binary are skipped.  Staged content is read from the
+index by one long-lived ``git cat-file --batch`` process per
+:class:`BlobReader`, never by a subprocess per file.
+:func:`changed_line_ranges` reads the same selection's ``-U0`` patch for
+``--changed-lines``.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+from collections import Counter
+
+from unicodefix.hunks import LineRanges, parse_unified_diff
+
+__all__ = ["BlobReader", "changed_files", "changed_line_ranges", "toplevel"]
+
+_REGULAR_MODES = frozenset({b"100644", b"100755"})
+
+
+def _git(arguments: list[str], cwd: str | None = None) -> bytes:
+    try:
+        process = subprocess.run(
+            ["git", *arguments], cwd=cwd, capture_output=True, check=False
+        )
+    except FileNotFoundError:
+        raise RuntimeError("the git executable was not found") from None
+    if process.returncode:
+        message = process.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(message or f"git {arguments[0]} failed")
+    return process.stdout
+
+
+def toplevel(cwd: str | None = None) -> str:
+    """The working-tree root of the repository containing *cwd*."""
+
+    return os.fsdecode(_git(["rev-parse", "--show-toplevel"], cwd).rstrip(b"\n"))
+
+
+def _diff(ref: str | None, output: str, top: str) -> bytes:
+    arguments = ["diff", "-z", "--no-renames", "--no-ext-diff", "--diff-filter=ACMRT"]
+    arguments += ["--no-color", output]
+    if ref is None:
+        arguments.append("--cached")
+    else:
+        arguments += ["--end-of-options", ref, "--"]
+    return _git(arguments, top)
+
+
+def _binary_names(ref: str | None, top: str) -> set[bytes]:
+    output = _diff(ref, "--numstat", top)
+    names = set()
+    for record in output.split(b"\0"):
+        added, _, rest = record.partition(b"\t")
+        if added == b"-":
+            names.add(rest.partition(b"\t")[2])
+    return names
+
+
+def changed_files(
+    ref: str | None = None, *, staged: bool = False, cwd: str | None = None
+) -> tuple[list[str], Counter[str]]:
+    """Files changed in the working tree since *ref*, or staged in the index.
+
+    Paths are relative to *cwd* (default: the current directory) and sorted
+    as Git lists them.  The counter holds ``files`` listed and the
+    ``binary`` and ``special`` (submodule or symbolic link) entries skipped.
+    """
+
+    if staged == (ref is not None):
+        raise ValueError("name either a reference or the staged index")
+    top = toplevel(cwd)
+    base = os.path.realpath(cwd or os.curdir)
+    binary = _binary_names(ref, top)
+    fields = _diff(ref, "--raw", top).split(b"\0")
+    files: list[str] = []
+    stats: Counter[str] = Counter()
+    for header, name in zip(fields[::2], fields[1::2]):
+        mode = header.split(b" ")[1] if header.count(b" ") >= 4 else b""
+        if mode not in _REGULAR_MODES:
+            stats["special"] += 1
+        elif name in binary:
+            stats["binary"] += 1
+        else:
+            stats["files"] += 1
+            files.append(os.path.relpath(os.path.join(top, os.fsdecode(name)), base))
+    return files, stats
+
+
+def changed_line_ranges(
+    ref: str | None = None, *, staged: bool = False, cwd: str | None = None
+) -> dict[str, LineRanges]:
+    """Added-line ranges per file for the selection :func:`changed_files` lists.
+
+    Keys are the same *cwd*-relative paths.
+    """
+
+    if staged == (ref is not None):
+        raise ValueError("name either a reference or the staged index")
+    top = toplevel(cwd)
+    base = os.path.realpath(cwd or os.curdir)
+    patch = _diff(ref, "-U0", top).decode("utf-8", "surrogateescape")
+    return {
+        os.path.relpath(os.path.join(top, name), base): ranges
+        for name, ranges in parse_unified_diff(patch.splitlines(keepends=True)).items()
+    }
+
+
+class BlobReader:
+    """Read staged file content through one ``git cat-file --batch`` process."""
+
+    def __init__(self, cwd: str | None = None) -> None:
+        self.top = toplevel(cwd)
+        self._process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=self.top,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        self._requests = self._process.stdin
+        self._replies = self._process.stdout
+
+    def staged(self, path: str) -> bytes:
+        """The index content of working-tree *path*."""
+
+        name = os.path.relpath(os.path.realpath(path), self.top).replace(os.sep, "/")
+        request = b":" + os.fsencode(name)
+        if b"\n" in request:
+            raise ValueError(
+                f"cannot request a staged path containing a newline: {path}"
+            )
+        self._requests.write(request + b"\n")
+        self._requests.flush()
+        header = self._replies.readline()
+        if not header:
+            raise RuntimeError("git cat-file exited unexpectedly")
+        parts = header.split()
+        if parts[-1] == b"missing" or len(parts) != 3:
+            raise FileNotFoundError(f"not staged: {path}")
+        data = self._replies.read(int(parts[2]))
+        self._replies.read(1)  # the newline after each object
+        return data
+
+    def close(self) -> None:
+        self._requests.close()
+        self._replies.close()
+        self._process.wait()
@@ -0,0 +1,199 @@
+"""Unified-diff line ranges and changed-lines-only report scanning.
+
+:func:`parse_unified_diff` reads the new-side line numbers of added lines from
+``git diff`` or ``diff -u`` output (with or without context lines), and
+:func:`scan_changed_lines` scans only those lines of the new file.  The
+scanned slices are whole lines, so Unicode tokens and normalization see the
+same text as a full scan, and a slice that touches a C2PA carrier grows to
+cover the carrier.  Locations keep the new file's line numbers and offsets.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from bisect import bisect_right
+from collections.abc import Iterable
+from typing import Any
+
+from unicodefix.c2pa import c2pa_findings, find_c2pa_carriers
+from unicodefix.scanner import (
+    findings_from_partials,
+    merge_aggregates,
+    report_from_parts,
+    scan_partial,
+)
+
+__all__ = ["LineRanges", "merge_ranges", "parse_unified_diff", "scan_changed_lines"]
+
+LineRanges = list[tuple[int, int]]
+
+_HUNK_RE = re.compile(r"@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_ESCAPES = {"a": 7, "b": 8, "t": 9, "n": 10, "v": 11, "f": 12, "r": 13}
+
+
+def _unquote(name: str) -> str:
+    """Decode a C-style quoted Git path such as ``"caf\\303\\251.txt"``."""
+
+    if not (len(name) >= 2 and name[0] == name[-1] == '"'):
+        return name
+    data = bytearray()
+    body = name[1:-1]
+    index = 0
+    while index < len(body):
+        char = body[index]
+        if char != "\\" or index + 1 == len(body):
+            data += char.encode("utf-8", "surrogateescape")
+            index += 1
+        elif body[index + 1] in "01234567":
+            data.append(int(body[index + 1 : index + 4], 8) & 0xFF)
+            index += 4
+        else:
+            escaped = body[index + 1]
+            data.append(_ESCAPES.get(escaped, ord(escaped)))
+            index += 2
+    return os.fsdecode(bytes(data))
+
+
+def _new_path(header: str, git: bool) -> str | None:
+    name = header[4:].rstrip("\n")
+    if not name.startswith('"'):
+        # diff -u appends a tab and a timestamp.
+        name = name.split("\t", 1)[0]
+    name = _unquote(name)
+    if name == "/dev/null":
+        return None
+    if git and name.startswith("b/"):
+        return name[2:]
+    return name
+
+
+def merge_ranges(ranges: Iterable[tuple[int, int]]) -> LineRanges:
+    """Sort inclusive line ranges and join those that overlap or touch."""
+
+    merged: LineRanges = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def parse_unified_diff(lines: Iterable[str]) -> dict[str, LineRanges]:
+    """Map each new-side path to the inclusive ranges of its added lines.
+
+    Deleted files and files without added lines are omitted; Git's ``b/``
+    prefix is removed from paths in ``diff --git`` sections.
+    """
+
+    ranges: dict[str, list[tuple[int, int]]] = {}
+    path: str | None = None
+    git = False
+    line = old = new = 0
+    for text in lines:
+        if old or new:
+            # Inside a hunk the header's counts say where its body ends.
+            if text.startswith("+"):
+                ranges.setdefault(path, []).append((line, line))
+                line, new = line + 1, new - 1
+            elif text.startswith("-"):
+                old -= 1
+            elif text.startswith((" ", "\n")) or not text:
+                line, old, new = line + 1, old - 1, new - 1
+            elif not text.startswith("\\"):
+                old = new = 0
+            continue
+        if text.startswith("diff --git "):
+            path, git = None, True
+        elif text.startswith("+++ "):
+            path = _new_path(text, git)
+        elif text.startswith("@@ ") and path is not None:
+            match = _HUNK_RE.match(text)
+            if match:
+                old = int(match.group(1) or 1)
+                line = int(match.group(2))
+                new = int(match.group(3) or 1)
+    return {name: merge_ranges(spans) for name, spans in ranges.items()}
+
+
+def _slices(
+    text: str, starts: list[int], ranges: LineRanges, carriers: list[Any]
+) -> list[tuple[int, int]]:
+    spans = []
+    for first, last in ranges:
+        if first > len(starts):
+            continue
+        start = starts[first - 1]
+        end = starts[last] if last < len(starts) else len(text)
+        spans.append((start, end))
+    grown = True
+    while grown:
+        grown = False
+        for carrier in carriers:
+            for position, (start, end) in enumerate(spans):
+                if carrier.start < end and start < carrier.end:
+                    wider = (
+                        starts[bisect_right(starts, min(start, carrier.start)) - 1],
+                        max(end, _line_end(text, carrier.end)),
+                    )
+                    if wider != (start, end):
+                        spans[position] = wider
+                        grown = True
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _line_end(text: str, offset: int) -> int:
+    if offset and text[offset - 1] == "\n":
+        return offset
+    newline = text.find("\n", offset)
+    return len(text) if newline < 0 else newline + 1
+
+
+def scan_changed_lines(text: str, ranges: LineRanges) -> dict[str, Any]:
+    """``scan_text_for_report`` restricted to the whole lines in *ranges*.
+
+    The report adds ``changed_lines``, the scanned ranges after growing them
+    over any C2PA carrier they touch.  ``final_newline`` is only judged when
+    the last line was scanned.
+    """
+
+    starts = [0]
+    starts.extend(match.end() for match in re.finditer("\n", text))
+    if starts[-1] == len(text) and len(starts) > 1:
+        starts.pop()
+    carriers = find_c2pa_carriers(text)
+    slices = _slices(text, starts, merge_ranges(ranges), carriers)
+    partials = [
+        scan_partial(
+            text[start:end],
+            base_offset=start,
+            base_line=bisect_right(starts, start) - 1,
+            aggregates=True,
+        )
+        for start, end in slices
+    ] or [scan_partial("", aggregates=True)]
+    touched = [
+        carrier
+        for carrier in carriers
+        if any(start <= carrier.start < end for start, end in slices)
+    ]
+    final_newline = not (slices and slices[-1][1] == len(text)) or text.endswith(
+        ("\n", "\r")
+    )
+    data = report_from_parts(
+        merge_aggregates(partial.aggregates or {} for partial in partials),
+        final_newline,
+        findings_from_partials(partials, c2pa_findings(text, touched)),
+    )
+    data["changed_lines"] = [
+        [bisect_right(starts, start), bisect_right(starts, end - 1)]
+        for start, end in slices
+    ]
+    return data
@@ -0,0 +1,158 @@
+"""Persistent cross-file index of identifier confusable skeletons.
+
+``scan_source`` judges one file at a time, but a look-alike attack usually
+pairs an identifier in one file with a different identifier in another file
+that has the same UTS #39 detection skeleton.  The index records each file's
+distinct identifiers in SQLite, so it stays on disk rather than in memory,
+is updated only for files whose size or modification time changed, and
+answers skeleton collisions with an indexed join.  Files that no longer exist
+are forgotten, so a deleted or renamed file stops colliding.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from collections.abc import Iterable
+from typing import Any
+
+from unicodefix.findings import Finding, Location
+from unicodefix.scanner import confusable_skeleton
+
+__all__ = ["IdentifierIndex", "collision_finding"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS identifiers (
+    skeleton TEXT NOT NULL,
+    identifier TEXT NOT NULL,
+    ascii INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    column INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS identifiers_by_skeleton ON identifiers (skeleton);
+CREATE INDEX IF NOT EXISTS identifiers_by_path ON identifiers (path);
+"""
+
+# Distinct identifiers only collide when at least one of them is not ASCII:
+# the skeleton of an ASCII identifier is the identifier itself.
+_COLLISIONS = """
+SELECT a.identifier, a.skeleton, a.line, a.column,
+       b.identifier, b.path, b.line, b.column
+FROM identifiers AS a
+JOIN identifiers AS b
+  ON b.skeleton = a.skeleton AND b.identifier != a.identifier
+WHERE a.path = ? AND b.path != a.path AND (a.ascii = 0 OR b.ascii = 0)
+ORDER BY a.line, a.column, b.path, b.line, b.column
+"""
+
+
+class IdentifierIndex:
+    """Skeleton → identifier index shared by every file of a source tree."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self._connection = sqlite3.connect(os.fspath(path))
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._connection.commit()
+        self._connection.close()
+
+    def is_current(self, path: str, size: int, mtime_ns: int) -> bool:
+        row = self._connection.execute(
+            "SELECT size, mtime_ns FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        return row == (size, mtime_ns)
+
+    def update(
+        self,
+        path: str,
+        identifiers: Iterable[tuple[str, int, int]],
+        *,
+        size: int,
+        mtime_ns: int,
+    ) -> None:
+        """Replace *path*'s identifiers with ``(name, line, column)`` entries."""
+
+        with self._connection:
+            self._connection.execute("DELETE FROM identifiers WHERE path = ?", (path,))
+            self._connection.executemany(
+                "INSERT INTO identifiers VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (confusable_skeleton(name), name, name.isascii(), path, line, col)
+                    for name, line, col in identifiers
+                ),
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                (path, size, mtime_ns),
+            )
+
+    def paths(self) -> list[str]:
+        """Every file the index holds identifiers for."""
+
+        return [path for (path,) in self._connection.execute("SELECT path FROM files")]
+
+    def forget(self, path: str) -> None:
+        with self._connection:
+            self._connection.execute("DELETE FROM identifiers WHERE path = ?", (path,))
+            self._connection.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def collisions(self, path: str) -> list[dict[str, Any]]:
+        """Identifiers in *path* whose skeleton matches one in another file."""
+
+        return [
+            {
+                "identifier": identifier,
+                "skeleton": skeleton,
+                "line": line,
+                "column": column,
+                "other_identifier": other,
+                "other_path": other_path,
+                "other_line": other_line,
+                "other_column": other_column,
+            }
+            for (
+                identifier,
+                skeleton,
+                line,
+                column,
+                other,
+                other_path,
+                other_line,
+                other_column,
+            ) in self._connection.execute(_COLLISIONS, (path,))
+        ]
+
+
+def collision_finding(
+    collisions: list[dict[str, Any]], *, location_limit: int = 100
+) -> Finding | None:
+    """Describe cross-file skeleton collisions as one report finding."""
+
+    if not collisions:
+        return None
+    positions = list(
+        dict.fromkeys((item["line"], item["column"]) for item in collisions)
+    )
+    return Finding(
+        category="unicode_security",
+        signal="cross_file_confusable_identifier",
+        count=len(positions),
+        locations=tuple(
+            Location(line, column) for line, column in positions[:location_limit]
+        ),
+        confidence="medium",
+        removable=False,
+        planned_action="report",
+        message="Identifier(s) share a confusable skeleton with a different identifier in another file.",
+        details={
+            "collisions": collisions[:location_limit],
+            "locations_truncated": len(collisions) > location_limit,
+        },
+    )
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import re
 from collections import Counter
+from collections.abc import Iterable
 
 import unicodedata2 as unicodedata
 from confusable_homoglyphs import confusables
@@ -11,11 +12,7 @@ from confusable_homoglyphs import confusables
 _WORD_RE = re.compile(r"\w+", re.UNICODE)
 
 
-def _newline_style(text: str) -> str:
-    crlf = text.count("\r\n")
-    remainder = text.replace("\r\n", "")
-    lf = remainder.count("\n")
-    cr = remainder.count("\r")
+def _newline_style(crlf: int, lf: int, cr: int) -> str:
     styles = sum(bool(value) for value in (crlf, lf, cr))
     if styles == 0:
         return "none"
@@ -24,10 +21,47 @@ def _newline_style(text: str) -> str:
     return "crlf" if crlf else "lf" if lf else "cr"
 
 
-def compute_metrics(text: str) -> dict:
-    """Return reproducible structural counts, never an AI-likeness score."""
+def metric_counts(text: str) -> dict:
+    """Additive counts behind :func:`compute_metrics`.
+
+    Counts of slices that each end after a newline sum to the counts of the
+    whole document; see :func:`merge_metric_counts`.
+    """
+
+    crlf = text.count("\r\n")
+    remainder = text.replace("\r\n", "")
+    ascii_characters = sum(ord(char) < 128 for char in text)
+    return {
+        "bytes_utf8": len(text.encode("utf-8", "surrogatepass")),
+        "characters": len(text),
+        "lines": len(text.splitlines()),
+        "words": len(_WORD_RE.findall(text)),
+        "crlf": crlf,
+        "lf": remainder.count("\n"),
+        "cr": remainder.count("\r"),
+        "ascii_characters": ascii_characters,
+        "non_ascii_characters": len(text) - ascii_characters,
+        "codepoints": Counter(f"U+{ord(char):04X}" for char in text if ord(char) > 127),
+    }
 
-    codepoints = Counter(f"U+{ord(char):04X}" for char in text if ord(char) > 127)
+
+def merge_metric_counts(parts: Iterable[dict]) -> dict:
+    """Sum :func:`metric_counts` of ordered newline-aligned slices."""
+
+    merged: dict = {"codepoints": Counter()}
+    for part in parts:
+        for key, value in part.items():
+            if key == "codepoints":
+                merged[key].update(value)
+            else:
+                merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def metrics_from_counts(counts: dict) -> dict:
+    """Assemble the :func:`compute_metrics` dictionary from merged counts."""
+
+    codepoints = counts["codepoints"]
     inventory = {}
     for point, count in sorted(codepoints.items()):
         ordinal = int(point.replace("U+", "0x", 1), 0)
@@ -38,14 +72,22 @@ def compute_metrics(text: str) -> dict:
             "script": confusables.alias(chr(ordinal)),
         }
     return {
-        "bytes_utf8": len(text.encode("utf-8", "surrogatepass")),
-        "characters": len(text),
-        "lines": len(text.splitlines()),
-        "words": len(_WORD_RE.findall(text)),
-        "newline_style": _newline_style(text),
-        "ascii_characters": sum(ord(char) < 128 for char in text),
-        "non_ascii_characters": sum(ord(char) >= 128 for char in text),
+        "bytes_utf8": counts.get("bytes_utf8", 0),
+        "characters": counts.get("characters", 0),
+        "lines": counts.get("lines", 0),
+        "words": counts.get("words", 0),
+        "newline_style": _newline_style(
+            counts.get("crlf", 0), counts.get("lf", 0), counts.get("cr", 0)
+        ),
+        "ascii_characters": counts.get("ascii_characters", 0),
+        "non_ascii_characters": counts.get("non_ascii_characters", 0),
         "non_ascii_codepoints": dict(sorted(codepoints.items())),
         "non_ascii_inventory": inventory,
         "unicode_version": unicodedata.unidata_version,
     }
+
+
+def compute_metrics(text: str) -> dict:
+    """Return reproducible structural counts, never an AI-likeness score."""
+
+    return metrics_from_counts(metric_counts(text))
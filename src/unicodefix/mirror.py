@@ -0,0 +1,132 @@
+"""Mirrored output trees for ``cleanup-text --output-dir DIR``.
+
+:func:`mirror_path` places each cleaned file below ``DIR`` at the path it was
+named by, so ``-r src`` writes ``DIR/src/...`` and leaves the inputs, which
+may be a read-only checkout, untouched.  :class:`OutputWriter` performs the
+writes on a bounded pool of threads in the parent process, so that slow or
+network filesystems absorb writes while the next files are being cleaned.
+Each output directory is created once per run, and each output is written to
+a temporary file that takes its input's permission bits and is then renamed
+into place; a read-only output from an earlier run is replaced, not opened.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+__all__ = ["WRITER_THREADS", "OutputWriter", "PendingWrite", "mirror_path"]
+
+WRITER_THREADS = 8
+
+
+@dataclass(frozen=True)
+class PendingWrite:
+    """Cleaned ``data`` for ``target``, from input ``source`` with ``mode``."""
+
+    source: str
+    target: str
+    data: bytes
+    mode: int
+
+
+def mirror_path(path: str, directory: str) -> str:
+    """Where input *path* goes below *directory*.
+
+    A relative path inside the current directory keeps its layout; any other
+    path is placed by its absolute path, without the root or drive.
+    """
+
+    relative = os.path.normpath(path)
+    if os.path.isabs(relative) or relative.split(os.sep)[0] == os.pardir:
+        drive, absolute = os.path.splitdrive(os.path.abspath(path))
+        relative = os.path.join(drive.strip(":\\/"), absolute.lstrip("\\/"))
+    return os.path.join(directory, relative)
+
+
+class OutputWriter:
+    """Write :class:`PendingWrite` items on *threads* threads, in order.
+
+    At most *window* writes are queued or running; :meth:`submit` waits for
+    the oldest beyond that.  Results come back in submission order as
+    ``(token, error)``, where *error* is ``None`` or the :class:`OSError`.
+    """
+
+    def __init__(self, *, threads: int = WRITER_THREADS, window: int | None = None):
+        self._pool = ThreadPoolExecutor(threads, thread_name_prefix="unicodefix-write")
+        self._window = window or threads * 4
+        self._pending: deque[tuple[Any, Future]] = deque()
+        self._directories: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _directory(self, directory: str) -> None:
+        with self._lock:
+            if directory in self._directories:
+                return
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._directories.add(directory)
+
+    def write(self, write: PendingWrite) -> None:
+        """Write one output now, in the calling thread."""
+
+        parent = os.path.dirname(write.target) or "."
+        self._directory(parent)
+        descriptor, temporary = tempfile.mkstemp(
+            dir=parent, prefix=f".{os.path.basename(write.target)}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as handle:
+                handle.write(write.data)
+            os.chmod(temporary, write.mode)
+            os.replace(temporary, write.target)
+        except BaseException:
+            try:
+                os.remove(temporary)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _attempt(self, write: PendingWrite) -> OSError | None:
+        try:
+            self.write(write)
+        except OSError as exc:
+            return exc
+        return None
+
+    def submit(
+        self, write: PendingWrite, token: Any
+    ) -> list[tuple[Any, OSError | None]]:
+        """Queue *write*; returns the results finished so far, in order.
+
+        Waits for the oldest writes while more than the window are queued.
+        """
+
+        self._pending.append((token, self._pool.submit(self._attempt, write)))
+        finished = []
+        while self._pending and (
+            len(self._pending) > self._window or self._pending[0][1].done()
+        ):
+            finished.append(self._collect())
+        return finished
+
+    def drain(self) -> Iterator[tuple[Any, OSError | None]]:
+        """Wait for every queued write, yielding results in order."""
+
+        while self._pending:
+            yield self._collect()
+
+    def _collect(self) -> tuple[Any, OSError | None]:
+        token, future = self._pending.popleft()
+        return token, future.result()
+
+    def close(self) -> None:
+        """Finish running writes and drop queued ones."""
+
+        self._pool.shutdown(wait=True, cancel_futures=True)
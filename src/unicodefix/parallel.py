@@ -0,0 +1,85 @@
+"""Ordered, bounded process-pool mapping for multi-file command-line runs.
+
+Workers are initialized once with the run's options, so each task carries only
+its input name.  Results, and anything a task wrote to stdout or stderr, are
+released strictly in input order; at most *window* tasks are in flight, so a
+large input list never builds an unbounded backlog of finished results.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import sys
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, TypeVar
+
+__all__ = ["default_jobs", "ordered_map"]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def default_jobs() -> int:
+    """Number of CPUs this process may run on."""
+
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def _captured(function: Callable[[T], R], item: T) -> tuple[R, str, str]:
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = io.StringIO(), io.StringIO()
+    try:
+        result = function(item)
+        return result, sys.stdout.getvalue(), sys.stderr.getvalue()
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+
+
+def _release(future: Future) -> Any:
+    result, out, err = future.result()
+    if err:
+        sys.stderr.write(err)
+        sys.stderr.flush()
+    if out:
+        sys.stdout.write(out)
+        sys.stdout.flush()
+    return result
+
+
+def ordered_map(
+    function: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    jobs: int,
+    initializer: Callable[..., None] | None = None,
+    initargs: tuple = (),
+    window: int | None = None,
+) -> Iterator[R]:
+    """Yield ``function(item)`` for each item, in order, using *jobs* processes.
+
+    With one job everything runs in this process after calling *initializer*
+    here.  Closing the iterator early cancels tasks that have not started.
+    """
+
+    if jobs <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        yield from map(function, items)
+        return
+    pending: deque[Future] = deque()
+    limit = window or jobs * 4
+    pool = ProcessPoolExecutor(jobs, initializer=initializer, initargs=initargs)
+    try:
+        for item in items:
+            pending.append(pool.submit(_captured, function, item))
+            if len(pending) >= limit:
+                yield _release(pending.popleft())
+        while pending:
+            yield _release(pending.popleft())
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,194 @@
+"""Built-in profiling for ``cleanup-text --profile-out FILE``.
+
+:func:`profiled` runs a block under :mod:`cProfile` and writes the statistics
+to ``FILE`` for :mod:`pstats`, snakeviz, or gprof2dot.  At the same time, where
+``SIGPROF`` exists, :class:`StackSampler` records the whole Python stack every
+:data:`SAMPLE_SECONDS` of CPU time and writes ``FILE.folded`` in the collapsed
+format that ``flamegraph.pl``, speedscope, and inferno read.  Each stack is
+weighted by the CPU microseconds since the previous sample, because timer
+signals that expire during one long C call arrive as a single sample.  Frames of the
+UnicodeFix pipeline stages in :data:`STAGES` are preceded by a
+``[stage:NAME]`` frame, so each stage is one block in a flame graph.  The
+sampling signal handler costs a little time and shows up in the statistics.
+
+cProfile slows the character-by-character scanners several times over.  With
+``deterministic=False`` only the sampler runs, at a cost of a few percent, and
+the collapsed stacks go to ``FILE`` itself.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import os
+import pstats
+import signal
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from types import CodeType, FrameType
+from typing import TextIO
+
+__all__ = [
+    "SAMPLE_SECONDS",
+    "STAGES",
+    "Profile",
+    "StackSampler",
+    "profiled",
+]
+
+SAMPLE_SECONDS = 0.001
+_PACKAGE = os.path.dirname(os.path.abspath(__file__))
+
+# (module file, function) -> stage name.
+STAGES = {
+    ("transforms.py", "clean_text"): "clean",
+    ("source.py", "clean_source_comments"): "clean_source",
+    ("markdown.py", "unwrap_markdown"): "unwrap_markdown",
+    ("scanner.py", "scan_text_for_report"): "scan_report",
+    ("scanner.py", "scan_findings"): "scan_findings",
+    ("scanner.py", "count_findings"): "count_findings",
+    ("chunked.py", "scan_text_for_report_chunked"): "scan_report",
+    ("analysis.py", "report"): "scan_report",
+    ("c2pa.py", "find_c2pa_carriers"): "c2pa",
+    ("source.py", "scan_source"): "scan_source",
+    ("markdown.py", "audit_markdown"): "audit_markdown",
+    ("metrics.py", "compute_metrics"): "metrics",
+    ("analysis.py", "metrics"): "metrics",
+    ("watermarks.py", "detect_profiles"): "watermarks",
+    ("authorship.py", "detect_authorship_profiles"): "authorship",
+}
+_STAGE_FILES = {
+    (os.path.join(_PACKAGE, name), function): stage
+    for (name, function), stage in STAGES.items()
+}
+
+
+def _stage(filename: str, function: str) -> str | None:
+    return _STAGE_FILES.get((os.path.abspath(filename), function))
+
+
+def _frame_name(code: CodeType) -> str:
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)})".replace(";", ":")
+
+
+class StackSampler:
+    """Count Python stacks on ``SIGPROF`` every *interval* seconds of CPU time.
+
+    Must be started and stopped from the main thread.
+    """
+
+    available = hasattr(signal, "SIGPROF") and hasattr(signal, "setitimer")
+
+    def __init__(self, interval: float = SAMPLE_SECONDS) -> None:
+        self.interval = interval
+        self.samples = 0
+        # CPU microseconds per stack.
+        self.stacks: Counter[tuple[CodeType, ...]] = Counter()
+        self._previous = None
+        self._clock = 0
+
+    def _sample(self, signum: int, frame: FrameType | None) -> None:
+        clock = time.process_time_ns()
+        stack = []
+        while frame is not None:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        self.stacks[tuple(reversed(stack))] += (clock - self._clock) // 1000
+        self.samples += 1
+        self._clock = clock
+
+    def start(self) -> None:
+        self._clock = time.process_time_ns()
+        self._previous = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous or signal.SIG_DFL)
+
+    def write_collapsed(self, stream: TextIO) -> None:
+        """Write ``frame;frame;... microseconds`` lines, outermost frame first."""
+
+        lines: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            frames = []
+            for code in stack:
+                stage = _stage(code.co_filename, code.co_name)
+                if stage is not None:
+                    frames.append(f"[stage:{stage}]")
+                frames.append(_frame_name(code))
+            lines[";".join(frames)] += count
+        for line, count in sorted(lines.items()):
+            stream.write(f"{line} {count}\n")
+
+    def stage_seconds(self) -> Counter[str]:
+        """Sampled CPU seconds spent inside each stage."""
+
+        seconds: Counter[str] = Counter()
+        for stack, microseconds in self.stacks.items():
+            stages = {_stage(code.co_filename, code.co_name) for code in stack}
+            for stage in stages - {None}:
+                seconds[stage] += microseconds / 1e6
+        return seconds
+
+
+@dataclass
+class Profile:
+    """What :func:`profiled` wrote, filled in when its block ends."""
+
+    stats_path: str | None = None
+    folded_path: str | None = None
+    samples: int = 0
+    # Cumulative seconds per stage, from cProfile or else from the samples.
+    stages: dict[str, float] = field(default_factory=dict)
+
+
+def _profile_stages(profiler: cProfile.Profile) -> Counter[str]:
+    stages: Counter[str] = Counter()
+    for (filename, _, function), entry in pstats.Stats(profiler).stats.items():
+        stage = _stage(filename, function)
+        if stage is not None:
+            stages[stage] += entry[3]
+    return stages
+
+
+@contextmanager
+def profiled(
+    path: str, *, deterministic: bool = True, interval: float = SAMPLE_SECONDS
+) -> Iterator[Profile]:
+    """Profile the block into *path* and, when also sampling, *path*.folded.
+
+    Without *deterministic* only the sampler runs and *path* receives the
+    collapsed stacks; that needs ``SIGPROF`` (:attr:`StackSampler.available`).
+    """
+
+    result = Profile()
+    sampler = StackSampler(interval) if StackSampler.available else None
+    if sampler is None and not deterministic:
+        raise OSError("stack sampling needs SIGPROF, which this platform lacks")
+    profiler = cProfile.Profile() if deterministic else None
+    if sampler is not None:
+        sampler.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield result
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if sampler is not None:
+            sampler.stop()
+        if profiler is not None:
+            profiler.dump_stats(path)
+            result.stats_path = path
+            result.stages = dict(_profile_stages(profiler).most_common())
+        if sampler is not None:
+            result.folded_path = f"{path}.folded" if deterministic else path
+            with open(result.folded_path, "w", encoding="utf-8") as stream:
+                sampler.write_collapsed(stream)
+            result.samples = sampler.samples
+            if profiler is None:
+                result.stages = dict(sampler.stage_seconds().most_common())
@@ -11,7 +11,16 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 
-__all__ = ["print_csv", "print_human", "print_json", "print_metrics_help"]
+__all__ = [
+    "CsvReportWriter",
+    "print_csv",
+    "print_gate",
+    "print_human",
+    "print_json",
+    "print_metrics_help",
+    "print_ndjson",
+    "scalar_keys",
+]
 
 
 def _console(no_color: bool, file: TextIO) -> Console:
@@ -120,9 +129,9 @@ def print_human(
     data: dict[str, Any],
     *,
     no_color: bool = False,
-    file: TextIO = sys.stdout,
+    file: TextIO | None = None,
 ) -> None:
-    console = _console(no_color, file)
+    console = _console(no_color, file or sys.stdout)
     console.print()
     console.print(f"File: {path}", style="bold")
     console.print(
@@ -149,8 +158,37 @@ def print_human(
     _render_mapping(console, "Planned cleanup", data.get("planned") or {})
 
 
-def print_json(all_results: dict[str, Any], *, file: TextIO = sys.stdout) -> None:
-    print(json.dumps(all_results, indent=2, ensure_ascii=False), file=file)
+def print_gate(
+    summary: dict[str, Any], *, no_color: bool = False, file: TextIO | None = None
+) -> None:
+    console = _console(no_color, file or sys.stdout)
+    categories = ", ".join(summary.get("categories") or ()) or "all categories"
+    if summary.get("tripped_by") is None:
+        console.print(
+            f"Threshold {summary['threshold']} not reached ({categories}) in "
+            f"{summary['files_scanned']} file(s)",
+            style="green",
+        )
+        return
+    console.print(
+        f"Threshold {summary['threshold']} reached ({categories}) by "
+        f"{summary['tripped_by']}: at least {summary['total']} finding(s) "
+        f"after {summary['files_scanned']} file(s)",
+        style="bold red",
+    )
+
+
+def print_json(all_results: dict[str, Any], *, file: TextIO | None = None) -> None:
+    print(
+        json.dumps(all_results, indent=2, ensure_ascii=False), file=file or sys.stdout
+    )
+
+
+def print_ndjson(record: dict[str, Any], *, file: TextIO | None = None) -> None:
+    """Write one compact JSON record per line and flush it immediately."""
+    file = file or sys.stdout
+    file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+    file.flush()
 
 
 def _category_counts(data: dict[str, Any]) -> dict[str, int]:
@@ -161,29 +199,88 @@ def _category_counts(data: dict[str, Any]) -> dict[str, int]:
     return result
 
 
-def print_csv(all_results: dict[str, Any], *, file: TextIO = sys.stdout) -> None:
+_CSV_CATEGORIES = [
+    "provenance",
+    "unicode_security",
+    "known_watermark",
+    "authorship_signal",
+    "typography",
+    "formatting",
+]
+
+
+def scalar_keys(values: dict[str, Any]) -> list[str]:
+    """Sorted keys of the values CSV can hold in one cell."""
+    return sorted(
+        key for key, value in values.items() if not isinstance(value, (dict, list))
+    )
+
+
+class CsvReportWriter:
+    """Write one CSV row per report as it arrives, with columns fixed up front."""
+
+    def __init__(
+        self,
+        file: TextIO,
+        *,
+        metric_keys: list[str],
+        planned_keys: list[str],
+        before_after_keys: list[str],
+    ) -> None:
+        self.metric_keys = metric_keys
+        self.planned_keys = planned_keys
+        self.before_after_keys = before_after_keys
+        fieldnames = [
+            "file",
+            "schema_version",
+            "total",
+            *_CSV_CATEGORIES,
+            *metric_keys,
+            *(f"planned_{key}" for key in planned_keys),
+            *(f"before_{key}" for key in before_after_keys),
+            *(f"after_{key}" for key in before_after_keys),
+        ]
+        self._writer = csv.DictWriter(file, fieldnames=fieldnames)
+        self._writer.writeheader()
+
+    def write(self, label: str, data: dict[str, Any]) -> None:
+        row: dict[str, Any] = {
+            "file": label,
+            "schema_version": data.get("schema_version", "legacy"),
+            "total": data.get("total", 0),
+        }
+        counts = _category_counts(data)
+        row.update({category: counts.get(category, 0) for category in _CSV_CATEGORIES})
+        metrics = data.get("metrics") or {}
+        row.update({key: metrics.get(key, "") for key in self.metric_keys})
+        planned = data.get("planned") or {}
+        row.update(
+            {f"planned_{key}": planned.get(key, "") for key in self.planned_keys}
+        )
+        for stage in ("before", "after"):
+            values = planned.get(stage) or {}
+            row.update(
+                {
+                    f"{stage}_{key}": values.get(key, "")
+                    for key in self.before_after_keys
+                }
+            )
+        self._writer.writerow(row)
+
+
+def print_csv(all_results: dict[str, Any], *, file: TextIO | None = None) -> None:
     metric_keys = sorted(
         {
             key
             for data in all_results.values()
-            for key, value in (data.get("metrics") or {}).items()
-            if not isinstance(value, (dict, list))
+            for key in scalar_keys(data.get("metrics") or {})
         }
     )
-    categories = [
-        "provenance",
-        "unicode_security",
-        "known_watermark",
-        "authorship_signal",
-        "typography",
-        "formatting",
-    ]
     planned_keys = sorted(
         {
             key
             for data in all_results.values()
-            for key, value in (data.get("planned") or {}).items()
-            if not isinstance(value, (dict, list))
+            for key in scalar_keys(data.get("planned") or {})
         }
     )
     before_after_keys = sorted(
@@ -191,41 +288,17 @@ def print_csv(all_results: dict[str, Any], *, file: TextIO = sys.stdout) -> None
             key
             for data in all_results.values()
             for stage in ("before", "after")
-            for key, value in (((data.get("planned") or {}).get(stage) or {}).items())
-            if not isinstance(value, (dict, list))
+            for key in scalar_keys((data.get("planned") or {}).get(stage) or {})
         }
     )
-    fieldnames = [
-        "file",
-        "schema_version",
-        "total",
-        *categories,
-        *metric_keys,
-        *(f"planned_{key}" for key in planned_keys),
-        *(f"before_{key}" for key in before_after_keys),
-        *(f"after_{key}" for key in before_after_keys),
-    ]
-    writer = csv.DictWriter(file, fieldnames=fieldnames)
-    writer.writeheader()
+    writer = CsvReportWriter(
+        file or sys.stdout,
+        metric_keys=metric_keys,
+        planned_keys=planned_keys,
+        before_after_keys=before_after_keys,
+    )
     for label, data in all_results.items():
-        row: dict[str, Any] = {
-            "file": label,
-            "schema_version": data.get("schema_version", "legacy"),
-            "total": data.get("total", 0),
-        }
-        counts = _category_counts(data)
-        row.update({category: counts.get(category, 0) for category in categories})
-        row.update(
-            {key: (data.get("metrics") or {}).get(key, "") for key in metric_keys}
-        )
-        planned = data.get("planned") or {}
-        row.update({f"planned_{key}": planned.get(key, "") for key in planned_keys})
-        for stage in ("before", "after"):
-            values = planned.get(stage) or {}
-            row.update(
-                {f"{stage}_{key}": values.get(key, "") for key in before_after_keys}
-            )
-        writer.writerow(row)
+        writer.write(label, data)
 
 
 def print_metrics_help(*, no_color: bool = False) -> None:
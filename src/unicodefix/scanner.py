@@ -7,13 +7,14 @@ and additionally returns the v2 finding envelope.
 from __future__ import annotations
 
 from collections import defaultdict
-from dataclasses import asdict, dataclass
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field, replace
 
 import regex
 import unicodedata2 as unicodedata
 from confusable_homoglyphs import confusables
 
-from unicodefix.c2pa import c2pa_findings
+from unicodefix.c2pa import c2pa_findings, find_c2pa_carriers
 from unicodefix.findings import Finding, Findings, Location
 
 _BIDI_RANGES = ((0x061C, 0x061C), (0x200E, 0x200F), (0x202A, 0x202E), (0x2066, 0x2069))
@@ -152,71 +153,190 @@ def _script(char: str) -> str:
     return "Common" if unicodedata.category(char)[0] in "PZSN" else "Other"
 
 
-def scan_findings(text: str, *, location_limit: int = 100) -> Findings:
-    """Return detailed locally observable Unicode and C2PA findings."""
+def _character_signals(char: str, offset: int, category: str) -> list[tuple[str, str]]:
+    """Return the ``(category, signal)`` pairs observed for one character."""
+
+    point = ord(char)
+    signals: list[tuple[str, str]] = []
+    if _DICP_CHAR_RE.fullmatch(char):
+        signals.append(("unicode_security", "default_ignorable"))
+    if point == 0x00AD:
+        signals.append(("unicode_security", "soft_hyphen"))
+    if point in (0x2060, 0x034F):
+        signals.append(("unicode_security", "word_or_grapheme_joiner"))
+    if _in_ranges(point, _BIDI_RANGES):
+        signals.append(("unicode_security", "bidi_control"))
+    if _in_ranges(point, _VS_RANGES):
+        signals.append(("unicode_security", "variation_selector"))
+    if 0xE0000 <= point <= 0xE007F:
+        signals.append(("unicode_security", "tag_character"))
+    if _is_private_use(point):
+        signals.append(("unicode_security", "private_use"))
+    if _is_noncharacter(point):
+        signals.append(("unicode_security", "noncharacter"))
+    if category == "Cn":
+        signals.append(("unicode_security", "unassigned"))
+    if category == "Cs":
+        signals.append(("unicode_security", "surrogate"))
+    if char == "\ufffd":
+        signals.append(("unicode_security", "replacement_character"))
+    if point == 0xFEFF and offset != 0:
+        signals.append(("unicode_security", "noninitial_bom"))
+    if char in "“”‘’":
+        signals.append(("typography", "smart_quote"))
+    elif char in "\u2010\u2011\u2012\u2013\u2014\u2015":
+        signals.append(("typography", "unicode_dash_or_hyphen"))
+    elif char in "\u2025\u2026\u22ef":
+        signals.append(("typography", "unicode_ellipsis"))
+    if category == "Zs" and char != " ":
+        signals.append(("formatting", "unusual_space_separator"))
+    return signals
+
+
+def _rebase(location: Location, base_offset: int, base_line: int) -> Location:
+    if not base_offset and not base_line:
+        return location
+    return Location(
+        location.line + base_line,
+        location.column,
+        None if location.end_line is None else location.end_line + base_line,
+        location.end_column,
+        None if location.offset is None else location.offset + base_offset,
+        None if location.end_offset is None else location.end_offset + base_offset,
+    )
+
+
+@dataclass
+class PartialScan:
+    """Mergeable scanner state for one newline-aligned slice of a document.
+
+    Locations are already rebased to document coordinates and truncated to the
+    location limit, so slices can be scanned independently and merged in order.
+    """
+
+    counts: dict[tuple[str, str], int] = field(default_factory=dict)
+    locations: dict[tuple[str, str], list[Location]] = field(default_factory=dict)
+    scripts: set[str] = field(default_factory=set)
+    token_count: int = 0
+    tokens: list[dict] = field(default_factory=list)
+    token_locations: list[Location] = field(default_factory=list)
+    nfc_changes: bool = False
+    nfkc_changes: bool = False
+    aggregates: dict[str, dict[str, int]] | None = None
+
+    def rebased(self, base_offset: int, base_line: int) -> PartialScan:
+        """A copy whose locations are shifted by *base_offset* and *base_line*."""
+
+        return replace(
+            self,
+            locations={
+                key: [_rebase(location, base_offset, base_line) for location in kept]
+                for key, kept in self.locations.items()
+            },
+            token_locations=[
+                _rebase(location, base_offset, base_line)
+                for location in self.token_locations
+            ],
+        )
+
+
+def scan_partial(
+    text: str,
+    *,
+    base_offset: int = 0,
+    base_line: int = 0,
+    location_limit: int = 100,
+    aggregates: bool = False,
+    confusables: bool = True,
+) -> PartialScan:
+    """Scan *text* as the slice starting at *base_offset* on line *base_line* + 1.
+
+    A slice must begin at the start of the document or directly after a
+    newline; Unicode tokens and normalization never cross such a boundary.
+    Without *confusables* the per-token confusable analysis is skipped.
+    """
 
     grouped: dict[tuple[str, str], list[int]] = defaultdict(list)
-    scripts: set[str] = set()
+    partial = PartialScan()
     for offset, char in enumerate(text):
-        point = ord(char)
-        category = unicodedata.category(char)
         if char.isalpha():
             script = _script(char)
             if script not in {"Common", "Other"}:
-                scripts.add(script)
-        signals: list[str] = []
-        if _DICP_CHAR_RE.fullmatch(char):
-            signals.append("default_ignorable")
-        if point == 0x00AD:
-            signals.append("soft_hyphen")
-        if point in (0x2060, 0x034F):
-            signals.append("word_or_grapheme_joiner")
-        if _in_ranges(point, _BIDI_RANGES):
-            signals.append("bidi_control")
-        if _in_ranges(point, _VS_RANGES):
-            signals.append("variation_selector")
-        if 0xE0000 <= point <= 0xE007F:
-            signals.append("tag_character")
-        if _is_private_use(point):
-            signals.append("private_use")
-        if _is_noncharacter(point):
-            signals.append("noncharacter")
-        if category == "Cn":
-            signals.append("unassigned")
-        if category == "Cs":
-            signals.append("surrogate")
-        if char == "\ufffd":
-            signals.append("replacement_character")
-        if point == 0xFEFF and offset != 0:
-            signals.append("noninitial_bom")
-        for signal in signals:
-            grouped[("unicode_security", signal)].append(offset)
-        if char in "“”‘’":
-            grouped[("typography", "smart_quote")].append(offset)
-        elif char in "\u2010\u2011\u2012\u2013\u2014\u2015":
-            grouped[("typography", "unicode_dash_or_hyphen")].append(offset)
-        elif char in "\u2025\u2026\u22ef":
-            grouped[("typography", "unicode_ellipsis")].append(offset)
-        if unicodedata.category(char) == "Zs" and char != " ":
-            grouped[("formatting", "unusual_space_separator")].append(offset)
+                partial.scripts.add(script)
+        for key in _character_signals(
+            char, base_offset + offset, unicodedata.category(char)
+        ):
+            grouped[key].append(offset)
+    for key, offsets in grouped.items():
+        partial.counts[key] = len(offsets)
+        partial.locations[key] = [
+            _rebase(_location(text, offset), base_offset, base_line)
+            for offset in offsets[:location_limit]
+        ]
+    for match in _TOKEN_RE.finditer(text) if confusables else ():
+        analysis = analyze_confusable_token(match.group(0))
+        if analysis is None:
+            continue
+        partial.token_count += 1
+        if len(partial.tokens) < location_limit:
+            partial.tokens.append(analysis)
+            partial.token_locations.append(
+                _rebase(
+                    _span_location(text, match.start(), match.end()),
+                    base_offset,
+                    base_line,
+                )
+            )
+    partial.nfc_changes = unicodedata.normalize("NFC", text) != text
+    partial.nfkc_changes = unicodedata.normalize("NFKC", text) != text
+    if aggregates:
+        partial.aggregates = _aggregate_counts(text)
+    return partial
+
+
+def findings_from_partials(
+    partials: Iterable[PartialScan],
+    provenance: Iterable[Finding],
+    *,
+    location_limit: int = 100,
+) -> Findings:
+    """Merge ordered slice scans into the envelope ``scan_findings`` returns."""
+
+    counts: dict[tuple[str, str], int] = defaultdict(int)
+    grouped: dict[tuple[str, str], list[Location]] = defaultdict(list)
+    scripts: set[str] = set()
+    token_count = 0
+    confusable_tokens: list[dict] = []
+    confusable_locations: list[Location] = []
+    nfc_changes = nfkc_changes = False
+    for partial in partials:
+        for key, count in partial.counts.items():
+            counts[key] += count
+            kept = grouped[key]
+            kept.extend(partial.locations[key][: location_limit - len(kept)])
+        scripts |= partial.scripts
+        token_count += partial.token_count
+        room = location_limit - len(confusable_tokens)
+        confusable_tokens.extend(partial.tokens[:room])
+        confusable_locations.extend(partial.token_locations[:room])
+        nfc_changes = nfc_changes or partial.nfc_changes
+        nfkc_changes = nfkc_changes or partial.nfkc_changes
 
     findings = Findings()
-    for (category, signal), offsets in sorted(grouped.items()):
-        locations = tuple(
-            _location(text, offset) for offset in offsets[:location_limit]
-        )
+    for category, signal in sorted(counts):
+        count = counts[(category, signal)]
         removable = signal not in {"variation_selector", "mixed_scripts"}
         findings.add(
             Finding(
                 category=category,
                 signal=signal,
-                count=len(offsets),
-                locations=locations,
+                count=count,
+                locations=tuple(grouped[(category, signal)]),
                 confidence="high",
                 removable=removable,
                 planned_action="remove" if removable else "report",
-                message=f"{len(offsets)} {signal.replace('_', ' ')} character(s) found locally.",
-                details={"locations_truncated": len(offsets) > location_limit},
+                message=f"{count} {signal.replace('_', ' ')} character(s) found locally.",
+                details={"locations_truncated": count > location_limit},
             )
         )
     if len(scripts) > 1:
@@ -232,34 +352,24 @@ def scan_findings(text: str, *, location_limit: int = 100) -> Findings:
                 details={"scripts": sorted(scripts)},
             )
         )
-    confusable_tokens = []
-    confusable_locations = []
-    for match in _TOKEN_RE.finditer(text):
-        analysis = analyze_confusable_token(match.group(0))
-        if analysis is None:
-            continue
-        confusable_tokens.append(analysis)
-        confusable_locations.append(_span_location(text, match.start(), match.end()))
-    if confusable_tokens:
+    if token_count:
         findings.add(
             Finding(
                 category="unicode_security",
                 signal="confusable_mixed_script_token",
-                count=len(confusable_tokens),
-                locations=tuple(confusable_locations[:location_limit]),
+                count=token_count,
+                locations=tuple(confusable_locations),
                 confidence="medium",
                 removable=False,
                 planned_action="report",
                 message="Mixed-script token(s) contain Unicode confusables; skeletons are detection-only.",
                 details={
-                    "tokens": confusable_tokens[:location_limit],
-                    "locations_truncated": len(confusable_tokens) > location_limit,
+                    "tokens": confusable_tokens,
+                    "locations_truncated": token_count > location_limit,
                 },
             )
         )
-    nfc = unicodedata.normalize("NFC", text)
-    nfkc = unicodedata.normalize("NFKC", text)
-    if nfc != text or nfkc != text:
+    if nfc_changes or nfkc_changes:
         findings.add(
             Finding(
                 category="unicode_security",
@@ -268,14 +378,78 @@ def scan_findings(text: str, *, location_limit: int = 100) -> Findings:
                 removable=False,
                 planned_action="report",
                 message="Unicode normalization would change this document.",
-                details={"nfc_changes": nfc != text, "nfkc_changes": nfkc != text},
+                details={"nfc_changes": nfc_changes, "nfkc_changes": nfkc_changes},
             )
         )
-    for finding in c2pa_findings(text):
+    for finding in provenance:
         findings.add(finding)
     return findings
 
 
+def scan_findings(
+    text: str, *, location_limit: int = 100, confusables: bool = True
+) -> Findings:
+    """Return detailed locally observable Unicode and C2PA findings."""
+
+    return findings_from_partials(
+        [scan_partial(text, location_limit=location_limit, confusables=confusables)],
+        c2pa_findings(text),
+        location_limit=location_limit,
+    )
+
+
+def count_findings(
+    text: str, categories: Iterable[str] | None = None, *, limit: int | None = None
+) -> int:
+    """Return the ``scan_findings`` total for *categories*, stopping at *limit*.
+
+    A threshold gate only needs to know whether a count is reached, so this
+    builds no locations or details and returns as soon as ``limit`` is met.
+    The returned value is then a lower bound of the full total.
+    """
+
+    wanted = set(categories or ())
+
+    def selected(category: str) -> bool:
+        return not wanted or category in wanted
+
+    total = 0
+    if selected("unicode_security") or selected("typography") or selected("formatting"):
+        scripts: set[str] = set()
+        track_scripts = selected("unicode_security")
+        for offset, char in enumerate(text):
+            if track_scripts and char.isalpha():
+                script = _script(char)
+                if script not in {"Common", "Other"}:
+                    scripts.add(script)
+            for category, _ in _character_signals(
+                char, offset, unicodedata.category(char)
+            ):
+                if selected(category):
+                    total += 1
+            if limit is not None:
+                mixed = len(scripts) if len(scripts) > 1 else 0
+                if total + mixed >= limit:
+                    return total + mixed
+        if len(scripts) > 1:
+            total += len(scripts)
+    if selected("unicode_security"):
+        for match in _TOKEN_RE.finditer(text):
+            if analyze_confusable_token(match.group(0)) is None:
+                continue
+            total += 1
+            if limit is not None and total >= limit:
+                return total
+        if (
+            unicodedata.normalize("NFC", text) != text
+            or unicodedata.normalize("NFKC", text) != text
+        ):
+            total += 1
+    if selected("provenance") and (limit is None or total < limit):
+        total += len(find_c2pa_carriers(text))
+    return total
+
+
 @dataclass
 class ScanResult:
     unicode_ghosts: dict
@@ -298,8 +472,8 @@ class ScanResult:
         return total + (0 if self.final_newline else 1)
 
 
-def scan_text_for_report(text: str) -> dict:
-    """Legacy aggregate report plus the v2 ``findings`` envelope."""
+def _aggregate_counts(text: str) -> dict[str, dict[str, int]]:
+    """Legacy per-character and per-line counts; additive across line slices."""
 
     zs = "\u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u202f\u205f\u3000"
     smart_basic = _count_many(text, "“”‘’")
@@ -353,10 +527,49 @@ def scan_text_for_report(text: str) -> dict:
             line.strip("\r\n") != "" and line.strip() == "" for line in lines
         ),
     }
+    return {
+        "unicode_ghosts": ghosts,
+        "typographic": typographic,
+        "whitespace": whitespace,
+    }
+
+
+def merge_aggregates(
+    parts: Iterable[dict[str, dict[str, int]]],
+) -> dict[str, dict[str, int]]:
+    """Sum legacy aggregate counts from ordered line slices."""
+
+    merged: dict[str, dict[str, int]] = {}
+    for part in parts:
+        for group, values in part.items():
+            target = merged.setdefault(group, {})
+            for key, value in values.items():
+                target[key] = target.get(key, 0) + value
+    return merged
+
+
+def report_from_parts(
+    aggregates: dict[str, dict[str, int]], final_newline: bool, findings: Findings
+) -> dict:
+    """Assemble the ``scan_text_for_report`` dictionary from scanned parts."""
+
     result = ScanResult(
-        ghosts, typographic, whitespace, bool(text) and text.endswith(("\n", "\r"))
+        aggregates["unicode_ghosts"],
+        aggregates["typographic"],
+        aggregates["whitespace"],
+        final_newline,
     )
     data = asdict(result)
     data["total"] = result.total_counts()
-    data.update(scan_findings(text).to_dict())
+    data.update(findings.to_dict())
     return data
+
+
+def scan_text_for_report(text: str, *, confusables: bool = True) -> dict:
+    """Legacy aggregate report plus the v2 ``findings`` envelope."""
+
+    return report_from_parts(
+        _aggregate_counts(text),
+        bool(text) and text.endswith(("\n", "\r")),
+        scan_findings(text, confusables=confusables),
+    )
@@ -0,0 +1,186 @@
+"""Deterministic input sharding and shard report merging.
+
+``--shard INDEX/COUNT`` lets several CI runners split one audit without
+sharing a file list.  By default a file belongs to the shard picked by a
+BLAKE2 hash of its normalized path, so every runner decides alone and
+streamed inputs stay streamed; runners must name files by the same relative
+paths.  ``--shard-by size`` instead lists every input, sorts them by size,
+and deals each to the least loaded shard, which balances bytes rather than
+file counts.
+
+:func:`merge_reports` combines the ``--json`` or ``--ndjson`` outputs of the
+shards for ``cleanup-text merge-reports``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import os
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import IO, Any
+
+__all__ = [
+    "MergedReports",
+    "Shard",
+    "hash_shard",
+    "merge_reports",
+    "parse_shard",
+    "shard_files",
+    "size_shard",
+]
+
+
+@dataclass(frozen=True)
+class Shard:
+    """The 1-based shard ``index`` of ``count``."""
+
+    index: int
+    count: int
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+def parse_shard(text: str) -> Shard:
+    """Parse ``INDEX/COUNT``; raises :class:`ValueError` when malformed."""
+
+    index, slash, count = text.partition("/")
+    try:
+        shard = Shard(int(index), int(count))
+    except ValueError:
+        slash = ""
+    if not slash:
+        raise ValueError(f"expected INDEX/COUNT, got {text!r}")
+    if not 1 <= shard.index <= shard.count:
+        raise ValueError(f"shard {text} is outside 1..COUNT")
+    return shard
+
+
+def _bucket(path: str, count: int) -> int:
+    name = os.path.normpath(path).replace(os.sep, "/")
+    digest = hashlib.blake2b(os.fsencode(name), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+def hash_shard(
+    files: Iterable[str], shard: Shard, stats: Counter[str] | None = None
+) -> Iterator[str]:
+    """Yield the files of *files* whose path hashes into *shard*."""
+
+    for path in files:
+        if stats is not None:
+            stats["seen"] += 1
+        if _bucket(path, shard.count) == shard.index - 1:
+            if stats is not None:
+                stats["files"] += 1
+            yield path
+
+
+def size_shard(
+    files: Iterable[str], shard: Shard, stats: Counter[str] | None = None
+) -> list[str]:
+    """The files that size-balanced dealing assigns to *shard*, in input order."""
+
+    files = list(dict.fromkeys(files))
+    sizes = {}
+    for path in files:
+        try:
+            sizes[path] = os.stat(path).st_size
+        except OSError:
+            sizes[path] = 0
+    # Largest first onto the lightest shard; ties go by path and shard number.
+    loads = [(0, number) for number in range(shard.count)]
+    mine = set()
+    for path in sorted(files, key=lambda name: (-sizes[name], name)):
+        load, number = heapq.heappop(loads)
+        if number == shard.index - 1:
+            mine.add(path)
+        heapq.heappush(loads, (load + sizes[path], number))
+    selected = [path for path in files if path in mine]
+    if stats is not None:
+        stats["seen"] += len(files)
+        stats["files"] += len(selected)
+        stats["bytes"] += sum(sizes[path] for path in selected)
+    return selected
+
+
+def shard_files(
+    files: Iterable[str],
+    shard: Shard,
+    *,
+    by: str = "path",
+    stats: Counter[str] | None = None,
+) -> Iterable[str]:
+    """Select *shard* of *files* by path hash or, with ``by="size"``, by size."""
+
+    if by == "size":
+        return size_shard(files, shard, stats)
+    if isinstance(files, list):
+        return list(hash_shard(files, shard, stats))
+    return hash_shard(files, shard, stats)
+
+
+@dataclass
+class MergedReports:
+    """Per-file reports and the shard summaries they arrived with."""
+
+    reports: dict[str, dict[str, Any]] = field(default_factory=dict)
+    summaries: list[dict[str, Any]] = field(default_factory=list)
+    # Which summary (by position) each file's report came with, if any.
+    origins: dict[str, int] = field(default_factory=dict)
+
+
+def _records(stream: IO[str]) -> Iterator[dict[str, Any]]:
+    text = stream.read()
+    try:
+        document = json.loads(text)
+    except json.JSONDecodeError:
+        # Several NDJSON records.
+        document = None
+    if isinstance(document, dict) and "type" not in document:
+        # A --json report: one object keyed by file.
+        for name, report in document.items():
+            yield {"type": "file", "file": name, "report": report}
+        return
+    for line in text.splitlines():
+        if line.strip():
+            yield json.loads(line)
+
+
+def merge_reports(streams: Iterable[tuple[str, IO[str]]]) -> MergedReports:
+    """Read ``(name, stream)`` shard outputs into one :class:`MergedReports`.
+
+    A file reported by two shards raises :class:`ValueError`, as does output
+    that is neither ``--json`` nor ``--ndjson`` report output.
+    """
+
+    merged = MergedReports()
+    for name, stream in streams:
+        try:
+            records = list(_records(stream))
+        except json.JSONDecodeError as exc:
+            raise ValueError(
+                f"{name} is not JSON or NDJSON report output: {exc}"
+            ) from None
+        summary = next(
+            (record for record in records if record.get("type") == "summary"), None
+        )
+        if summary is not None:
+            merged.summaries.append(summary)
+        for record in records:
+            kind = record.get("type")
+            if kind == "summary":
+                continue
+            if kind != "file" or not isinstance(record.get("report"), dict):
+                raise ValueError(f"{name} holds a {kind!r} record, not a file report")
+            path = record["file"]
+            if path in merged.reports:
+                raise ValueError(f"{path} is reported by more than one shard")
+            merged.reports[path] = record["report"]
+            if summary is not None:
+                merged.origins[path] = len(merged.summaries) - 1
+    return merged
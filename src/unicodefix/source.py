@@ -9,6 +9,7 @@ enhancement; Python source remains useful with the standard library alone.
 from __future__ import annotations
 
 import ast
+import bisect
 import io
 import os
 import re
@@ -70,13 +71,9 @@ def _offset(starts: list[int], line: int, column: int) -> int:
 
 
 def _position(starts: list[int], index: int) -> tuple[int, int]:
-    # A short linear scan avoids a dependency and is insignificant next to
-    # parsing; source findings are normally sparse.
-    line = 1
-    for number, start in enumerate(starts, 1):
-        if start > index:
-            break
-        line = number
+    # Identifier indexing asks for every identifier's position, so this must
+    # not be linear in the number of lines.
+    line = max(1, bisect.bisect_right(starts, index))
     return line, index - starts[line - 1] + 1
 
 
@@ -243,28 +240,55 @@ def _context_at(index: int, spans: Iterable[_Span]) -> str:
     return "syntax"
 
 
-def scan_source(
+def _source_spans(
+    text: str, language: str | None, path: str | None, generic: bool = False
+) -> tuple[str, str, bool | None, list[_Span]]:
+    source_language = _language(language, path)
+    if generic:
+        return source_language, "generic", None, _generic_spans(text)
+    if source_language == "python":
+        spans, parse_valid = _python_spans(text)
+        return source_language, "python-tokenize", parse_valid, spans
+    parsed = _tree_sitter_spans(text, source_language)
+    if parsed is not None:
+        spans, parse_valid = parsed
+        return source_language, "tree-sitter", parse_valid, spans
+    return source_language, "generic", None, _generic_spans(text)
+
+
+def source_identifiers(
     text: str, language: str | None = None, path: str | None = None
+) -> list[tuple[str, int, int]]:
+    """Return each distinct identifier with its first one-based line and column."""
+    _, _, _, spans = _source_spans(text, language, path)
+    starts = _line_offsets(text)
+    seen: dict[str, tuple[str, int, int]] = {}
+    for span in sorted(spans, key=lambda item: item.start):
+        if span.context != "identifiers":
+            continue
+        name = text[span.start : span.end]
+        if name not in seen:
+            seen[name] = (name, *_position(starts, span.start))
+    return list(seen.values())
+
+
+def scan_source(
+    text: str,
+    language: str | None = None,
+    path: str | None = None,
+    *,
+    generic: bool = False,
 ) -> dict:
     """Inspect source without modifying it.
 
     Results distinguish comments, strings, identifiers, and unclassified syntax.
     ``parse_valid`` is ``None`` for generic fallback lexing, rather than an
-    unsafe guess about a language we cannot parse.
+    unsafe guess about a language we cannot parse.  *generic* forces that
+    lexing instead of a parser.
     """
-    source_language = _language(language, path)
-    parser = "generic"
-    parse_valid: bool | None = None
-    if source_language == "python":
-        spans, parse_valid = _python_spans(text)
-        parser = "python-tokenize"
-    else:
-        parsed = _tree_sitter_spans(text, source_language)
-        if parsed is not None:
-            spans, parse_valid = parsed
-            parser = "tree-sitter"
-        else:
-            spans = _generic_spans(text)
+    source_language, parser, parse_valid, spans = _source_spans(
+        text, language, path, generic
+    )
 
     counts = {name: 0 for name in ("comments", "strings", "identifiers", "syntax")}
     regions = {name: 0 for name in counts}
@@ -0,0 +1,189 @@
+"""Persistent per-file state for ``cleanup-text --incremental``.
+
+Each processed file is recorded with its size, modification time, inode,
+content hash, the hash of the options it was processed with, its result, and
+how long it took, and for a report run the report itself.  A later run skips
+a file whose stat and options match, and a report run replays its report.
+Like Git's index, a timestamp recorded within :data:`RACY_NS` of the moment
+it was written cannot prove the file was not modified again within the same
+timestamp tick, so such entries, and entries whose size matches but whose
+mtime or inode moved, fall back to comparing the content hash.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from unicodefix.cache import default_cache_dir, file_fingerprint
+
+__all__ = ["RACY_NS", "FileState", "IncrementalState", "default_state_path"]
+
+# Coarse file systems (FAT, HFS+, some network mounts) keep 1–2 s timestamps.
+RACY_NS = 2_000_000_000
+_COMMIT_EVERY = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    options TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    result INTEGER NOT NULL,
+    elapsed REAL NOT NULL,
+    recorded_ns INTEGER NOT NULL,
+    report TEXT
+)
+"""
+_COLUMNS = (
+    "path, options, size, mtime_ns, inode, digest, result, elapsed, recorded_ns, "
+    "report"
+)
+
+
+def default_state_path() -> Path:
+    return default_cache_dir().parent / "state.sqlite"
+
+
+@dataclass(frozen=True)
+class FileState:
+    """Stat identity and content hash of a file as last processed."""
+
+    size: int
+    mtime_ns: int
+    inode: int
+    digest: str
+
+    @classmethod
+    def of(cls, path: str) -> FileState | None:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        digest = file_fingerprint(path)
+        if digest is None:
+            return None
+        return cls(stat.st_size, stat.st_mtime_ns, stat.st_ino, digest)
+
+
+class IncrementalState:
+    """SQLite-backed record of files processed under one options hash.
+
+    ``stats`` counts ``skipped`` and ``processed`` files, ``hashed`` racy or
+    touched files whose content was compared, ``skipped_nonzero`` skipped
+    files whose recorded result was nonzero, and ``saved_seconds``: the
+    recorded processing time of every skipped file.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], *, options: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(os.fspath(path))
+        self._connection.execute(_SCHEMA)
+        columns = {
+            row[1] for row in self._connection.execute("PRAGMA table_info(files)")
+        }
+        if "report" not in columns:
+            # State files from before reports were recorded.
+            self._connection.execute("ALTER TABLE files ADD COLUMN report TEXT")
+        self.options = options
+        self.stats: Counter[str] = Counter()
+        self._pending = 0
+
+    def close(self) -> None:
+        self._connection.commit()
+        self._connection.close()
+
+    def unchanged(self, path: str) -> bool:
+        """Whether *path* is unchanged since it was recorded with these options."""
+
+        return self._unchanged(path, report=False) is not None
+
+    def replay(self, path: str) -> dict[str, Any] | None:
+        """The report recorded for *path* if it is unchanged, else ``None``."""
+
+        report = self._unchanged(path, report=True)
+        return None if report is None else json.loads(report)
+
+    def _unchanged(self, path: str, *, report: bool) -> str | None:
+        absolute = os.path.abspath(path)
+        row = self._connection.execute(
+            "SELECT options, size, mtime_ns, inode, digest, result, elapsed, "
+            "recorded_ns, report FROM files WHERE path = ?",
+            (absolute,),
+        ).fetchone()
+        if row is None or row[0] != self.options or (report and row[8] is None):
+            return None
+        _, size, mtime_ns, inode, digest, result, elapsed, recorded_ns, data = row
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if stat.st_size != size:
+            return None
+        racy = recorded_ns - stat.st_mtime_ns < RACY_NS
+        if racy or (stat.st_mtime_ns, stat.st_ino) != (mtime_ns, inode):
+            self.stats["hashed"] += 1
+            if file_fingerprint(path) != digest:
+                return None
+            # Refresh the stat so the next run can trust it without hashing.
+            self._connection.execute(
+                "UPDATE files SET mtime_ns = ?, inode = ?, recorded_ns = ? "
+                "WHERE path = ?",
+                (stat.st_mtime_ns, stat.st_ino, time.time_ns(), absolute),
+            )
+            self._committed()
+        self.stats["skipped"] += 1
+        self.stats["skipped_nonzero"] += bool(result)
+        self.stats["saved_seconds"] += elapsed
+        return data or ""
+
+    def record(
+        self,
+        path: str,
+        state: FileState | None,
+        result: int,
+        elapsed: float,
+        report: dict[str, Any] | None = None,
+    ) -> None:
+        """Remember *path* as processed; a missing *state* forgets it instead.
+
+        A *report* is kept so that :meth:`replay` can return it.
+        """
+
+        absolute = os.path.abspath(path)
+        self.stats["processed"] += 1
+        if state is None:
+            self._connection.execute("DELETE FROM files WHERE path = ?", (absolute,))
+        else:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO files ({_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    absolute,
+                    self.options,
+                    state.size,
+                    state.mtime_ns,
+                    state.inode,
+                    state.digest,
+                    result,
+                    elapsed,
+                    time.time_ns(),
+                    None if report is None else json.dumps(report),
+                ),
+            )
+        self._committed()
+
+    def _committed(self) -> None:
+        # One transaction per file would fsync tens of thousands of times.
+        self._pending += 1
+        if self._pending >= _COMMIT_EVERY:
+            self._connection.commit()
+            self._pending = 0
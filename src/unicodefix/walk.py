@@ -0,0 +1,308 @@
+"""Streaming directory walker for ``cleanup-text --recursive``.
+
+Directories are read with :func:`os.scandir` and paths are yielded as they are
+found, so a large tree never becomes an argument list or an in-memory list.
+``.gitignore`` and ``.ignore`` files are honored with Git's pattern rules
+(last match wins, ``!`` re-includes, a trailing ``/`` matches directories
+only, and a pattern containing ``/`` is anchored to its file's directory).
+Files whose first block contains NUL or invalid UTF-8 are skipped before any
+decoding is attempted.
+
+:func:`read_file_list` streams the paths of ``--files-from`` in the same lazy
+way, so a list from ``find -print0`` or ``git ls-files -z`` is never held in
+memory either.
+"""
+
+from __future__ import annotations
+
+import codecs
+import fnmatch
+import os
+import re
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import IO
+
+from unicodefix.archives import is_archive
+
+__all__ = [
+    "IGNORE_FILES",
+    "LIST_CHUNK_BYTES",
+    "SNIFF_BYTES",
+    "Walker",
+    "is_binary",
+    "read_file_list",
+]
+
+IGNORE_FILES = (".gitignore", ".ignore")
+SNIFF_BYTES = 8192
+_SKIPPED_DIRECTORIES = frozenset({".git", ".hg", ".svn"})
+LIST_CHUNK_BYTES = 1 << 16
+
+
+def is_binary(path: str | os.PathLike[str]) -> bool:
+    """Whether the first block of *path* holds NUL or invalid UTF-8."""
+
+    with open(path, "rb") as handle:
+        block = handle.read(SNIFF_BYTES)
+    if b"\0" in block:
+        return True
+    try:
+        # Not final: the block may end inside a multi-byte character.
+        codecs.getincrementaldecoder("utf-8")().decode(block, final=False)
+    except UnicodeDecodeError:
+        return True
+    return False
+
+
+def read_file_list(stream: IO[bytes] | IO[str], *, null: bool = False) -> Iterator[str]:
+    """Yield the paths in *stream*, one per line or NUL-terminated with *null*.
+
+    Names are decoded with :func:`os.fsdecode`, so undecodable bytes survive
+    the round trip.  Empty records are skipped, and a literal ``-`` names a
+    file rather than standard input.
+    """
+
+    delimiter = b"\0" if null else b"\n"
+    pending = b""
+    while chunk := stream.read(LIST_CHUNK_BYTES):
+        if isinstance(chunk, str):
+            chunk = os.fsencode(chunk)
+        *records, pending = (pending + chunk).split(delimiter)
+        yield from _list_paths(records, null)
+    yield from _list_paths([pending], null)
+
+
+def _list_paths(records: list[bytes], null: bool) -> Iterator[str]:
+    for record in records:
+        if not null and record.endswith(b"\r"):
+            record = record[:-1]
+        if record:
+            path = os.fsdecode(record)
+            yield os.path.join(".", path) if path == "-" else path
+
+
+def _glob_regex(pattern: str) -> str:
+    parts = []
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith("**/", index):
+            parts.append("(?:.*/)?")
+            index += 3
+        elif pattern.startswith("**", index):
+            parts.append(".*")
+            index += 2
+        elif pattern[index] == "*":
+            parts.append("[^/]*")
+            index += 1
+        elif pattern[index] == "?":
+            parts.append("[^/]")
+            index += 1
+        elif pattern[index] == "[" and "]" in pattern[index + 2 :]:
+            end = pattern.index("]", index + 2)
+            body = pattern[index + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            index = end + 1
+        else:
+            if pattern[index] == "\\" and index + 1 < len(pattern):
+                index += 1
+            parts.append(re.escape(pattern[index]))
+            index += 1
+    return "".join(parts)
+
+
+@dataclass(frozen=True)
+class _Rule:
+    pattern: re.Pattern[str]
+    negate: bool
+    directory_only: bool
+
+    @classmethod
+    def parse(cls, line: str) -> _Rule | None:
+        line = line.rstrip("\n").rstrip("\r")
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            return None
+        negate = line.startswith("!")
+        if negate or line.startswith(("\\!", "\\#")):
+            line = line[1:]
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+        if "/" in line:
+            expression = _glob_regex(line.lstrip("/"))
+        else:
+            expression = "(?:.*/)?" + _glob_regex(line)
+        return cls(re.compile(expression + r"\Z", re.DOTALL), negate, directory_only)
+
+
+def _read_rules(directory: str, stats: Counter[str] | None = None) -> list[_Rule]:
+    rules = []
+    for name in IGNORE_FILES:
+        try:
+            with open(
+                os.path.join(directory, name), encoding="utf-8", errors="replace"
+            ) as handle:
+                rules.extend(rule for rule in map(_Rule.parse, handle) if rule)
+        except FileNotFoundError:
+            continue
+        except OSError:
+            # A directory or unreadable ignore file, like an unreadable directory.
+            if stats is not None:
+                stats["unreadable"] += 1
+    return rules
+
+
+def _ignored(rules: list[tuple[str, _Rule]], relative: str, is_directory: bool) -> bool:
+    ignored = False
+    for base, rule in rules:
+        applies = is_directory or not rule.directory_only
+        if applies and rule.pattern.match(relative[len(base) :]):
+            ignored = not rule.negate
+    return ignored
+
+
+def _matches(patterns: tuple[str, ...], relative: str) -> bool:
+    name = relative.rpartition("/")[2]
+    return any(
+        fnmatch.fnmatchcase(relative, pattern) or fnmatch.fnmatchcase(name, pattern)
+        for pattern in patterns
+    )
+
+
+class Walker:
+    """Yield text files below directory roots; other roots pass through as given.
+
+    ``include`` and ``exclude`` are glob patterns matched against the path
+    relative to its root and against the base name.  ``stats`` counts yielded
+    files and those skipped as ignored, excluded, or binary.  With
+    ``archives``, tar and zip archives are yielded rather than sniffed as
+    binary.
+    """
+
+    def __init__(
+        self,
+        roots: Iterable[str],
+        *,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        ignore_files: bool = True,
+        archives: bool = False,
+    ) -> None:
+        self.roots = roots
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.ignore_files = ignore_files
+        self.archives = archives
+        self.stats: Counter[str] = Counter()
+
+    def __iter__(self) -> Iterator[str]:
+        for root in self.roots:
+            if root != "-" and os.path.isdir(root):
+                yield from self._walk(root, "", [])
+            else:
+                self.stats["files"] += 1
+                yield root
+
+    def selects(self, path: str, *, directory: bool = False) -> bool:
+        """Whether iterating would yield file *path*, or enter directory *path*.
+
+        Only the ignore files of *path*'s own ancestors are read, so callers
+        that learn about one changed path at a time need not walk again.
+        ``stats`` is left alone.
+        """
+
+        for root in self.roots:
+            if root == "-":
+                continue
+            if not os.path.isdir(root):
+                if not directory and os.path.abspath(root) == os.path.abspath(path):
+                    return os.path.isfile(path)
+                continue
+            relative = os.path.relpath(path, root)
+            if relative == os.curdir:
+                return directory
+            if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+                continue
+            return self._selects(root, relative.split(os.sep), directory)
+        return False
+
+    def _selects(self, root: str, names: list[str], directory: bool) -> bool:
+        rules: list[tuple[str, _Rule]] = []
+        current, relative = root, ""
+        for position, name in enumerate(names):
+            if self.ignore_files:
+                rules = rules + [(relative, rule) for rule in _read_rules(current)]
+            path = f"{relative}{name}"
+            is_directory = directory or position < len(names) - 1
+            if is_directory and name in _SKIPPED_DIRECTORIES:
+                return False
+            if _ignored(rules, path, is_directory):
+                return False
+            if self.exclude and _matches(self.exclude, path):
+                return False
+            current, relative = os.path.join(current, name), f"{path}/"
+        if directory:
+            return os.path.isdir(current)
+        if not os.path.isfile(current) or names[-1] in IGNORE_FILES:
+            return False
+        if self.include and not _matches(self.include, relative[:-1]):
+            return False
+        if self.archives and is_archive(names[-1]):
+            return True
+        try:
+            return not is_binary(current)
+        except OSError:
+            return False
+
+    def _walk(
+        self, directory: str, relative: str, rules: list[tuple[str, _Rule]]
+    ) -> Iterator[str]:
+        if self.ignore_files:
+            rules = rules + [
+                (relative, rule) for rule in _read_rules(directory, self.stats)
+            ]
+        try:
+            with os.scandir(directory) as scan:
+                entries = sorted(scan, key=lambda entry: entry.name)
+        except OSError:
+            self.stats["unreadable"] += 1
+            return
+        for entry in entries:
+            path = f"{relative}{entry.name}"
+            is_directory = entry.is_dir(follow_symlinks=False)
+            if is_directory and entry.name in _SKIPPED_DIRECTORIES:
+                continue
+            if _ignored(rules, path, is_directory):
+                self.stats["ignored"] += 1
+                continue
+            if self.exclude and _matches(self.exclude, path):
+                self.stats["excluded"] += 1
+                continue
+            if is_directory:
+                yield from self._walk(entry.path, f"{path}/", rules)
+                continue
+            if not entry.is_file() or entry.name in IGNORE_FILES:
+                continue
+            if self.include and not _matches(self.include, path):
+                self.stats["excluded"] += 1
+                continue
+            if self.archives and is_archive(entry.name):
+                self.stats["files"] += 1
+                yield entry.path
+                continue
+            try:
+                binary = is_binary(entry.path)
+            except OSError:
+                self.stats["unreadable"] += 1
+                continue
+            if binary:
+                self.stats["binary"] += 1
+                continue
+            self.stats["files"] += 1
+            yield entry.path
@@ -0,0 +1,299 @@
+"""Change notification for ``cleanup-text --watch``.
+
+On Linux :class:`InotifyWatcher` asks the kernel, through ``ctypes``, for one
+inotify watch per directory, so tens of thousands of files cost nothing while
+they are idle and a change is reported without scanning anything.  Files
+count as changed when a writer closes them or when they are renamed into
+place, which is how editors and ``--temp`` save.  New directories are watched
+as they appear and their existing files reported.  Elsewhere, or when the
+kernel refuses more watches, :class:`PollingWatcher` compares file sizes and
+modification times every :data:`POLL_SECONDS` instead.
+
+:func:`batches` debounces either watcher: it waits for a change, then keeps
+collecting until the tree has been quiet for the debounce interval.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+
+__all__ = [
+    "DEBOUNCE_SECONDS",
+    "POLL_SECONDS",
+    "InotifyWatcher",
+    "PollingWatcher",
+    "batches",
+    "open_watcher",
+]
+
+DEBOUNCE_SECONDS = 0.2
+POLL_SECONDS = 1.0
+
+# From <sys/inotify.h>.
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_ONLYDIR
+_EVENT = struct.Struct("iIII")
+_READ_BYTES = 1 << 16
+
+Descend = Callable[[str], bool]
+
+
+def _directories(root: str, descend: Descend) -> Iterator[str]:
+    yield root
+    try:
+        with os.scandir(root) as scan:
+            entries = [
+                entry.path for entry in scan if entry.is_dir(follow_symlinks=False)
+            ]
+    except OSError:
+        return
+    for path in sorted(entries):
+        if descend(path):
+            yield from _directories(path, descend)
+
+
+def _files(root: str, descend: Descend) -> Iterator[str]:
+    for directory in _directories(root, descend):
+        try:
+            with os.scandir(directory) as scan:
+                yield from sorted(entry.path for entry in scan if entry.is_file())
+        except OSError:
+            continue
+
+
+def _targets(roots: Iterable[str]) -> dict[str, set[str] | None]:
+    """Map each directory to watch to the names wanted in it, or ``None``."""
+    targets: dict[str, set[str] | None] = {}
+    for root in roots:
+        if os.path.isdir(root):
+            targets[root] = None
+            continue
+        parent, name = os.path.split(root)
+        parent = parent or os.curdir
+        names = targets.setdefault(parent, set())
+        if names is not None:
+            names.add(name)
+    return targets
+
+
+class InotifyWatcher:
+    """Report files written below *roots* using one inotify watch per directory.
+
+    *descend* decides whether a subdirectory is watched; a file root watches
+    its parent directory for that one name.  Raises :class:`OSError` when
+    inotify is unavailable or out of watches.
+    """
+
+    backend = "inotify"
+
+    def __init__(self, roots: Iterable[str], descend: Descend) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._descriptor = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._descriptor < 0:
+            number = ctypes.get_errno()
+            raise OSError(number, os.strerror(number))
+        self._descend = descend
+        self._targets = _targets(roots)
+        self._watches: dict[int, str] = {}
+        try:
+            for directory, names in self._targets.items():
+                if names is None:
+                    for path in _directories(directory, descend):
+                        self._add(path)
+                else:
+                    self._add(directory)
+        except OSError:
+            self.close()
+            raise
+
+    @property
+    def watches(self) -> int:
+        """Directories watched."""
+        return len(self._watches)
+
+    def _add(self, directory: str) -> None:
+        watch = self._libc.inotify_add_watch(
+            self._descriptor, os.fsencode(directory), _WATCH_MASK
+        )
+        if watch < 0:
+            number = ctypes.get_errno()
+            if number in (errno.ENOENT, errno.ENOTDIR):
+                return
+            raise OSError(number, f"{os.strerror(number)}: {directory}")
+        self._watches[watch] = directory
+
+    def _wanted(self, directory: str, name: str) -> bool:
+        names = self._targets.get(directory)
+        return names is None or name in names
+
+    def _everything(self) -> set[str]:
+        found = set()
+        for directory, names in self._targets.items():
+            if names is None:
+                found.update(_files(directory, self._descend))
+            else:
+                found.update(os.path.join(directory, name) for name in names)
+        return found
+
+    def changes(self, timeout: float | None) -> set[str]:
+        """Paths written within *timeout* seconds (``None`` waits for one)."""
+
+        ready, _, _ = select.select([self._descriptor], [], [], timeout)
+        if not ready:
+            return set()
+        changed: set[str] = set()
+        while True:
+            try:
+                data = os.read(self._descriptor, _READ_BYTES)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                watch, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    # Events were lost, so every file may have changed.
+                    changed |= self._everything()
+                    continue
+                directory = self._watches.get(watch)
+                if directory is None:
+                    continue
+                if mask & _IN_IGNORED:
+                    del self._watches[watch]
+                    continue
+                path = os.path.join(directory, name)
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO) and self._recursive(
+                        directory
+                    ):
+                        changed |= self._watch_new(path)
+                elif mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO) and self._wanted(
+                    directory, name
+                ):
+                    changed.add(path)
+        return changed
+
+    def _recursive(self, directory: str) -> bool:
+        return any(
+            names is None
+            and (parent == directory or directory.startswith(parent + os.sep))
+            for parent, names in self._targets.items()
+        )
+
+    def _watch_new(self, directory: str) -> set[str]:
+        # Files may have been written before the new watch existed.
+        if not self._descend(directory):
+            return set()
+        for path in _directories(directory, self._descend):
+            self._add(path)
+        return set(_files(directory, self._descend))
+
+    def close(self) -> None:
+        if self._descriptor >= 0:
+            os.close(self._descriptor)
+            self._descriptor = -1
+
+
+class PollingWatcher:
+    """Report files below *roots* whose size or modification time changed."""
+
+    backend = "polling"
+
+    def __init__(
+        self, roots: Iterable[str], descend: Descend, *, interval: float = POLL_SECONDS
+    ) -> None:
+        self._descend = descend
+        self._targets = _targets(roots)
+        self.interval = interval
+        self._seen = self._snapshot()
+        self._polled = time.monotonic()
+
+    @property
+    def watches(self) -> int:
+        """Files polled."""
+        return len(self._seen)
+
+    def _snapshot(self) -> dict[str, tuple[int, int, int]]:
+        seen = {}
+        for directory, names in self._targets.items():
+            if names is None:
+                paths: Iterable[str] = _files(directory, self._descend)
+            else:
+                paths = (os.path.join(directory, name) for name in names)
+            for path in paths:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                seen[path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        return seen
+
+    def changes(self, timeout: float | None) -> set[str]:
+        """Paths changed within *timeout* seconds (``None`` waits for one)."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            due = self._polled + self.interval
+            now = time.monotonic()
+            if deadline is not None and deadline < due:
+                time.sleep(max(0.0, deadline - now))
+                return set()
+            time.sleep(max(0.0, due - now))
+            seen, self._polled = self._snapshot(), time.monotonic()
+            changed = {
+                path for path, key in seen.items() if self._seen.get(path) != key
+            }
+            self._seen = seen
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        self._seen = {}
+
+
+def open_watcher(
+    roots: Iterable[str], descend: Descend, *, poll: bool = False
+) -> InotifyWatcher | PollingWatcher:
+    """An inotify watcher where possible, else (or with *poll*) a polling one."""
+
+    roots = list(roots)
+    if not poll:
+        try:
+            return InotifyWatcher(roots, descend)
+        except (OSError, AttributeError):
+            # No libc inotify symbols, or fs.inotify.max_user_watches reached.
+            pass
+    return PollingWatcher(roots, descend)
+
+
+def batches(
+    watcher: InotifyWatcher | PollingWatcher, debounce: float = DEBOUNCE_SECONDS
+) -> Iterator[list[str]]:
+    """Yield sorted changed paths once *debounce* seconds pass without changes."""
+
+    while True:
+        pending = watcher.changes(None)
+        while fresh := watcher.changes(debounce):
+            pending |= fresh
+        if pending:
+            yield sorted(pending)
@@ -0,0 +1,69 @@
+from itertools import pairwise
+
+import pytest
+
+from unicodefix import analysis
+from unicodefix.analysis import DocumentAnalysis, block_bounds
+from unicodefix.c2pa import build_text_wrapper, encode_variation_selectors
+from unicodefix.metrics import compute_metrics
+from unicodefix.scanner import scan_text_for_report
+from unicodefix.transforms import clean_text
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(analysis, "MIN_BLOCK_CHARS", 64)
+
+
+def _document():
+    carrier = "\ufeff" + encode_variation_selectors(build_text_wrapper(b"fixture"))
+    lines = ["\ufeffstart “quoted” a\u200bb\r\n"]
+    for number in range(300):
+        lines.append(f"line {number} pаypal\u00a0x y e\u0301\n")
+        if number % 55 == 0:
+            lines.append(f"signed{carrier} text \u2066ltr\u2069 \n")
+        if number % 70 == 0:
+            lines.append("“smart” — quotes\ufeff\n")
+    lines.append("\u0301 combining after a newline\n  \ntrailing")
+    return "".join(lines)
+
+
+def test_block_bounds_follow_newlines_outside_protected_spans():
+    text = _document()
+    bounds = block_bounds(text, [(100, 900)])
+    assert len(bounds) > 2
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(text)
+    for (_, end), (start, _) in pairwise(bounds):
+        assert end == start and text[end - 1] == "\n"
+        assert not 100 < end < 900
+    assert block_bounds("") == [(0, 0)]
+
+
+def test_analysis_matches_the_serial_report_and_metrics():
+    text = _document()
+    document = DocumentAnalysis(text)
+    assert document.report() == scan_text_for_report(text)
+    assert document.metrics() == compute_metrics(text)
+    assert DocumentAnalysis(text, workers=2).report() == document.report()
+    assert DocumentAnalysis("").report() == scan_text_for_report("")
+    assert DocumentAnalysis("").metrics() == compute_metrics("")
+
+
+def test_after_rescans_only_the_blocks_an_edit_touched():
+    text = _document()
+    document = DocumentAnalysis(text)
+    document.report()
+    edited = text.replace("line 150 ", "line 150 “new”\n", 1).replace("line 10 ", "", 1)
+    after = document.after(edited)
+    assert after.report() == scan_text_for_report(edited)
+    assert after.metrics() == compute_metrics(edited)
+    assert 0 < after.stats["blocks"] - after.stats["reused"] <= 6
+
+
+def test_after_matches_a_fresh_scan_of_cleaned_text():
+    text = _document()
+    document = DocumentAnalysis(text, confusables=False)
+    cleaned = clean_text(text)
+    assert document.after(cleaned).report() == scan_text_for_report(
+        cleaned, confusables=False
+    )
@@ -0,0 +1,91 @@
+import io
+import os
+import tarfile
+import zipfile
+from collections import Counter
+
+import pytest
+
+from unicodefix.archives import is_archive, text_members
+
+MEMBERS = {"notes.txt": "a\u200bb\n", "data.bin": "x\0y", "bad.txt": b"\xff\xfe"}
+
+
+def _content(value):
+    return value if isinstance(value, bytes) else value.encode("utf-8")
+
+
+def _zip(path):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("docs/", "")
+        for name, value in MEMBERS.items():
+            archive.writestr(name, _content(value))
+        link = zipfile.ZipInfo("link")
+        link.external_attr = 0o120777 << 16
+        archive.writestr(link, "notes.txt")
+
+
+def _tar(path):
+    with tarfile.open(path, "w:gz") as archive:
+        for name, value in MEMBERS.items():
+            data = _content(value)
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+        link = tarfile.TarInfo("link")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "notes.txt"
+        archive.addfile(link)
+
+
+@pytest.mark.parametrize(("name", "build"), [("a.zip", _zip), ("a.tar.gz", _tar)])
+def test_text_members_skip_binary_and_special_members(tmp_path, name, build):
+    path = os.fspath(tmp_path / name)
+    build(path)
+    stats = Counter()
+    assert is_archive(path)
+    assert list(text_members(path, stats)) == [("notes.txt", "a\u200bb\n")]
+    assert stats == Counter(members=1, binary=2, special=1)
+
+
+def test_oversized_members_are_skipped_and_damage_is_a_value_error(tmp_path):
+    path = os.fspath(tmp_path / "a.tar")
+    with tarfile.open(path, "w") as archive:
+        info = tarfile.TarInfo("big.txt")
+        info.size = 16
+        archive.addfile(info, io.BytesIO(b"x" * 16))
+    assert list(text_members(path, limit=8)) == []
+
+    damaged = tmp_path / "damaged.tgz"
+    damaged.write_bytes(b"\x1f\x8b\x08\x00" + b"\0" * 16)
+    with pytest.raises((ValueError, OSError)):
+        list(text_members(os.fspath(damaged)))
+    assert not is_archive("notes.txt")
+
+
+def _patch_zip_member(data, name, field, value):
+    """Set a 2-byte header field of *name*, by its local header offset."""
+    encoded = name.encode()
+    central = data.index(b"PK\x01\x02")
+    while data[central + 46 : central + 46 + len(encoded)] != encoded:
+        central = data.index(b"PK\x01\x02", central + 4)
+    local = int.from_bytes(data[central + 42 : central + 46], "little")
+    # The local header field sits two bytes before the central one.
+    for offset in (local + field - 2, central + field):
+        data[offset : offset + 2] = value.to_bytes(2, "little")
+
+
+def test_encrypted_and_unsupported_zip_members_are_skipped(tmp_path):
+    path = tmp_path / "vendor.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("secret.txt", b"ciphertext")
+        archive.writestr("exotic.txt", b"packed")
+        archive.writestr("notes.txt", b"plain\n")
+    data = bytearray(path.read_bytes())
+    _patch_zip_member(data, "secret.txt", 8, 0x1)  # the encryption flag
+    _patch_zip_member(data, "exotic.txt", 10, 99)  # AE-x compression
+    path.write_bytes(bytes(data))
+
+    stats = Counter()
+    assert list(text_members(os.fspath(path), stats)) == [("notes.txt", "plain\n")]
+    assert stats == Counter(members=1, encrypted=1, unsupported=1)
@@ -0,0 +1,58 @@
+import signal
+import time
+
+import pytest
+
+from unicodefix.budgets import SKIPPED_STAGE, Budget, StageTimeout, deadline
+
+
+def test_budget_runs_stages_within_limits():
+    budget = Budget(10, max_bytes=10, stage_timeout=5)
+    assert budget.run("double", lambda value: value * 2, 21) == (True, 42)
+    assert budget.finding() is None
+
+
+def test_oversized_file_skips_every_stage_and_explains_why():
+    budget = Budget(11, max_bytes=10)
+    calls = []
+    assert budget.run("confusables", calls.append, 1) == (False, None)
+    assert budget.run("source_parse", calls.append, 2) == (False, None)
+    assert calls == []
+    assert not budget.timed_out
+    finding = budget.finding().to_dict()
+    assert finding["signal"] == SKIPPED_STAGE
+    assert finding["confidence"] == "informational"
+    assert finding["count"] == 2
+    assert finding["details"]["stages"] == [
+        {"stage": "confusables", "reason": "size"},
+        {"stage": "source_parse", "reason": "size"},
+    ]
+    assert finding["details"]["size_bytes"] == 11
+
+
+@pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="needs SIGALRM")
+def test_slow_stage_is_abandoned_after_the_timeout():
+    def spin():
+        while True:
+            time.sleep(0.001)
+
+    budget = Budget(1, stage_timeout=0.05)
+    started = time.monotonic()
+    assert budget.run("watermark_profiles", spin) == (False, None)
+    assert time.monotonic() - started < 2
+    assert budget.timed_out
+    assert budget.finding().details["stages"] == [
+        {"stage": "watermark_profiles", "reason": "timeout"}
+    ]
+    # The alarm is disarmed once the stage ends.
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+
+@pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="needs SIGALRM")
+def test_deadline_raises_in_the_block_and_restores_the_handler():
+    previous = signal.getsignal(signal.SIGALRM)
+    with pytest.raises(StageTimeout), deadline(0.01):
+        time.sleep(1)
+    assert signal.getsignal(signal.SIGALRM) is previous
+    with deadline(None):
+        pass
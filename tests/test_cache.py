@@ -0,0 +1,33 @@
+import os
+
+from unicodefix.cache import ResultCache
+
+
+def _cache(directory, **options):
+    return ResultCache(directory, version="test", configuration=options)
+
+
+def test_cache_round_trip_depends_on_content_and_configuration(tmp_path):
+    cache = _cache(tmp_path, metrics=False)
+    key = cache.key("text\n", ".md")
+    assert cache.get(key) is None
+    cache.put(key, {"total": 1})
+    assert cache.get(key, size=5) == {"total": 1}
+    assert cache.stats["hits"] == 1 and cache.stats["bytes_saved"] == 5
+    assert key != cache.key("text\n", ".txt")
+    assert key != cache.key("other\n", ".md")
+    assert key != _cache(tmp_path, metrics=True).key("text\n", ".md")
+
+
+def test_prune_evicts_least_recently_used_entries(tmp_path):
+    cache = _cache(tmp_path)
+    keys = [cache.key(str(number)) for number in range(3)]
+    for age, key in enumerate(keys):
+        cache.put(key, {"payload": "x" * 100})
+        os.utime(cache._path(key), (1000 + age, 1000 + age))
+    size = cache._path(keys[0]).stat().st_size
+    cache.max_bytes = size * 2
+    assert cache.get(keys[0]) is not None  # Touching the oldest keeps it.
+    assert cache.prune() == 1
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
@@ -0,0 +1,54 @@
+from itertools import pairwise
+
+from unicodefix.c2pa import build_text_wrapper, encode_variation_selectors
+from unicodefix.chunked import (
+    chunk_bounds,
+    scan_findings_chunked,
+    scan_text_for_report_chunked,
+)
+from unicodefix.scanner import scan_findings, scan_text_for_report
+
+
+def _document():
+    carrier = "\ufeff" + encode_variation_selectors(build_text_wrapper(b"fixture"))
+    block = (
+        "-----BEGIN C2PA MANIFEST-----\n"
+        "https://example.invalid/manifest.c2pa\n"
+        "-----END C2PA MANIFEST-----\n"
+    )
+    lines = ["\ufeffstart “quoted” a\u200bb\r\n"]
+    for number in range(150):
+        lines.append(f"line {number} pаypal\u00a0x—y e\u0301\n")
+        if number % 40 == 0:
+            lines.append(block)
+        if number % 55 == 0:
+            lines.append(f"signed{carrier} text \u2066ltr\u2069 \n")
+    lines.append("\u0301 combining after a newline\n  \ntrailing")
+    return "".join(lines)
+
+
+def test_chunk_bounds_follow_newlines_outside_protected_spans():
+    text = "a\nbb\nccc\ndddd\n"
+    bounds = chunk_bounds(text, 3, [(4, 12)])
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(text)
+    for (_, end), (start, _) in pairwise(bounds):
+        assert end == start and text[end - 1] == "\n"
+        assert not 4 < end < 12
+
+
+def test_chunked_findings_are_identical_to_serial_scan():
+    text = _document()
+    serial = scan_findings(text).to_dict()
+    for chunks in (1, 2, 3, 7, 64):
+        assert scan_findings_chunked(text, chunks=chunks, workers=1).to_dict() == (
+            serial
+        )
+    assert scan_findings_chunked(text, chunks=4, workers=2).to_dict() == serial
+
+
+def test_chunked_report_is_identical_to_serial_report():
+    text = _document()
+    assert scan_text_for_report_chunked(text, chunks=5, workers=2) == (
+        scan_text_for_report(text)
+    )
+    assert scan_text_for_report_chunked("", workers=1) == scan_text_for_report("")
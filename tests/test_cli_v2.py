@@ -3,12 +3,15 @@ import io
 import json
 import os
 import pathlib
+import signal
 import stat
 import subprocess
 import sys
+import zipfile
 
 from unicodefix.c2pa import build_text_wrapper, encode_variation_selectors
 from unicodefix.metrics import compute_metrics
+from unicodefix.report import print_csv
 
 
 def run_cli(args, stdin=None):
@@ -37,6 +40,7 @@ def test_dry_run_json_is_non_mutating_and_reports_before_after(tmp_path):
     report = json.loads(stdout)[str(source)]
     assert report["planned"]["changed"] is True
     assert report["planned"]["before"] != report["planned"]["after"]
+    assert report["planned"]["replacement_spans"] == 2
 
     output = tmp_path / "cleaned.txt"
     code, _, stderr = run_cli(["-o", str(output), str(source)])
@@ -66,6 +70,22 @@ def test_dry_run_csv_contains_structured_before_after_counts(tmp_path):
     assert int(row["before_characters"]) > int(row["after_characters"])
 
 
+def test_streaming_csv_matches_in_memory_csv_for_the_same_options(tmp_path):
+    files = []
+    for name, text in (("a.txt", "a\u200bb\n"), ("b.md", "plain\n")):
+        path = tmp_path / name
+        path.write_text(text, encoding="utf-8")
+        files.append(str(path))
+    for options in ([], ["--metrics"], ["--dry-run"], ["--dry-run", "--metrics"]):
+        code, stdout, stderr = run_cli(["--report", "--json", *options, *files])
+        assert code == 0, stderr
+        expected = io.StringIO()
+        print_csv(json.loads(stdout), file=expected)
+        code, stdout, stderr = run_cli(["--report", "--csv", *options, *files])
+        assert code == 0, stderr
+        assert stdout.replace("\r\n", "\n") == expected.getvalue().replace("\r\n", "\n")
+
+
 def test_in_place_cleanup_is_atomic_and_preserves_mode(tmp_path):
     source = tmp_path / "sample.txt"
     source.write_text("“hello”\u200b\n", encoding="utf-8")
@@ -98,6 +118,57 @@ def test_preserved_backup_never_overwrites_an_existing_backup(tmp_path):
     )
 
 
+def test_unchanged_files_are_not_rewritten_unless_forced(tmp_path):
+    clean = tmp_path / "clean.txt"
+    dirty = tmp_path / "dirty.txt"
+    clean.write_bytes(b"plain\r\n")
+    dirty.write_text("a\u200bb\n", encoding="utf-8")
+    os.utime(clean, (1, 1))
+
+    code, _, stderr = run_cli(["--temp", "--preserve-tmp", str(clean), str(dirty)])
+    assert code == 0, stderr
+    assert clean.stat().st_mtime == 1
+    assert not (tmp_path / "clean.txt.tmp").exists()
+    assert dirty.read_text(encoding="utf-8") == "ab\n"
+    assert "1 file(s) left as they were, 1 written" in stderr
+
+    output = tmp_path / "clean.clean.txt"
+    code, _, stderr = run_cli([str(clean)])
+    assert code == 0, stderr
+    os.utime(output, (1, 1))
+    code, _, stderr = run_cli(["--skip-unchanged", str(clean)])
+    assert code == 0, stderr
+    assert output.stat().st_mtime == 1
+    assert "Output already current" in stderr
+
+    code, _, stderr = run_cli(["--temp", "--force-write", str(clean)])
+    assert code == 0, stderr
+    assert clean.stat().st_mtime > 1
+    assert clean.read_bytes() == b"plain\r\n"
+
+
+def test_bulk_sync_replaces_in_place_with_backups_and_incremental_state(tmp_path):
+    files = [tmp_path / f"sample{index}.txt" for index in range(5)]
+    for path in files:
+        path.write_text("“a”\u200b\n", encoding="utf-8")
+    state = tmp_path / "state.sqlite"
+    arguments = ["--temp", "--bulk-sync", "--preserve-tmp", "--incremental"]
+    arguments += ["--state-file", str(state), "--jobs", "2", *map(str, files)]
+
+    code, _, stderr = run_cli(arguments)
+
+    assert code == 0, stderr
+    for path in files:
+        assert path.read_text(encoding="utf-8") == '"a"\n'
+        assert f"[ok] Cleaned (in-place): {path}" in stderr
+        assert (tmp_path / f"{path.name}.tmp").read_text(encoding="utf-8") == (
+            "“a”\u200b\n"
+        )
+    assert list(tmp_path.glob(".sample*")) == []
+    code, _, stderr = run_cli(arguments)
+    assert "5 unchanged file(s) skipped, 0 processed" in stderr
+
+
 def test_markdown_unwrap_preserves_distinct_list_items(tmp_path):
     source = tmp_path / "sample.md"
     output = tmp_path / "out.md"
@@ -161,6 +232,78 @@ def test_category_threshold_only_counts_selected_findings(tmp_path):
     assert code == 1
 
 
+def test_fail_fast_gate_stops_at_first_tripping_file(tmp_path):
+    clean = tmp_path / "clean.txt"
+    dirty = tmp_path / "dirty.txt"
+    unread = tmp_path / "missing.txt"
+    clean.write_text("plain\n", encoding="utf-8")
+    dirty.write_text("a\u200bb\u200bc\n", encoding="utf-8")
+    code, stdout, stderr = run_cli(
+        [
+            "--report",
+            "--json",
+            "--fail-fast",
+            "--threshold",
+            "1",
+            "--threshold-category",
+            "unicode_security",
+            str(clean),
+            str(dirty),
+            str(unread),
+        ]
+    )
+    assert code == 1, stderr
+    gate = json.loads(stdout)["gate"]
+    assert gate["tripped_by"] == str(dirty)
+    assert gate["files_scanned"] == 2
+    assert gate["total"] >= 1
+
+    code, stdout, stderr = run_cli(
+        ["--fail-fast", "--threshold", "1", "--json", str(clean)]
+    )
+    assert code == 0, stderr
+    assert json.loads(stdout)["gate"]["tripped_by"] is None
+
+
+def test_report_cache_replays_identical_results(tmp_path):
+    source = tmp_path / "sample.md"
+    source.write_text("“hello”\u200b\n", encoding="utf-8")
+    cache = tmp_path / "cache"
+    arguments = ["--report", "--json", "--cache-dir", str(cache), str(source)]
+    code, first, stderr = run_cli(arguments)
+    assert code == 0, stderr
+    assert "0 hit(s), 1 miss(es)" in stderr
+    code, second, stderr = run_cli(arguments)
+    assert code == 0, stderr
+    assert "1 hit(s), 0 miss(es)" in stderr
+    assert second == first
+
+    other = tmp_path / "uncached"
+    code, _, stderr = run_cli(["--report", "--no-cache", "--cache-dir", str(other)])
+    assert code == 0, stderr
+    assert not other.exists()
+
+
+def test_ndjson_streams_one_record_per_file_and_a_summary(tmp_path):
+    first = tmp_path / "first.txt"
+    second = tmp_path / "second.txt"
+    first.write_text("plain\n", encoding="utf-8")
+    second.write_text("a\u200bb\n", encoding="utf-8")
+    code, stdout, stderr = run_cli(
+        ["--report", "--ndjson", "--threshold", "1", str(first), str(second)]
+    )
+    assert code == 1, stderr
+    lines = stdout.splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record["type"] for record in records] == ["file", "file", "summary"]
+    assert [record["file"] for record in records[:2]] == [str(first), str(second)]
+    assert records[1]["report"]["unicode_ghosts"]["ZWSP"] == 1
+    assert records[2]["files"] == 2
+    assert records[2]["files_over_threshold"] == 1
+    assert records[2]["threshold_hit"] is True
+    assert stdout.count("\n") == len(records)
+
+
 def test_source_mode_cleans_comments_only(tmp_path):
     source = tmp_path / "sample.py"
     output = tmp_path / "out.py"
@@ -217,3 +360,397 @@ def test_authorship_profile_reports_unsupported_without_claiming_detection(tmp_p
     assert not any(
         item["category"] == "authorship_signal" for item in report["findings"]
     )
+
+
+def test_identifier_index_reports_cross_file_collisions(tmp_path):
+    first = tmp_path / "first.py"
+    second = tmp_path / "second.py"
+    first.write_text("def paypal():\n    return 1\n", encoding="utf-8")
+    second.write_text("def pаypal():\n    return 2\n", encoding="utf-8")
+    arguments = [
+        "--source",
+        "--json",
+        "--identifier-index",
+        str(tmp_path / "identifiers.db"),
+        str(first),
+        str(second),
+    ]
+    code, stdout, stderr = run_cli(arguments)
+    assert code == 0, stderr
+    assert "2 of 2 file(s) reindexed" in stderr
+    report = json.loads(stdout)
+    for path, other in ((first, second), (second, first)):
+        (finding,) = [
+            finding
+            for finding in report[str(path)]["findings"]
+            if finding["signal"] == "cross_file_confusable_identifier"
+        ]
+        assert finding["details"]["collisions"][0]["other_path"] == str(other)
+
+    code, again, stderr = run_cli(arguments)
+    assert code == 0, stderr
+    assert "0 of 2 file(s) reindexed" in stderr
+    assert again == stdout
+
+    second.unlink()
+    code, stdout, stderr = run_cli(arguments[:-1])
+    assert code == 0, stderr
+    assert "0 of 1 file(s) reindexed, 1 removed" in stderr
+    assert not any(
+        finding["signal"] == "cross_file_confusable_identifier"
+        for finding in json.loads(stdout)[str(first)]["findings"]
+    )
+
+
+def test_jobs_keep_output_order_exit_codes_and_duplicate_skipping(tmp_path):
+    paths = []
+    for number in range(6):
+        path = tmp_path / f"sample{number}.txt"
+        path.write_text("a\u200bb\n" if number % 2 else "plain\n", encoding="utf-8")
+        paths.append(str(path))
+    report = ["--report", "--json", "--no-cache", "--threshold", "1", *paths]
+    serial = run_cli(["--jobs", "1", *report])
+    assert serial[0] == 1
+    assert run_cli(["--jobs", "3", *report]) == serial
+
+    cleanup = [*paths, paths[0], str(tmp_path / "missing.txt")]
+    code, _, stderr = run_cli(["--jobs", "3", *cleanup])
+    assert code == 1
+    lines = stderr.splitlines()
+    assert lines[:6] == [
+        f"[ok] Cleaned: {path} -> {path[:-4]}.clean.txt" for path in paths
+    ]
+    assert lines[6] == f"[i] Skipping duplicate: {paths[0]}"
+    assert lines[7].startswith("[x] Failed to process")
+
+
+def test_recursive_walk_streams_text_files_only(tmp_path):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / ".gitignore").write_text("*.log\n", encoding="utf-8")
+    (tmp_path / "nested" / "sample.txt").write_text("a\u200bb\n", encoding="utf-8")
+    (tmp_path / "nested" / "debug.log").write_text("a\u200bb\n", encoding="utf-8")
+    (tmp_path / "blob.bin").write_bytes(b"\0\xff")
+    code, stdout, stderr = run_cli(
+        ["-r", "--report", "--json", "--no-cache", str(tmp_path)]
+    )
+    assert code == 0, stderr
+    assert list(json.loads(stdout)) == [str(tmp_path / "nested" / "sample.txt")]
+    assert "skipped 1 ignored, 0 excluded, 1 binary" in stderr
+
+    code, _, stderr = run_cli(["-r", str(tmp_path)])
+    assert code == 0, stderr
+    assert (tmp_path / "nested" / "sample.clean.txt").exists()
+    code, _, stderr = run_cli(["-r", str(tmp_path)])
+    assert code == 0, stderr
+    assert not (tmp_path / "nested" / "sample.clean.clean.txt").exists()
+    # Reports audit every file, including ones named like cleanup outputs.
+    code, stdout, stderr = run_cli(
+        ["-r", "--report", "--json", "--no-cache", str(tmp_path)]
+    )
+    assert code == 0, stderr
+    assert str(tmp_path / "nested" / "sample.clean.txt") in json.loads(stdout)
+
+    # Standard input next to a walk is still read here, not by a pool worker.
+    code, stdout, stderr = run_cli(
+        ["-r", "--report", "--json", "--no-cache", "-j", "2", str(tmp_path), "-"],
+        stdin="a\u200bb\n",
+    )
+    assert code == 0, stderr
+    assert json.loads(stdout)["-"]["unicode_ghosts"]["ZWSP"] == 1
+
+    code, _, stderr = run_cli(["--include", "*.txt", str(tmp_path)])
+    assert code == 2
+    assert "--include and --exclude require --recursive" in stderr
+
+
+def test_files_from_stdin_reads_nul_delimited_paths(tmp_path):
+    first = tmp_path / "first name.txt"
+    second = tmp_path / "second.txt"
+    first.write_text("a\u200bb\n", encoding="utf-8")
+    second.write_text("c\u200bd\n", encoding="utf-8")
+    listing = f"{first}\0{first}\0{second}\0"
+
+    code, _, stderr = run_cli(["--temp", "--files-from", "-", "-0"], stdin=listing)
+
+    assert code == 0, stderr
+    assert first.read_text(encoding="utf-8") == "ab\n"
+    assert second.read_text(encoding="utf-8") == "cd\n"
+    assert f"[i] Skipping duplicate: {first}" in stderr
+    code, _, stderr = run_cli(["--files-from", "-", "-"])
+    assert code == 2
+    assert "both the file list and an input" in stderr
+
+
+def test_git_staged_reports_index_content_not_the_working_tree(tmp_path):
+    def git(*arguments):
+        subprocess.run(
+            ["git", "-C", str(tmp_path), *arguments], check=True, capture_output=True
+        )
+
+    git("init", "-q")
+    git("config", "user.email", "test@example.invalid")
+    git("config", "user.name", "Test")
+    first = tmp_path / "first.txt"
+    second = tmp_path / "second.txt"
+    first.write_text("clean\n", encoding="utf-8")
+    second.write_text("clean\n", encoding="utf-8")
+    git("add", ".")
+    git("commit", "-q", "-m", "initial")
+    first.write_text("a\u200bb\n", encoding="utf-8")
+    second.write_text("c\u200bd\n", encoding="utf-8")
+    git("add", ".")
+    first.write_text("fixed\n", encoding="utf-8")
+
+    environment = os.environ.copy()
+    environment["PYTHONPATH"] = str(pathlib.Path(__file__).resolve().parents[1] / "src")
+    process = subprocess.run(
+        [sys.executable, "-m", "unicodefix.cli", "--git-staged", "--json"],
+        cwd=tmp_path,
+        env=environment,
+        text=True,
+        capture_output=True,
+        check=False,
+    )
+
+    assert process.returncode == 0, process.stderr
+    totals = {
+        name: report["total"] for name, report in json.loads(process.stdout).items()
+    }
+    assert totals == {"first.txt": 2, "second.txt": 2}
+    assert "2 file(s) staged" in process.stderr
+
+
+def test_diff_hunks_report_only_added_lines(tmp_path):
+    legacy = tmp_path / "legacy.txt"
+    legacy.write_text("old\u200b debt\nnew line\n", encoding="utf-8")
+    patch = (
+        f"--- {legacy}\t2026-01-01\n+++ {legacy}\t2026-01-02\n"
+        "@@ -1,1 +1,2 @@\n old\u200b debt\n+new line\n"
+    )
+
+    code, stdout, stderr = run_cli(
+        ["--diff-hunks", "-", "--threshold", "1", "--json"], stdin=patch
+    )
+
+    assert code == 0, stderr
+    report = json.loads(stdout)[str(legacy)]
+    assert report["findings"] == []
+    assert report["changed_lines"] == [[2, 2]]
+    # The gate counts the same lines as the report, not the whole file.
+    code, stdout, stderr = run_cli(
+        ["--diff-hunks", "-", "--threshold", "1", "--fail-fast"], stdin=patch
+    )
+    assert code == 0, stderr
+    assert "Threshold reached" not in stderr
+
+    legacy.write_text("old\u200b debt\nnew\u200b line\n", encoding="utf-8")
+    code, stdout, _ = run_cli(["--diff-hunks", "-", "--threshold", "1"], stdin=patch)
+    assert code == 1
+    assert "2:4" in stdout
+    code, _, stderr = run_cli(
+        ["--diff-hunks", "-", "--threshold", "1", "--fail-fast"], stdin=patch
+    )
+    assert code == 1
+    assert f"Threshold reached by {legacy}" in stderr
+
+
+def test_walks_exclude_only_the_siblings_the_cleanup_writes(tmp_path):
+    for name in ("data.clean.json", "notes.tmp"):
+        (tmp_path / name).write_text('"\u201cq\u201d"\n', encoding="utf-8")
+
+    code, _, stderr = run_cli(["-r", "-t", str(tmp_path)])
+    assert code == 0, stderr
+    assert "0 excluded" in stderr
+    code, _, stderr = run_cli(["-r", "-t", "-p", str(tmp_path)])
+    assert code == 0, stderr
+    assert "1 excluded" in stderr
+    code, _, stderr = run_cli(["-r", str(tmp_path)])
+    assert code == 0, stderr
+    assert "[ok] Cleaned: " + str(tmp_path / "notes.tmp") in stderr
+    assert str(tmp_path / "data.clean.json") not in stderr
+
+
+def test_incremental_runs_skip_unchanged_files(tmp_path):
+    first = tmp_path / "first.txt"
+    second = tmp_path / "second.txt"
+    first.write_text("a\u200bb\n", encoding="utf-8")
+    second.write_text("plain\n", encoding="utf-8")
+    state = tmp_path / "state.sqlite"
+    arguments = ["--incremental", "--state-file", str(state), str(first), str(second)]
+    code, _, stderr = run_cli(["-t", *arguments])
+    assert code == 0, stderr
+    assert "0 unchanged file(s) skipped, 2 processed" in stderr
+
+    code, _, stderr = run_cli(["-t", *arguments])
+    assert code == 0, stderr
+    assert "[ok]" not in stderr
+    assert "2 unchanged file(s) skipped, 0 processed" in stderr
+
+    second.write_text("changed\u200b\n", encoding="utf-8")
+    code, _, stderr = run_cli(["-t", *arguments])
+    assert code == 0, stderr
+    assert f"[ok] Cleaned (in-place): {second}" in stderr
+    assert "1 unchanged file(s) skipped, 1 processed" in stderr
+
+    report = ["--report", "--threshold", "1", "--json", *arguments]
+    first.write_text("a\u200bb\n", encoding="utf-8")
+    code, stdout, stderr = run_cli(report)
+    assert code == 1
+    fresh = json.loads(stdout)
+    assert list(fresh) == [str(first), str(second)]
+    code, stdout, stderr = run_cli(report)
+    assert code == 1, "a skipped file keeps its recorded threshold result"
+    assert "2 unchanged file(s) skipped, 0 processed" in stderr
+    assert json.loads(stdout) == fresh, "skipped files replay their reports"
+
+    state.write_text("not a database", encoding="utf-8")
+    code, stdout, stderr = run_cli(report)
+    assert code == 1
+    assert f"[x] Cannot open state file {state}" in stderr
+    assert "Traceback" not in stderr
+
+
+def test_report_labels_archive_members(tmp_path):
+    archive = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(archive, "w") as bundle:
+        bundle.writestr("notes.txt", "a\u200bb\n")
+        bundle.writestr("image.bin", b"\x89PNG\0")
+    code, stdout, stderr = run_cli(["--report", "--json", "--jobs", "2", str(archive)])
+    assert code == 0, stderr
+    assert list(json.loads(stdout)) == [f"{archive}!notes.txt"]
+    assert "1 member(s) from 1 archive(s); skipped 1 binary" in stderr
+
+    (tmp_path / "broken.zip").write_bytes(b"not a zip")
+    code, _, stderr = run_cli(["--report", str(tmp_path / "broken.zip")])
+    assert code == 1
+    assert "damaged archive" in stderr
+
+
+def test_watch_emits_ndjson_batches_for_changed_files(tmp_path):
+    watched = tmp_path / "docs"
+    watched.mkdir()
+    environment = os.environ.copy()
+    environment["PYTHONPATH"] = str(pathlib.Path(__file__).resolve().parents[1] / "src")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "unicodefix.cli", "--watch", "--report", "--poll"]
+        + ["--debounce", "0.1", str(watched)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=environment,
+    )
+    try:
+        assert json.loads(process.stdout.readline())["backend"] == "polling"
+        (watched / "notes.txt").write_text("a\u200bb\n", encoding="utf-8")
+        change = json.loads(process.stdout.readline())
+        report = json.loads(process.stdout.readline())
+    finally:
+        process.terminate()
+        process.communicate(timeout=10)
+    assert change["files"] == [str(watched / "notes.txt")]
+    assert report["type"] == "file"
+    assert report["report"]["unicode_ghosts"]["ZWSP"] == 1
+
+    code, _, stderr = run_cli(["--watch", "--json", str(watched)])
+    assert code == 2
+    assert "--watch streams NDJSON" in stderr
+
+
+def test_sharded_reports_merge_into_a_single_run(tmp_path):
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    for number in range(12):
+        (tree / f"file{number}.txt").write_text(f"plain {number}\n", encoding="utf-8")
+    (tree / "dirty.txt").write_text("a\u200bb\n", encoding="utf-8")
+    outputs = []
+    for index in (1, 2, 3):
+        output = tmp_path / f"shard{index}.ndjson"
+        code, stdout, stderr = run_cli(
+            ["--report", "--ndjson", "--threshold", "1", "-r", str(tree)]
+            + ["--shard", f"{index}/3", "--no-cache"]
+        )
+        assert f"Shard {index}/3:" in stderr
+        output.write_text(stdout, encoding="utf-8")
+        outputs.append(str(output))
+    code, stdout, _ = run_cli(["merge-reports", "--ndjson", *outputs])
+    *files, summary = map(json.loads, stdout.splitlines())
+    whole_code, whole, _ = run_cli(
+        ["--report", "--ndjson", "--threshold", "1", "-r", str(tree), "--no-cache"]
+    )
+    *whole_files, whole_summary = map(json.loads, whole.splitlines())
+    assert code == whole_code == 1
+    assert files == whole_files
+    assert summary["files_over_threshold"] == whole_summary["files_over_threshold"] == 1
+
+    code, _, stderr = run_cli(["merge-reports", *outputs[:2]])
+    assert code == 1
+    assert "shard(s) 3 missing" in stderr
+
+
+def test_profile_out_keeps_the_exit_status_and_writes_both_outputs(tmp_path):
+    source = tmp_path / "sample.txt"
+    source.write_text("a\u200bb\n", encoding="utf-8")
+    profile = tmp_path / "run.prof"
+    code, _, stderr = run_cli(
+        ["--report", "--threshold", "1", "--profile-out", str(profile), str(source)]
+    )
+    assert code == 1
+    assert "[i] Profile: wrote" in stderr
+    assert profile.stat().st_size > 0
+    assert "stages: scan_report" in stderr
+    assert not hasattr(signal, "SIGPROF") or (tmp_path / "run.prof.folded").exists()
+
+
+def test_max_file_bytes_records_skipped_stages_without_failing_the_gate(tmp_path):
+    source = tmp_path / "notes.md"
+    source.write_text("café plain text\n", encoding="utf-8")
+    code, stdout, _ = run_cli(
+        [
+            "--report",
+            "--json",
+            "--no-cache",
+            "--max-file-bytes",
+            "4",
+            "--threshold",
+            "1",
+            str(source),
+        ]
+    )
+    assert code == 0
+    (finding,) = json.loads(stdout)[str(source)]["findings"]
+    assert finding["signal"] == "skipped_stage"
+    assert [stage["stage"] for stage in finding["details"]["stages"]] == [
+        "confusables",
+        "markdown_audit",
+    ]
+
+
+def test_output_dir_mirrors_the_tree_and_leaves_inputs_alone(tmp_path):
+    source = tmp_path / "src" / "a"
+    source.mkdir(parents=True)
+    original = "“hi”\r\nthere\r\n".encode()
+    (source / "x.txt").write_bytes(original)
+    (source / "x.txt").chmod(0o750)
+    environment = os.environ.copy()
+    environment["PYTHONPATH"] = str(pathlib.Path(__file__).resolve().parents[1] / "src")
+    process = subprocess.run(
+        [sys.executable, "-m", "unicodefix.cli", "-j", "2", "-r", "src"]
+        + ["--output-dir", "out"],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        env=environment,
+        check=False,
+    )
+    assert process.returncode == 0, process.stderr
+    output = tmp_path / "out" / "src" / "a" / "x.txt"
+    assert output.read_bytes() == b'"hi"\r\nthere\r\n'
+    assert stat.S_IMODE(output.stat().st_mode) == 0o750
+    assert (source / "x.txt").read_bytes() == original
+    assert sorted(path.name for path in source.iterdir()) == ["x.txt"]
+
+    code, _, stderr = run_cli(
+        ["-r", str(tmp_path / "src"), "--output-dir", str(source / "out")]
+    )
+    assert code == 2
+    assert "--output-dir cannot be inside a directory it mirrors" in stderr
@@ -0,0 +1,163 @@
+import os
+import pathlib
+import signal
+import stat
+import subprocess
+import sys
+import time
+
+import pytest
+
+from unicodefix.daemon import call, connect, forwarded_environment
+
+SOURCE = str(pathlib.Path(__file__).resolve().parents[1] / "src")
+
+
+def _environment(**extra):
+    environment = os.environ.copy()
+    environment["PYTHONPATH"] = SOURCE
+    environment.update(extra)
+    return environment
+
+
+def _client(args, socket_path, stdin=None):
+    return subprocess.run(
+        [sys.executable, "-c", "from unicodefix.client import main; main()", *args],
+        input=stdin,
+        text=True,
+        capture_output=True,
+        env=_environment(UNICODEFIX_SOCKET=str(socket_path)),
+        check=False,
+    )
+
+
+def test_daemon_answers_operations_and_forwarded_commands(tmp_path):
+    socket_path = tmp_path / "daemon.sock"
+    daemon = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "unicodefix.cli",
+            "--serve",
+            "--socket",
+            str(socket_path),
+        ],
+        env=_environment(),
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while not socket_path.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        connection = connect(str(socket_path))
+        assert connection is not None
+        with connection:
+            reply = call(connection, {"op": "clean", "text": "“hi”\u200b\n"})
+            assert reply == {"ok": True, "text": '"hi"\n'}
+            reply = call(
+                connection,
+                {
+                    "op": "clean",
+                    "text": "a \u2014 b\n",
+                    "options": {"keep_dashes": True},
+                },
+            )
+            assert reply["text"] == "a \u2014 b\n"
+            report = call(connection, {"op": "report", "text": "a\u200bb\n"})
+            assert report["report"]["unicode_ghosts"]["ZWSP"] == 1
+            assert call(connection, {"op": "nope"})["ok"] is False
+
+        result = _client(["--client"], socket_path, stdin="“hi”\n")
+        assert (result.returncode, result.stdout) == (0, '"hi"\n')
+        result = _client(["--client", "--bogus"], socket_path)
+        assert result.returncode == 2
+        assert "unrecognized arguments: --bogus" in result.stderr
+    finally:
+        daemon.send_signal(signal.SIGTERM)
+        daemon.wait(timeout=10)
+    assert not socket_path.exists()
+    assert "[ok] Serving on" in daemon.stderr.read()
+
+
+def test_client_runs_in_process_without_a_daemon(tmp_path):
+    result = _client(["--client"], tmp_path / "absent.sock", stdin="a\u200bb\n")
+    assert (result.returncode, result.stdout) == (0, "ab\n")
+
+
+def test_client_refuses_a_socket_it_does_not_own(tmp_path):
+    impostor = tmp_path / "daemon.sock"
+    impostor.write_text("", encoding="utf-8")
+    with pytest.raises(PermissionError):
+        connect(str(impostor))
+    result = _client(["--client"], impostor, stdin="a\u200bb\n")
+    assert (result.returncode, result.stdout) == (0, "ab\n")
+    assert "is not a socket owned by this user" in result.stderr
+
+
+def test_only_the_variables_the_cli_reads_are_forwarded():
+    environment = {"PATH": "/bin", "GIT_INDEX_FILE": "index", "API_TOKEN": "secret"}
+    assert forwarded_environment(environment) == {
+        "GIT_INDEX_FILE": "index",
+        "PATH": "/bin",
+    }
+
+
+def test_stalled_client_is_dropped_without_blocking_others(tmp_path):
+    socket_path = tmp_path / "private" / "daemon.sock"
+    script = (
+        "import sys, unicodefix.daemon as daemon\n"
+        "daemon.CLIENT_TIMEOUT = 0.2\n"
+        "daemon.serve(sys.argv[1], lambda message: {'ok': True})\n"
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-c", script, str(socket_path)],
+        env=_environment(),
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while not socket_path.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert stat.S_IMODE(socket_path.parent.stat().st_mode) == 0o700
+        stalled = connect(str(socket_path))
+        with stalled:
+            other = connect(str(socket_path))
+            with other:
+                other.settimeout(10)
+                assert call(other, {"op": "ping"}) == {"ok": True}
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=10)
+    assert "[x] Dropped client: timed out" in server.stderr.read()
+
+
+def test_a_failing_request_does_not_stop_the_daemon(tmp_path):
+    socket_path = tmp_path / "daemon.sock"
+    script = (
+        "import sqlite3, sys, unicodefix.daemon as daemon\n"
+        "def handle(message):\n"
+        "    if message['op'] == 'boom':\n"
+        "        raise sqlite3.DatabaseError('file is not a database')\n"
+        "    return {'ok': True}\n"
+        "daemon.serve(sys.argv[1], handle)\n"
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-c", script, str(socket_path)], env=_environment()
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while not socket_path.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        connection = connect(str(socket_path))
+        with connection:
+            assert call(connection, {"op": "boom"}) == {
+                "ok": False,
+                "error": "DatabaseError: file is not a database",
+            }
+            assert call(connection, {"op": "ping"}) == {"ok": True}
+        assert server.poll() is None
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=10)
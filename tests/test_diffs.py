@@ -0,0 +1,119 @@
+import difflib
+import random
+
+import pytest
+
+from unicodefix import diffs
+from unicodefix.diffs import line_opcodes, replacement_spans, unified_diff
+from unicodefix.transforms import clean_text
+
+
+def _lines(text):
+    return text.splitlines(keepends=True)
+
+
+def _apply(a, diff_lines):
+    """Rebuild the new side from *a* and a unified diff."""
+    result, position = [], 0
+    for line in diff_lines:
+        if line.startswith(("---", "+++")):
+            continue
+        if line.startswith("@@"):
+            start = int(line.split()[1][1:].split(",")[0])
+            length = line.split()[1].split(",")
+            start = start - 1 if len(length) == 1 or length[1] != "0" else start
+            result.extend(a[position:start])
+            position = start
+        elif line[0] == "+":
+            result.append(line[1:])
+        else:
+            position += 1
+            if line[0] == " ":
+                result.append(line[1:])
+    return result + a[position:]
+
+
+@pytest.mark.parametrize(
+    ("old", "new"),
+    [
+        ("", ""),
+        ("same\n", "same\n"),
+        ("", "added\n"),
+        ("removed\n", ""),
+        ("a\nb\nc\n", "a\nB\nc\n"),
+        ("a\nb\nno newline", "a\nb\nno newline\n"),
+        ("one\ntwo\nthree\n", "one two\nthree\n"),
+        ("\n\nx\n\n\ny\n\n", "\n\nX\n\n\ny\n\n"),
+    ],
+)
+def test_diff_is_identical_to_difflib(old, new):
+    expected = list(difflib.unified_diff(_lines(old), _lines(new), "f", "f (cleaned)"))
+    assert list(unified_diff(_lines(old), _lines(new), "f", "f (cleaned)")) == expected
+
+
+def test_sparse_edits_of_a_long_document_match_difflib():
+    random.seed(7)
+    a = [f"line {number} of the document\n" for number in range(3000)]
+    b = list(a)
+    for number in random.sample(range(3000), 40):
+        b[number] = b[number].replace("of", "“of”")
+    del b[1200:1203]
+    b.insert(2500, "inserted\n")
+    expected = list(difflib.unified_diff(a, b, n=2))
+    assert list(unified_diff(a, b, n=2)) == expected
+    opcodes = line_opcodes(a, b)
+    assert opcodes == difflib.SequenceMatcher(None, a, b).get_opcodes()
+
+
+def test_large_ambiguous_gaps_are_replaced_but_still_valid(monkeypatch):
+    monkeypatch.setattr(diffs, "MATCHER_MAX_LINES", 4)
+    a = ["x\n", "x\n", "y\n", "x\n", "y\n", "y\n"]
+    b = ["y\n", "x\n", "x\n", "x\n", "y\n"]
+    assert line_opcodes(a, b) == [("replace", 0, 5, 0, 4), ("equal", 5, 6, 4, 5)]
+    assert _apply(a, unified_diff(a, b)) == b
+
+
+def test_diff_is_generated_lazily():
+    lines = unified_diff(["a\n"], ["b\n"], "f", "g")
+    assert next(lines) == "--- f\n"
+    assert list(lines) == ["+++ g\n", "@@ -1 +1 @@\n", "-a\n", "+b\n"]
+
+
+def test_replacement_spans_compare_characters_within_changed_lines(monkeypatch):
+    before = "\u201chello\u201d\u200b\nkept\nold line\n"
+    after = '"hello"\nkept\n'
+    expected = sum(
+        tag == "replace"
+        for tag, *_ in difflib.SequenceMatcher(
+            None, before.split("\n")[0], after.split("\n")[0]
+        ).get_opcodes()
+    )
+    assert replacement_spans(before, after) == expected == 2
+    assert replacement_spans("same\n", "same\n") == 0
+
+    # A line too long for one character match is compared word by word.
+    monkeypatch.setattr(diffs, "CHARACTER_MATCHER_MAX", 20)
+    line = " ".join(["\u201cquoted\u201d", "plain"] * 50) + "\n"
+    assert replacement_spans(line, line.replace("\u201c", '"')) == 50
+
+
+def test_small_cleanups_with_repeated_lines_match_difflib():
+    random.seed(11)
+    pieces = [
+        "\n",
+        "}\n",
+        "   \n",
+        "\t\n",
+        "  return x;\n",
+        "“quoted” text\n",
+        "a\u200bb\n",
+        "dash — here\n",
+        "trailing  \n",
+    ]
+    for _ in range(300):
+        old = "".join(random.choices(pieces, k=random.randint(1, 40)))
+        new = clean_text(old)
+        a, b = _lines(old), _lines(new)
+        assert list(unified_diff(a, b, "f", "g")) == list(
+            difflib.unified_diff(a, b, "f", "g")
+        )
@@ -0,0 +1,67 @@
+import os
+
+from unicodefix import durable
+from unicodefix.durable import ReplaceBatch, Staged
+
+
+def _stage(directory, name, old, new):
+    target = directory / name
+    target.write_text(old, encoding="utf-8")
+    temporary = directory / f".{name}.staged.tmp"
+    temporary.write_text(new, encoding="utf-8")
+    return Staged(str(target), str(temporary))
+
+
+def test_batch_syncs_every_file_before_renaming_and_each_directory_once(
+    tmp_path, monkeypatch
+):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    events = []
+    monkeypatch.setattr(
+        durable, "_fsync_file", lambda path: events.append(("file", path))
+    )
+    monkeypatch.setattr(
+        durable, "fsync_directory", lambda path: events.append(("directory", path))
+    )
+    batch = ReplaceBatch(limit=3)
+    assert not batch.add(_stage(tmp_path / "a", "one.txt", "old", "new one"))
+    assert not batch.add(_stage(tmp_path / "a", "two.txt", "old", "new two"))
+    assert batch.add(_stage(tmp_path / "b", "three.txt", "old", "new three"))
+
+    results = batch.commit()
+
+    assert [error for _, error in results] == [None, None, None]
+    assert (tmp_path / "a" / "two.txt").read_text(encoding="utf-8") == "new two"
+    assert [kind for kind, _ in events] == ["file"] * 3 + ["directory"] * 2
+    assert sorted(path for kind, path in events if kind == "directory") == [
+        str(tmp_path / "a"),
+        str(tmp_path / "b"),
+    ]
+    assert len(batch) == 0
+
+
+def test_failed_sync_keeps_the_original_and_discards_the_temporary(tmp_path):
+    good = _stage(tmp_path, "good.txt", "old", "new")
+    missing = Staged(str(tmp_path / "kept.txt"), str(tmp_path / ".missing.tmp"))
+    (tmp_path / "kept.txt").write_text("original", encoding="utf-8")
+    batch = ReplaceBatch()
+    batch.add(good)
+    batch.add(missing)
+
+    (_, good_error), (_, missing_error) = batch.commit()
+
+    assert good_error is None
+    assert isinstance(missing_error, FileNotFoundError)
+    assert (tmp_path / "kept.txt").read_text(encoding="utf-8") == "original"
+    assert sorted(os.listdir(tmp_path)) == ["good.txt", "kept.txt"]
+
+
+def test_discard_removes_uncommitted_temporaries(tmp_path):
+    staged = _stage(tmp_path, "sample.txt", "old", "new")
+    batch = ReplaceBatch()
+    batch.add(staged)
+    batch.discard()
+    assert batch.commit() == []
+    assert os.listdir(tmp_path) == ["sample.txt"]
+    assert (tmp_path / "sample.txt").read_text(encoding="utf-8") == "old"
@@ -0,0 +1,63 @@
+import errno
+import os
+
+import pytest
+
+from unicodefix import fastcopy
+from unicodefix.fastcopy import copy_file
+
+
+def _copy(tmp_path, data):
+    source = tmp_path / "source.txt"
+    target = tmp_path / "target.txt"
+    source.write_bytes(data)
+    with open(source, "rb") as reader, open(target, "wb") as writer:
+        method = copy_file(reader.fileno(), writer.fileno())
+    return method, target.read_bytes()
+
+
+def _unsupported(*_):
+    raise OSError(errno.EXDEV, "unsupported")
+
+
+def test_copy_uses_the_fastest_available_method(tmp_path):
+    data = "café “quoted”\n".encode() * 50_000
+    method, copied = _copy(tmp_path, data)
+    assert copied == data
+    assert method in {"reflink", "copy_file_range", "sendfile", "read"}
+
+
+@pytest.mark.parametrize("disabled", [1, 2, 3])
+def test_unsupported_methods_fall_back_in_order(tmp_path, monkeypatch, disabled):
+    monkeypatch.setattr(fastcopy, "_reflink", lambda *_: False)
+    expected = "read"
+    if disabled < 3 and hasattr(os, "sendfile"):
+        expected = "sendfile"
+    if disabled < 2 and hasattr(os, "copy_file_range"):
+        expected = "copy_file_range"
+    if disabled >= 2:
+        monkeypatch.setattr(os, "copy_file_range", _unsupported, raising=False)
+    if disabled >= 3:
+        monkeypatch.setattr(os, "sendfile", _unsupported, raising=False)
+    data = bytes(range(256)) * 10_000
+    assert _copy(tmp_path, data) == (expected, data)
+
+
+def test_a_partial_zero_copy_resumes_at_its_offset(tmp_path, monkeypatch):
+    monkeypatch.setattr(fastcopy, "_reflink", lambda *_: False)
+    monkeypatch.setattr(fastcopy, "_ZERO_COPY_BYTES", 1000)
+    calls = []
+
+    def flaky(source, target, count, offset_src, offset_dst):
+        calls.append(offset_src)
+        if len(calls) > 1:
+            raise OSError(errno.EXDEV, "unsupported")
+        os.lseek(source, offset_src, os.SEEK_SET)
+        os.lseek(target, offset_dst, os.SEEK_SET)
+        return os.write(target, os.read(source, count))
+
+    monkeypatch.setattr(os, "copy_file_range", flaky, raising=False)
+    monkeypatch.setattr(os, "sendfile", _unsupported, raising=False)
+    data = bytes(range(256)) * 40
+    assert _copy(tmp_path, data) == ("read", data)
+    assert calls == [0, 1000]
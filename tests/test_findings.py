@@ -1,3 +1,7 @@
+import dataclasses
+import pickle
+from dataclasses import fields
+
 from unicodefix.findings import FINDINGS_SCHEMA_VERSION, Finding, Findings, Location
 
 
@@ -8,3 +12,34 @@ def test_findings_are_versioned_and_serializable():
     data = findings.to_dict()
     assert data["schema_version"] == FINDINGS_SCHEMA_VERSION
     assert data["findings"][0]["locations"][0]["line"] == 2
+
+
+def test_hand_written_serializer_matches_dataclass_layout():
+    location = Location(1, 2, 1, 3, 1, 2)
+    finding = Finding(
+        "unicode_security",
+        "confusable_mixed_script_token",
+        count=2,
+        locations=(location, Location(4, 1)),
+        details={"tokens": [{"token": "x", "characters": [{"script": "latin"}]}]},
+    )
+    data = finding.to_dict()
+    expected = dataclasses.asdict(finding)
+    expected["locations"] = [dataclasses.asdict(item) for item in finding.locations]
+    assert data == expected
+    assert list(data) == list(expected)
+    assert list(data["locations"][0]) == [field.name for field in fields(Location)]
+    assert pickle.loads(pickle.dumps(finding)) == finding
+    assert not hasattr(location, "__dict__")
+
+
+def test_serialized_details_do_not_share_nested_containers():
+    finding = Finding(
+        "formatting",
+        "skipped_stage",
+        details={"stages": [{"stage": "confusables", "reason": "size"}]},
+    )
+    data = finding.to_dict()
+    data["details"]["stages"][0]["reason"] = "timeout"
+    data["details"]["stages"].append({"stage": "markdown_audit"})
+    assert finding.details == {"stages": [{"stage": "confusables", "reason": "size"}]}
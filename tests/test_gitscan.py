@@ -0,0 +1,59 @@
+import shutil
+import subprocess
+
+import pytest
+
+from unicodefix.gitscan import BlobReader, changed_files
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+
+def _git(root, *arguments):
+    subprocess.run(
+        ["git", "-C", str(root), *arguments], check=True, capture_output=True
+    )
+
+
+@pytest.fixture
+def repository(tmp_path):
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "test@example.invalid")
+    _git(tmp_path, "config", "user.name", "Test")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "kept.txt").write_text("kept\n", encoding="utf-8")
+    (tmp_path / "edited.txt").write_text("old\n", encoding="utf-8")
+    (tmp_path / "data.bin").write_bytes(b"\0old")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "initial")
+    (tmp_path / "edited.txt").write_text("staged\u200b\n", encoding="utf-8")
+    (tmp_path / "data.bin").write_bytes(b"\0new")
+    (tmp_path / "added.md").write_text("new\n", encoding="utf-8")
+    (tmp_path / "link").symlink_to("edited.txt")
+    _git(tmp_path, "add", ".")
+    (tmp_path / "edited.txt").write_text("working tree\n", encoding="utf-8")
+    return tmp_path
+
+
+def test_changed_and_staged_files_skip_binaries_and_links(repository):
+    files, stats = changed_files("HEAD", cwd=str(repository / "sub"))
+    assert files == ["../added.md", "../edited.txt"]
+    assert stats == {"files": 2, "binary": 1, "special": 1}
+
+    staged, _ = changed_files(staged=True, cwd=str(repository))
+    assert staged == ["added.md", "edited.txt"]
+    with pytest.raises(ValueError):
+        changed_files("HEAD", staged=True)
+
+
+def test_blob_reader_serves_index_content_from_one_process(repository):
+    reader = BlobReader(str(repository))
+    try:
+        assert reader.staged(str(repository / "edited.txt")) == (
+            "staged\u200b\n".encode()
+        )
+        assert reader.staged(str(repository / "added.md")) == b"new\n"
+        with pytest.raises(FileNotFoundError):
+            reader.staged(str(repository / "untracked.txt"))
+        assert reader.staged(str(repository / "sub" / "kept.txt")) == b"kept\n"
+    finally:
+        reader.close()
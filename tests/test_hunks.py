@@ -0,0 +1,65 @@
+from unicodefix.hunks import merge_ranges, parse_unified_diff, scan_changed_lines
+from unicodefix.scanner import scan_text_for_report
+
+GIT_DIFF = """\
+diff --git a/notes.txt b/notes.txt
+index 1111111..2222222 100644
+--- a/notes.txt
++++ b/notes.txt
+@@ -1,0 +2,2 @@
++added
+++++ looks like a header
+@@ -5 +7 @@
+-old
++replaced
+diff --git "a/caf\\303\\251.md" "b/caf\\303\\251.md"
+--- "a/caf\\303\\251.md"
++++ "b/caf\\303\\251.md"
+@@ -1,3 +1,3 @@
+ keep
+-before
++after
+ keep
+\\ No newline at end of file
+diff --git a/gone.txt b/gone.txt
+deleted file mode 100644
+--- a/gone.txt
++++ /dev/null
+@@ -1 +0,0 @@
+-removed
+"""
+
+
+def test_unified_diff_yields_new_side_added_line_ranges():
+    assert parse_unified_diff(GIT_DIFF.splitlines(keepends=True)) == {
+        "notes.txt": [(2, 3), (7, 7)],
+        "café.md": [(2, 2)],
+    }
+    assert merge_ranges([(5, 6), (1, 2), (3, 3)]) == [(1, 3), (5, 6)]
+
+
+def test_changed_lines_report_keeps_new_file_locations():
+    text = "old\u200b\nnew — dash\nplain\nnew\u200b\n"
+    data = scan_changed_lines(text, [(2, 2), (4, 4)])
+    signals = {
+        finding["signal"]: [location["line"] for location in finding["locations"]]
+        for finding in data["findings"]
+    }
+    assert signals == {"unicode_dash_or_hyphen": [2], "default_ignorable": [4]}
+    assert data["unicode_ghosts"]["ZWSP"] == 1
+    assert data["changed_lines"] == [[2, 2], [4, 4]]
+    whole = scan_text_for_report(text)
+    assert scan_changed_lines(text, [(1, 4)])["findings"] == whole["findings"]
+
+
+def test_a_touched_c2pa_block_is_scanned_whole():
+    block = (
+        "-----BEGIN C2PA MANIFEST-----\n"
+        "https://example.invalid/manifest.c2pa\n"
+        "-----END C2PA MANIFEST-----\n"
+    )
+    text = f"intro\n{block}outro\n"
+    data = scan_changed_lines(text, [(3, 3)])
+    assert data["changed_lines"] == [[2, 4]]
+    assert [finding["category"] for finding in data["findings"]] == ["provenance"]
+    assert scan_changed_lines(text, [(5, 5)])["findings"] == []
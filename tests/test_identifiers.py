@@ -0,0 +1,35 @@
+from unicodefix.identifiers import IdentifierIndex, collision_finding
+from unicodefix.source import source_identifiers
+
+
+def test_source_identifiers_are_distinct_with_first_position():
+    text = "value = 1\n\ntotal = value + other\n"
+    assert source_identifiers(text, "python") == [
+        ("value", 1, 1),
+        ("total", 3, 1),
+        ("other", 3, 17),
+    ]
+
+
+def test_index_reports_confusable_identifiers_only_across_files(tmp_path):
+    index = IdentifierIndex(tmp_path / "index.db")
+    index.update("a.py", [("paypal", 1, 5), ("total", 2, 1)], size=1, mtime_ns=1)
+    index.update("b.py", [("pаypal", 3, 5)], size=2, mtime_ns=2)
+    index.update("c.py", [("paypal", 1, 1)], size=3, mtime_ns=3)
+    assert index.is_current("a.py", 1, 1)
+    assert not index.is_current("a.py", 1, 2)
+
+    collisions = index.collisions("b.py")
+    assert [item["other_path"] for item in collisions] == ["a.py", "c.py"]
+    # Identical ASCII spellings in two files are ordinary reuse.
+    assert [item["other_path"] for item in index.collisions("a.py")] == ["b.py"]
+
+    finding = collision_finding(collisions)
+    assert finding.signal == "cross_file_confusable_identifier"
+    assert finding.count == 1
+    assert collision_finding([]) is None
+
+    assert sorted(index.paths()) == ["a.py", "b.py", "c.py"]
+    index.forget("b.py")
+    assert index.collisions("a.py") == []
+    index.close()
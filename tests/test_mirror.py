@@ -0,0 +1,62 @@
+import os
+import stat
+
+import pytest
+
+from unicodefix.mirror import OutputWriter, PendingWrite, mirror_path
+
+
+def test_mirror_path_keeps_relative_layout_and_roots_other_paths():
+    assert mirror_path(os.path.join("src", "a.txt"), "out") == os.path.join(
+        "out", "src", "a.txt"
+    )
+    outside = os.path.join(os.pardir, "sibling", "b.txt")
+    expected = os.path.abspath(outside).lstrip(os.sep)
+    assert mirror_path(outside, "out") == os.path.join("out", expected)
+    absolute = os.path.abspath(os.path.join("x", "c.txt"))
+    assert mirror_path(absolute, "out") == os.path.join("out", absolute.lstrip(os.sep))
+
+
+def test_writer_creates_directories_and_keeps_the_input_mode(tmp_path):
+    target = tmp_path / "out" / "a" / "b" / "x.txt"
+    writer = OutputWriter(threads=2)
+    try:
+        writer.write(PendingWrite("x.txt", str(target), b"one\r\n", 0o640))
+    finally:
+        writer.close()
+    assert target.read_bytes() == b"one\r\n"
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640
+    assert [path.name for path in target.parent.iterdir()] == ["x.txt"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permission bits")
+def test_writer_replaces_a_read_only_output(tmp_path):
+    target = tmp_path / "x.txt"
+    target.write_text("old", encoding="utf-8")
+    target.chmod(0o444)
+    writer = OutputWriter(threads=1)
+    try:
+        writer.write(PendingWrite("x.txt", str(target), b"new", 0o444))
+    finally:
+        writer.close()
+    assert target.read_bytes() == b"new"
+
+
+def test_submitted_writes_report_results_in_order(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("", encoding="utf-8")
+    writer = OutputWriter(threads=4, window=2)
+    results = []
+    try:
+        for index in range(6):
+            parent = blocker if index == 3 else tmp_path / "out"
+            write = PendingWrite("in", str(parent / f"{index}.txt"), b"x", 0o644)
+            results.extend(writer.submit(write, index))
+        results.extend(writer.drain())
+    finally:
+        writer.close()
+    assert [token for token, _ in results] == list(range(6))
+    assert [token for token, error in results if error is not None] == [3]
+    assert sorted(path.name for path in (tmp_path / "out").iterdir()) == [
+        f"{index}.txt" for index in (0, 1, 2, 4, 5)
+    ]
@@ -0,0 +1,27 @@
+import sys
+
+from unicodefix.parallel import ordered_map
+
+
+def _noisy_square(number):
+    print(f"out {number}")
+    print(f"err {number}", file=sys.stderr)
+    return number * number
+
+
+def test_ordered_map_keeps_input_order_and_replays_output(capsys):
+    numbers = list(range(12))
+    results = list(ordered_map(_noisy_square, numbers, jobs=3, window=4))
+    assert results == [number * number for number in numbers]
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [f"out {number}" for number in numbers]
+    assert captured.err.splitlines() == [f"err {number}" for number in numbers]
+
+
+def test_single_job_runs_initializer_in_process():
+    calls = []
+    results = ordered_map(
+        len, ["a", "bb"], jobs=1, initializer=calls.append, initargs=("init",)
+    )
+    assert list(results) == [1, 2]
+    assert calls == ["init"]
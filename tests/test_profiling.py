@@ -0,0 +1,47 @@
+import pstats
+import time
+
+import pytest
+
+from unicodefix.profiling import StackSampler, profiled
+from unicodefix.transforms import clean_text
+
+TEXT = "“quoted”\u200b text — with dashes\n" * 2000
+
+
+def _busy(seconds):
+    stop = time.process_time() + seconds
+    while time.process_time() < stop:
+        clean_text(TEXT)
+
+
+def test_profiled_writes_pstats_and_stage_annotated_stacks(tmp_path):
+    path = tmp_path / "run.prof"
+    with profiled(str(path)) as profile:
+        _busy(0.3)
+    assert profile.stats_path == str(path)
+    functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+    assert "clean_text" in functions
+    assert profile.stages["clean"] > 0
+    if StackSampler.available:
+        folded = (tmp_path / "run.prof.folded").read_text(encoding="utf-8")
+        line = next(line for line in folded.splitlines() if "[stage:clean]" in line)
+        stack, weight = line.rsplit(" ", 1)
+        assert stack.split(";").index("[stage:clean]") + 1 == stack.split(";").index(
+            "clean_text (transforms.py)"
+        )
+        assert int(weight) > 0
+
+
+@pytest.mark.skipif(not StackSampler.available, reason="needs SIGPROF")
+def test_sample_only_profiles_write_stacks_to_the_named_file(tmp_path):
+    path = tmp_path / "run.folded"
+    with profiled(str(path), deterministic=False) as profile:
+        _busy(0.3)
+    assert profile.stats_path is None
+    assert profile.folded_path == str(path)
+    assert profile.samples > 0
+    assert 0.1 < profile.stages["clean"] < 1.0
+    assert "[stage:clean];clean_text (transforms.py)" in path.read_text(
+        encoding="utf-8"
+    )
@@ -1,4 +1,4 @@
-from unicodefix.scanner import scan_text_for_report
+from unicodefix.scanner import count_findings, scan_findings, scan_text_for_report
 
 
 def test_scanner_counts_core_signals():
@@ -49,3 +49,12 @@ def test_scanner_reports_confusable_skeleton_without_replacement():
     )
     assert finding["details"]["tokens"][0]["skeleton"] == "paypal"
     assert finding["removable"] is False
+
+
+def test_count_findings_matches_scan_totals_and_stops_at_limit():
+    text = "pаypal “q” a\u200bb\u2066c\u00a0d\n"
+    findings = scan_findings(text)
+    assert count_findings(text) == findings.total()
+    for category in ("unicode_security", "typography", "formatting"):
+        assert count_findings(text, [category]) == findings.total(category)
+    assert count_findings(text, ["typography"], limit=1) == 1
@@ -0,0 +1,72 @@
+import io
+import json
+
+import pytest
+
+from unicodefix.shards import (
+    Shard,
+    merge_reports,
+    parse_shard,
+    shard_files,
+    size_shard,
+)
+
+
+def test_parse_shard_accepts_one_based_index_of_count():
+    assert parse_shard("3/16") == Shard(3, 16)
+    assert str(Shard(3, 16)) == "3/16"
+    for text in ("0/4", "5/4", "2", "a/b"):
+        with pytest.raises(ValueError):
+            parse_shard(text)
+
+
+def test_path_hash_shards_partition_inputs_stably():
+    files = [f"src/module_{number}.py" for number in range(200)]
+    shards = [shard_files(files, Shard(index, 4)) for index in range(1, 5)]
+    assert sorted(path for shard in shards for path in shard) == sorted(files)
+    assert all(shard for shard in shards)
+    assert list(shard_files(iter(files), Shard(2, 4))) == shards[1]
+    assert shard_files(["./src/module_7.py"], Shard(1, 4)) == (
+        ["./src/module_7.py"] if "src/module_7.py" in shards[0] else []
+    )
+
+
+def test_size_shards_balance_bytes(tmp_path):
+    sizes = [900, 500, 400, 300, 200, 100]
+    files = []
+    for number, size in enumerate(sizes):
+        path = tmp_path / f"file{number}.txt"
+        path.write_bytes(b"x" * size)
+        files.append(str(path))
+    first, second = (size_shard(files, Shard(index, 2)) for index in (1, 2))
+    assert sorted(first + second) == sorted(files)
+    loads = [
+        sum(sizes[files.index(path)] for path in shard) for shard in (first, second)
+    ]
+    assert loads == [1200, 1200]
+    assert first == [path for path in files if path in first]
+
+
+def test_merge_reports_reads_json_and_ndjson_and_rejects_overlap():
+    report = {"findings": []}
+    ndjson = "\n".join(
+        json.dumps(record)
+        for record in (
+            {"type": "file", "file": "b.txt", "report": report},
+            {"type": "summary", "files": 1, "threshold": 1, "shard": "1/2"},
+        )
+    )
+    merged = merge_reports(
+        [
+            ("one", io.StringIO(ndjson)),
+            ("two", io.StringIO(json.dumps({"a.txt": report}))),
+        ]
+    )
+    assert merged.reports == {"b.txt": report, "a.txt": report}
+    assert merged.origins == {"b.txt": 0}
+    assert merged.summaries[0]["shard"] == "1/2"
+
+    with pytest.raises(ValueError, match="more than one shard"):
+        merge_reports([("one", io.StringIO(ndjson)), ("again", io.StringIO(ndjson))])
+    with pytest.raises(ValueError, match="not a file report"):
+        merge_reports([("gate", io.StringIO('{"type": "gate"}'))])
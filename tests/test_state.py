@@ -0,0 +1,72 @@
+import os
+import sqlite3
+
+from unicodefix.state import RACY_NS, FileState, IncrementalState
+
+
+def _age(path, seconds=10):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 10**9))
+
+
+def test_unchanged_files_are_skipped_by_stat_alone(tmp_path):
+    source = tmp_path / "sample.txt"
+    source.write_text("text\n", encoding="utf-8")
+    _age(source)
+    state = IncrementalState(tmp_path / "state.sqlite", options="a")
+    state.record(str(source), FileState.of(str(source)), 1, 2.5)
+    assert state.unchanged(str(source))
+    assert state.stats["hashed"] == 0
+    assert state.stats["skipped_nonzero"] == 1
+    assert state.stats["saved_seconds"] == 2.5
+
+    other = IncrementalState(tmp_path / "state.sqlite", options="b")
+    assert not other.unchanged(str(source))
+    state.close()
+    other.close()
+
+
+def test_racy_or_touched_entries_fall_back_to_the_content_hash(tmp_path):
+    source = tmp_path / "sample.txt"
+    source.write_text("text\n", encoding="utf-8")
+    state = IncrementalState(tmp_path / "state.sqlite", options="a")
+    state.record(str(source), FileState.of(str(source)), 0, 1.0)
+    # Recorded within RACY_NS of its mtime, so the stat alone proves nothing.
+    assert (
+        os.stat(source).st_mtime_ns
+        > state._connection.execute("SELECT recorded_ns FROM files").fetchone()[0]
+        - RACY_NS
+    )
+    assert state.unchanged(str(source))
+    assert state.stats["hashed"] == 1
+
+    source.write_text("next\n", encoding="utf-8")
+    assert not state.unchanged(str(source))
+
+    state.record(str(source), None, 1, 0.0)
+    assert not state.unchanged(str(source))
+    state.close()
+
+
+def test_reports_are_replayed_and_old_state_files_gain_the_column(tmp_path):
+    path = tmp_path / "state.sqlite"
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE files (path TEXT PRIMARY KEY, options TEXT NOT NULL, "
+            "size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, inode INTEGER NOT "
+            "NULL, digest TEXT NOT NULL, result INTEGER NOT NULL, elapsed REAL NOT "
+            "NULL, recorded_ns INTEGER NOT NULL)"
+        )
+    connection.close()
+    source = tmp_path / "sample.txt"
+    source.write_text("text\n", encoding="utf-8")
+    _age(source)
+    state = IncrementalState(path, options="a")
+    state.record(str(source), FileState.of(str(source)), 0, 1.0)
+    # Recorded without a report, so a report run cannot skip it.
+    assert state.unchanged(str(source))
+    assert state.replay(str(source)) is None
+    report = {"total": 0, "findings": [{"signal": "x", "details": {"n": [1]}}]}
+    state.record(str(source), FileState.of(str(source)), 0, 1.0, report)
+    assert state.replay(str(source)) == report
+    state.close()
@@ -0,0 +1,100 @@
+import io
+
+from unicodefix import walk
+from unicodefix.walk import Walker, is_binary, read_file_list
+
+
+def _tree(root, files):
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+def _walk(root, **options):
+    walker = Walker([str(root)], **options)
+    return [path[len(str(root)) + 1 :] for path in walker], walker.stats
+
+
+def test_walker_honors_ignore_files_and_skips_binary(tmp_path):
+    _tree(
+        tmp_path,
+        {
+            ".gitignore": b"build/\n*.log\n!keep.log\n/top.txt\n",
+            ".ignore": b"vendor\n",
+            ".git/config": b"[core]\n",
+            "top.txt": b"ignored\n",
+            "docs/top.txt": b"kept: anchored pattern\n",
+            "docs/drop.log": b"ignored\n",
+            "docs/keep.log": b"kept\n",
+            "docs/image.png": b"\x89PNG\r\n\x1a\n\0\0",
+            "docs/latin1.txt": b"caf\xe9\n",
+            "build/out.txt": b"ignored\n",
+            "src/vendor/lib.txt": b"ignored\n",
+            "src/main.py": b"print('hi')\n",
+            "src/sub/.gitignore": b"*.tmp\n",
+            "src/sub/notes.tmp": b"ignored\n",
+            "src/sub/notes.md": "café\n".encode(),
+        },
+    )
+    paths, stats = _walk(tmp_path)
+    assert paths == [
+        "docs/keep.log",
+        "docs/top.txt",
+        "src/main.py",
+        "src/sub/notes.md",
+    ]
+    assert stats["binary"] == 2
+    assert stats["ignored"] == 5
+
+    walker = Walker([str(tmp_path)])
+    selected = sorted(
+        str(path.relative_to(tmp_path))
+        for path in tmp_path.rglob("*")
+        if path.is_file() and walker.selects(str(path))
+    )
+    assert selected == paths
+    assert walker.selects(str(tmp_path / "src/sub"), directory=True)
+    assert not walker.selects(str(tmp_path / "src/vendor"), directory=True)
+    assert not walker.stats
+
+
+def test_unreadable_ignore_file_is_counted_not_fatal(tmp_path):
+    _tree(tmp_path, {".gitignore/stray": b"x\n", "notes.txt": b"kept\n"})
+    paths, stats = _walk(tmp_path)
+    assert paths == [".gitignore/stray", "notes.txt"]
+    assert stats["unreadable"] == 1
+
+
+def test_walker_include_and_exclude_globs(tmp_path):
+    _tree(
+        tmp_path,
+        {
+            "a.md": b"a\n",
+            "b.txt": b"b\n",
+            "skip/c.md": b"c\n",
+            "deep/d.md": b"d\n",
+        },
+    )
+    paths, stats = _walk(tmp_path, include=["*.md"], exclude=["skip"])
+    assert paths == ["a.md", "deep/d.md"]
+    assert stats["excluded"] == 2
+
+
+def test_binary_sniff_tolerates_a_split_multibyte_character(tmp_path):
+    path = tmp_path / "text.txt"
+    path.write_bytes(b"a" * 8191 + "é".encode())
+    assert not is_binary(path)
+
+
+def test_file_lists_stream_across_chunk_boundaries(monkeypatch):
+    monkeypatch.setattr(walk, "LIST_CHUNK_BYTES", 3)
+    names = b"a b.txt\0\0dir/n\xffm.txt\0-\0last.md"
+    assert list(read_file_list(io.BytesIO(names), null=True)) == [
+        "a b.txt",
+        "dir/n\udcffm.txt",
+        "./-",
+        "last.md",
+    ]
+    lines = io.StringIO("one.txt\r\n\ntwo.txt\n")
+    assert list(read_file_list(lines)) == ["one.txt", "two.txt"]
@@ -0,0 +1,66 @@
+import os
+import sys
+
+import pytest
+
+from unicodefix.watch import InotifyWatcher, PollingWatcher, batches
+
+
+def _everything(path):
+    return True
+
+
+def _watchers():
+    yield PollingWatcher
+    if sys.platform.startswith("linux"):
+        yield InotifyWatcher
+
+
+@pytest.mark.parametrize("kind", list(_watchers()), ids=lambda kind: kind.backend)
+def test_watchers_report_written_files_and_new_directories(tmp_path, kind):
+    root = tmp_path / "docs"
+    root.mkdir()
+    (root / "old.txt").write_text("old\n", encoding="utf-8")
+    single = tmp_path / "single.md"
+    single.write_text("one\n", encoding="utf-8")
+    (tmp_path / "other.md").write_text("two\n", encoding="utf-8")
+    roots = [str(root), str(single)]
+    if kind is PollingWatcher:
+        watcher = PollingWatcher(roots, _everything, interval=0.05)
+    else:
+        watcher = InotifyWatcher(roots, _everything)
+    try:
+        assert watcher.changes(0.1) == set()
+        (root / "old.txt").write_text("edited\n", encoding="utf-8")
+        (root / "new" / "deep").mkdir(parents=True)
+        (root / "new" / "deep" / "added.txt").write_text("new\n", encoding="utf-8")
+        single.write_text("changed\n", encoding="utf-8")
+        (tmp_path / "other.md").write_text("not watched\n", encoding="utf-8")
+        batch = next(batches(watcher, 0.2))
+    finally:
+        watcher.close()
+    assert batch == sorted(
+        [
+            str(root / "new" / "deep" / "added.txt"),
+            str(root / "old.txt"),
+            str(single),
+        ]
+    )
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify only")
+def test_inotify_reports_renames_into_place_and_skips_undescended_directories(
+    tmp_path,
+):
+    (tmp_path / "vendor").mkdir()
+    watcher = InotifyWatcher([str(tmp_path)], lambda path: "vendor" not in path)
+    try:
+        assert watcher.watches == 1
+        staged = tmp_path / "notes.txt.tmp"
+        staged.write_text("saved\n", encoding="utf-8")
+        os.replace(staged, tmp_path / "notes.txt")
+        (tmp_path / "vendor" / "lib.txt").write_text("x\n", encoding="utf-8")
+        batch = next(batches(watcher, 0.2))
+    finally:
+        watcher.close()
+    assert batch == [str(tmp_path / "notes.txt"), str(staged)]